@@ -0,0 +1,97 @@
+"""Temporarily raise a device's beacon rate for ADC-heavy step sequences."""
+
+from __future__ import annotations
+
+import logging
+from typing import Any, Optional
+
+from common.error_codes import E_DEVICE_COMMUNICATION_FAIL, E_MESH_CONFIG_FAIL
+
+# 장치 무응답으로 끝난 시퀀스의 결과 코드: 복원 요청도 응답이 없을 것이므로 보내지 않음
+COMM_FAIL_CODES = (E_DEVICE_COMMUNICATION_FAIL.code, E_MESH_CONFIG_FAIL.code)
+
+
+class BeaconBoost:
+    """
+    with 블록 동안 대상 장치의 비콘 주기(asp_interval)를 줄여 ADC 샘플을 빨리 모으고,
+    블록이 끝나면(예외 포함) restore_interval로 되돌립니다.
+
+        with BeaconBoost(g.bridge, device_id, stick_uid, logger=logger) as boost:
+            board_results = board_module.run_stage_test(context)
+            boost.settle(board_results)
+        if not boost.restored: ...
+
+    변경 요청을 보낸 경우에는 응답이 없었더라도 복원을 한 번 시도합니다 (장치에는 적용됐을 수 있음).
+    set_mesh_config 자체가 재시도하므로 여기서 다시 반복하지 않습니다.
+    """
+
+    def __init__(self, bridge, target_id: Optional[str], stick_uid: Optional[str],
+                 asp_interval: int = 50, restore_interval: int = 200, tx_pwr: int = -20,
+                 logger: Optional[logging.Logger] = None):
+        self.bridge = bridge
+        self.target_id = target_id
+        self.stick_uid = stick_uid
+        self.asp_interval = asp_interval
+        self.restore_interval = restore_interval
+        self.tx_pwr = tx_pwr
+        self.logger = logger
+        self.sent = False
+        self.active = False       # 장치가 변경을 확인(응답)했는지
+        self.restored = True      # 복원이 필요 없거나 성공했는지
+        self.skip_reason: Optional[str] = None
+
+    def __enter__(self) -> BeaconBoost:
+        if not (self.bridge and self.target_id and self.stick_uid):
+            return self
+        self.sent = True
+        self.restored = False
+        res = self.bridge.set_mesh_config(self.target_id, self.stick_uid, asp_interval=self.asp_interval,
+                                          tx_pwr=self.tx_pwr, logger=self.logger)
+        self.active = res is not None
+        if self.logger:
+            if self.active:
+                self.logger.info(f"  --> Beacon interval boosted to {self.asp_interval}ms for ADC capture")
+            else:
+                self.logger.warning("  --> Beacon boost not acknowledged; continuing at normal rate")
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        if self.sent and self.skip_reason is None:
+            self.restore()
+        return False
+
+    def settle(self, results, restored_by: Optional[str] = None) -> None:
+        """
+        with 블록 안에서 시퀀스 결과를 보고 복원 요청이 필요한지 정합니다.
+        - 통신 실패로 끝났으면 복원을 보내지 않습니다 (restored는 False로 남음).
+        - restored_by 단계가 성공했으면 그 단계가 이미 기본 주기를 적용했으므로 복원된 것으로 봅니다.
+        """
+        if not self.sent:
+            return
+        if results.code in COMM_FAIL_CODES:
+            self.skip_reason = "device not responding"
+            if self.logger:
+                self.logger.warning(f"  --> Skipping beacon interval restore on {self.target_id}: {self.skip_reason}")
+        elif restored_by and any(d.case == restored_by and d.code == 0 for d in results.details):
+            self.skip_reason = f"applied by {restored_by}"
+            self.restored = True
+
+    def restore(self) -> bool:
+        res = self.bridge.set_mesh_config(self.target_id, self.stick_uid, asp_interval=self.restore_interval,
+                                          tx_pwr=self.tx_pwr, logger=self.logger)
+        if res is not None:
+            self.restored = True
+            if self.logger:
+                self.logger.info(f"  --> Beacon interval restored to {self.restore_interval}ms")
+            return True
+        if self.logger:
+            self.logger.error(f"  --> Failed to restore beacon interval ({self.restore_interval}ms) on {self.target_id}")
+        return False
+
+    def to_parameter(self) -> dict[str, Any]:
+        return {
+            "log": f"Beacon interval restore to {self.restore_interval}ms "
+                   + (f"skipped ({self.skip_reason})" if self.skip_reason else "failed"),
+            "boost_interval": self.asp_interval,
+            "restore_interval": self.restore_interval,
+        }
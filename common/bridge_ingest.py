@@ -0,0 +1,269 @@
+"""
+Out-of-process MQTT ingest for the Solar Bridge client.
+
+MQTT 연결, 비콘 필터링, JSON 파싱을 별도 프로세스(워커)에서 수행하고 결과만 Pipe로 넘깁니다.
+스테이지 프로세스의 GIL을 TM1637 애니메이션/스텝 로직과 나눠 쓰지 않으므로 비콘이 많아도 콜백 지연이 일정합니다.
+
+    client = SolarBridgeClient(host, port, transport=IngestWorkerTransport())
+
+워커 → 부모 이벤트: ("connect", rc) / ("disconnect", rc) / ("subscribe",) / ("msgs", [(topic, data), ...]) / ("count", name, n)
+부모 → 워커 명령:   ("connect", host, port, keepalive) / ("reconnect_delay", min, max) / ("subscribe", topics)
+                    ("unsubscribe", topic) / ("publish", topic, payload) / ("filter", ids|None) / ("stop",)
+"""
+
+from __future__ import annotations
+
+import itertools
+import logging
+import multiprocessing as mp
+import threading
+import time
+from typing import Any, Callable, Optional
+
+# 비콘은 최대 BATCH_SIZE개 또는 BATCH_AGE초까지 모아서 한 번에 전송 (응답 메시지는 즉시 전송)
+BATCH_SIZE = 64
+BATCH_AGE = 0.005
+
+
+class _IngestWorker:
+    """워커 프로세스 쪽: paho 클라이언트를 소유하고 수신 메시지를 필터링/파싱해 부모로 보냅니다."""
+
+    def __init__(self, cmd_conn, data_conn, batch_size: int, batch_age: float):
+        import paho.mqtt.client as mqtt
+        from common.solar_bridge import SolarBridgeClient, _json_loads, _normalize_id
+
+        self._loads = _json_loads
+        self._normalize_id = _normalize_id
+        self._unpack_adc_fields = SolarBridgeClient._unpack_adc_fields
+        self.cmd_conn = cmd_conn
+        self.data_conn = data_conn
+        self.batch_size = batch_size
+        self.batch_age = batch_age
+        self._filter: Optional[frozenset[str]] = None
+        self._batch: list[tuple[str, dict]] = []
+        self._batch_ts = 0.0
+        self._dropped = 0
+        self._send_lock = threading.Lock()
+
+        self.client = mqtt.Client()
+        self.client.on_connect = lambda c, u, f, rc: self._send(("connect", rc))
+        self.client.on_disconnect = lambda c, u, rc: self._send(("disconnect", rc))
+        self.client.on_subscribe = lambda c, u, mid, qos: self._send(("subscribe",))
+        self.client.on_message = self._on_message
+
+    def _send(self, event: tuple):
+        with self._send_lock:
+            if event[0] != "msgs":
+                self._flush_locked()  # 순서 유지: 모아둔 비콘을 먼저 전송
+            self.data_conn.send(event)
+
+    def _flush_locked(self):
+        if self._batch:
+            batch, self._batch = self._batch, []
+            self.data_conn.send(("msgs", batch))
+        if self._dropped:
+            self.data_conn.send(("count", "dropped_unwatched", self._dropped))
+            self._dropped = 0
+
+    def _on_message(self, client, userdata, msg):
+        topic = msg.topic
+        parts = topic.split("/")
+        beacon = len(parts) == 4 and parts[1] == "mlpe"
+        if beacon:
+            watched = self._filter
+            if watched is not None and self._normalize_id(parts[2]) not in watched:
+                with self._send_lock:
+                    self._dropped += 1
+                return
+        try:
+            data = self._loads(msg.payload)
+        except ValueError:
+            self._send(("count", "parse_errors", 1))
+            return
+
+        if not beacon:
+            self._send(("msgs", [(topic, data)]))
+            return
+
+        # 비콘은 클라이언트가 쓰는 필드(mlpe_packet.Protobuf)만 남기고 ADC 필드를 미리 풀어서 전송
+        pb = data.get("mlpe_packet", {}).get("Protobuf", {}) if isinstance(data, dict) else {}
+        beacon_data = pb.get("beacon_raw_data")
+        if isinstance(beacon_data, dict):
+            self._unpack_adc_fields(beacon_data)
+        with self._send_lock:
+            if not self._batch:
+                self._batch_ts = time.monotonic()
+            self._batch.append((topic, {"mlpe_packet": {"Protobuf": pb}}))
+            if len(self._batch) >= self.batch_size:
+                self._flush_locked()
+
+    def run(self):
+        try:
+            while True:
+                if self.cmd_conn.poll(self.batch_age):
+                    cmd = self.cmd_conn.recv()
+                    if not self._handle(cmd):
+                        break
+                with self._send_lock:
+                    if self._dropped or (self._batch and time.monotonic() - self._batch_ts >= self.batch_age):
+                        self._flush_locked()
+        except (EOFError, OSError, KeyboardInterrupt):
+            pass  # 부모 프로세스 종료
+        finally:
+            self.client.loop_stop()
+            self.client.disconnect()
+
+    def _handle(self, cmd: tuple) -> bool:
+        op = cmd[0]
+        if op == "publish":
+            self.client.publish(cmd[1], cmd[2])
+        elif op == "filter":
+            self._filter = None if cmd[1] is None else frozenset(cmd[1])
+        elif op == "subscribe":
+            self.client.subscribe(cmd[1])
+        elif op == "unsubscribe":
+            self.client.unsubscribe(cmd[1])
+        elif op == "connect":
+            try:
+                self.client.connect(cmd[1], cmd[2], keepalive=cmd[3])
+            except OSError:
+                self._send(("connect", -1))  # 부모의 start()가 타임아웃으로 ConnectionError 발생
+                return True
+            self.client.loop_start()
+        elif op == "reconnect_delay":
+            self.client.reconnect_delay_set(cmd[1], cmd[2])
+        elif op == "stop":
+            return False
+        return True
+
+
+def _worker_main(cmd_conn, data_conn, batch_size: int, batch_age: float):
+    _IngestWorker(cmd_conn, data_conn, batch_size, batch_age).run()
+
+
+class IngestWorkerTransport:
+    """
+    SolarBridgeClient의 transport로 사용하는 paho 호환 전송 계층.
+    connect()에서 워커 프로세스를 띄우고, 수신 스레드가 워커가 보낸 파싱 결과를 on_parsed(topic, data)로 전달합니다.
+    """
+
+    def __init__(self, batch_size: int = BATCH_SIZE, batch_age: float = BATCH_AGE):
+        self.batch_size = batch_size
+        self.batch_age = batch_age
+        self.on_message = None
+        self.on_connect = None
+        self.on_subscribe = None
+        self.on_disconnect = None
+        self.on_parsed: Optional[Callable[[str, dict], None]] = None
+        self.on_count: Optional[Callable[[str, int], None]] = None
+        self._ctx = mp.get_context("spawn")  # 부모의 스레드(IOThread 등)를 복제하지 않도록 spawn 사용
+        self._proc = None
+        self._cmd_conn = None
+        self._data_conn = None
+        self._cmd_lock = threading.Lock()
+        self._reader: Optional[threading.Thread] = None
+        self._reconnect_delay = (1, 120)
+        self._filter: Any = None
+        self._mids = itertools.count(1)
+
+    def reconnect_delay_set(self, min_delay: int = 1, max_delay: int = 120):
+        self._reconnect_delay = (min_delay, max_delay)
+        self._command(("reconnect_delay", min_delay, max_delay))
+
+    def _command(self, cmd: tuple):
+        if self._cmd_conn is None:
+            return
+        with self._cmd_lock:
+            try:
+                self._cmd_conn.send(cmd)
+            except (OSError, EOFError) as e:
+                logging.error(f"[BridgeIngest] Worker command failed: {e}")
+
+    def connect(self, host: str = "localhost", port: int = 1883, keepalive: int = 60):
+        if self._proc is None or not self._proc.is_alive():
+            cmd_parent, cmd_child = self._ctx.Pipe()
+            data_parent, data_child = self._ctx.Pipe(duplex=False)
+            self._proc = self._ctx.Process(target=_worker_main, name="bridge-ingest",
+                                           args=(cmd_child, data_child, self.batch_size, self.batch_age), daemon=True)
+            self._proc.start()
+            cmd_child.close()
+            data_child.close()
+            self._cmd_conn, self._data_conn = cmd_parent, data_parent
+            self._command(("reconnect_delay", *self._reconnect_delay))
+            self._command(("filter", self._filter))
+        self._command(("connect", host, port, keepalive))
+
+    def loop_start(self):
+        if self._reader is None or not self._reader.is_alive():
+            self._reader = threading.Thread(target=self._read_loop, name="bridge-ingest-rx", daemon=True)
+            self._reader.start()
+
+    def loop_stop(self):
+        pass  # 수신 스레드는 disconnect()에서 워커 종료와 함께 끝남
+
+    def disconnect(self):
+        proc = self._proc
+        if proc is None:
+            return
+        self._command(("stop",))
+        proc.join(timeout=2.0)
+        if proc.is_alive():
+            proc.terminate()
+        if self._reader is not None:
+            self._reader.join(timeout=1.0)
+        self._cmd_conn.close()
+        self._data_conn.close()
+        self._proc = self._cmd_conn = self._data_conn = self._reader = None
+
+    def publish(self, topic: str, payload: Any = None, qos: int = 0, retain: bool = False):
+        self._command(("publish", topic, payload))
+
+    def subscribe(self, topic: Any, qos: int = 0):
+        self._command(("subscribe", topic))
+        return 0, next(self._mids)
+
+    def unsubscribe(self, topic: str):
+        self._command(("unsubscribe", topic))
+        return 0, next(self._mids)
+
+    def set_device_filter(self, target_ids: Optional[set[str]]):
+        """워커가 파싱할 비콘 장치(정규화된 ID). None이면 모든 장치."""
+        self._filter = None if target_ids is None else sorted(target_ids)
+        self._command(("filter", self._filter))
+
+    @property
+    def worker_pid(self) -> Optional[int]:
+        return self._proc.pid if self._proc is not None else None
+
+    def _read_loop(self):
+        conn = self._data_conn
+        connected = False
+        while True:
+            try:
+                event = conn.recv()
+            except (EOFError, OSError):
+                break
+            try:
+                op = event[0]
+                if op == "msgs":
+                    for topic, data in event[1]:
+                        self.on_parsed(topic, data)
+                elif op == "count":
+                    if self.on_count:
+                        self.on_count(event[1], event[2])
+                elif op == "connect":
+                    connected = event[1] == 0
+                    if self.on_connect:
+                        self.on_connect(self, None, {}, event[1])
+                elif op == "disconnect":
+                    connected = False
+                    if self.on_disconnect:
+                        self.on_disconnect(self, None, event[1])
+                elif op == "subscribe":
+                    if self.on_subscribe:
+                        self.on_subscribe(self, None, 0, (0,))
+            except Exception as e:
+                logging.error(f"[BridgeIngest] Event handling error: {e}")
+        # 워커가 비정상 종료된 경우 연결 끊김으로 처리 (대기 중인 요청 즉시 실패)
+        if connected and self.on_disconnect:
+            self.on_disconnect(self, None, 7)
@@ -0,0 +1,185 @@
+"""Latency tracking and performance counters for Solar Bridge commands."""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Optional
+
+
+@dataclass(frozen=True)
+class TimeoutPolicy:
+    """관측된 RTT로부터 명령 타임아웃을 계산하는 규칙."""
+    floor: float = 0.3          # 최소 타임아웃 (초)
+    cap: float = 5.0            # 최대 타임아웃 (초)
+    quantile: float = 0.99      # 기준 분위수
+    multiplier: float = 1.5     # 분위수에 곱하는 배수
+    margin: float = 0.2         # 추가 여유 (초)
+    min_samples: int = 20       # 이보다 적게 관측되면 기본 타임아웃 사용
+    window: int = 200           # 명령/스틱별 보관할 최근 RTT 개수
+
+    @classmethod
+    def from_dict(cls, data: Optional[dict[str, Any]]) -> TimeoutPolicy:
+        if not data:
+            return cls()
+        fields = cls.__dataclass_fields__
+        return cls(**{k: v for k, v in data.items() if k in fields})
+
+
+def _percentile(sorted_vals: list[float], q: float) -> float:
+    idx = min(len(sorted_vals) - 1, max(0, int(round(q * (len(sorted_vals) - 1)))))
+    return sorted_vals[idx]
+
+
+class LatencyTracker:
+    """
+    명령 종류 및 스틱별 최근 RTT를 보관하고, TimeoutPolicy에 따라 명령별 타임아웃을 계산합니다.
+    스틱별 관측치가 부족하면 같은 명령의 전체 관측치를 사용합니다.
+    """
+
+    def __init__(self, policy: Optional[TimeoutPolicy] = None):
+        self.policy = policy or TimeoutPolicy()
+        self._windows: dict[tuple[str, str], deque] = {}
+        self._lock = threading.Lock()
+
+    def _window(self, key: tuple[str, str]) -> deque:
+        win = self._windows.get(key)
+        if win is None:
+            win = deque(maxlen=self.policy.window)
+            self._windows[key] = win
+        return win
+
+    def record(self, command: str, stick_uid: str, rtt: float) -> None:
+        with self._lock:
+            self._window((command, stick_uid or "")).append(rtt)
+            if stick_uid:
+                self._window((command, "")).append(rtt)
+
+    def _samples(self, command: str, stick_uid: str) -> list[float]:
+        with self._lock:
+            win = self._windows.get((command, stick_uid or ""))
+            if (win is None or len(win) < self.policy.min_samples) and stick_uid:
+                win = self._windows.get((command, ""))
+            return sorted(win) if win else []
+
+    def deadline(self, command: str, stick_uid: str, default: float) -> float:
+        """명령 대기 시간(초). 관측치가 부족하면 default를 그대로 반환합니다."""
+        p = self.policy
+        vals = self._samples(command, stick_uid)
+        if len(vals) < p.min_samples:
+            return default
+        est = _percentile(vals, p.quantile) * p.multiplier + p.margin
+        return min(p.cap, max(p.floor, est))
+
+    def snapshot(self) -> dict[str, dict[str, Any]]:
+        """명령/스틱별 RTT 요약 (count, p50, p99, max). 스틱이 빈 항목은 명령 전체 집계입니다."""
+        out: dict[str, dict[str, Any]] = {}
+        with self._lock:
+            items = [(k, sorted(v)) for k, v in self._windows.items() if v]
+        for (command, stick), vals in items:
+            name = f"{command}@{stick}" if stick else command
+            out[name] = {
+                "count": len(vals),
+                "p50": round(_percentile(vals, 0.5), 4),
+                "p99": round(_percentile(vals, 0.99), 4),
+                "max": round(vals[-1], 4),
+            }
+        return out
+
+
+# RTT/콜백 시간 히스토그램 구간 상한 (ms). 마지막 구간은 그 이상 전부
+HISTOGRAM_BUCKETS_MS = (0.5, 1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+class _Histogram:
+    __slots__ = ("count", "total", "max", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * (len(HISTOGRAM_BUCKETS_MS) + 1)
+
+    def observe(self, seconds: float) -> None:
+        ms = seconds * 1000.0
+        self.count += 1
+        self.total += ms
+        if ms > self.max:
+            self.max = ms
+        for i, edge in enumerate(HISTOGRAM_BUCKETS_MS):
+            if ms <= edge:
+                self.buckets[i] += 1
+                return
+        self.buckets[-1] += 1
+
+    def to_dict(self) -> dict[str, Any]:
+        labels = [f"<={e}" for e in HISTOGRAM_BUCKETS_MS] + [f">{HISTOGRAM_BUCKETS_MS[-1]}"]
+        return {
+            "count": self.count,
+            "avg_ms": round(self.total / self.count, 2) if self.count else 0.0,
+            "max_ms": round(self.max, 2),
+            "total_ms": round(self.total, 1),
+            "buckets_ms": {k: v for k, v in zip(labels, self.buckets) if v},
+        }
+
+
+class BridgeMetrics:
+    """
+    SolarBridgeClient 성능 카운터.
+    명령별 RTT 히스토그램/요청/재시도/타임아웃/실패, 토픽 종류별 수신 수, 파싱 오류, 폐기/미요청 메시지,
+    paho 스레드 콜백 처리 시간을 집계합니다. reset()으로 테스트 사이클마다 초기화합니다.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.started = time.monotonic()
+            self.counters: dict[str, int] = {}
+            self.rx: dict[str, int] = {}
+            self.commands: dict[str, dict[str, int]] = {}
+            self.rtt: dict[str, _Histogram] = {}
+            self.callback = _Histogram()
+
+    def incr(self, name: str, n: int = 1) -> None:
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def command(self, cmd_name: str, event: str, n: int = 1) -> None:
+        """명령별 이벤트 (requests, retries, timeouts, failures, aborted, unsolicited)."""
+        with self._lock:
+            c = self.commands.setdefault(cmd_name, {})
+            c[event] = c.get(event, 0) + n
+
+    def observe_rtt(self, cmd_name: str, seconds: float) -> None:
+        with self._lock:
+            hist = self.rtt.get(cmd_name)
+            if hist is None:
+                hist = self.rtt[cmd_name] = _Histogram()
+            hist.observe(seconds)
+
+    def observe_message(self, topic_class: str, seconds: float) -> None:
+        """수신 메시지 1건 (토픽 종류, 콜백 처리 시간)."""
+        with self._lock:
+            self.rx[topic_class] = self.rx.get(topic_class, 0) + 1
+            self.callback.observe(seconds)
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            commands = {}
+            for name in sorted(set(self.commands) | set(self.rtt)):
+                entry: dict[str, Any] = dict(self.commands.get(name, {}))
+                if name in self.rtt:
+                    entry["rtt"] = self.rtt[name].to_dict()
+                commands[name] = entry
+            return {
+                "window_s": round(time.monotonic() - self.started, 2),
+                "commands": commands,
+                "rx": dict(self.rx),
+                "counters": dict(self.counters),
+                "callback": self.callback.to_dict(),
+            }
@@ -0,0 +1,337 @@
+"""
+Shared Solar Bridge session served by the supervisor over a Unix socket.
+
+감독 프로세스(main.py)가 SolarBridgeClient 하나를 계속 유지하고, 스테이지 프로세스는
+SOLAR_BRIDGE_SOCKET 경로로 붙어 같은 연결/구독/스틱 목록을 사용합니다. 스테이지 전환/재시작 시 연결 준비 과정이 없습니다.
+
+프로토콜: 줄 단위 JSON
+    요청 {"id": 1, "method": "get_device_info", "args": [...], "kwargs": {...}}
+    응답 {"id": 1, "result": ..., "logs": [[level, msg], ...]} 또는 {"id": 1, "error": "...", "type": "ConnectionError"}
+"""
+
+from __future__ import annotations
+
+import itertools
+import json
+import logging
+import os
+import socket
+import socketserver
+import stat
+import tempfile
+import threading
+from pathlib import Path
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Any, Optional
+
+from common.solar_bridge import SolarBridgeClient, ComplexScript
+from common.bridge_metrics import TimeoutPolicy
+from common.bridge_ingest import IngestWorkerTransport
+
+SOCKET_ENV = "SOLAR_BRIDGE_SOCKET"
+# 실행 사용자 전용 디렉터리(0700) 안의 소켓(0600): 다른 로컬 사용자는 접속할 수 없음
+DEFAULT_SOCKET_PATH = os.path.join(tempfile.gettempdir(), f"solar-bridge-{os.getuid()}", "bridge.sock")
+
+# 원격 호출 허용 메서드 (연결 수명/전송 계층을 바꾸는 start/stop 등은 제외)
+RPC_METHODS = frozenset({
+    "list_sticks", "get_sticks", "refresh_sticks", "start_stick_watcher",
+    "get_neighbors", "clear_neighbors",
+    "get_device_info", "get_device_info_any", "preferred_stick",
+    "req_shutdown", "set_mesh_config", "get_mppt_status", "enable_mppt", "set_mppt_config", "run_script",
+    "collect_adc", "dump_adc", "adc_sample_rate",
+    "focus_device", "release_device", "watch_devices",
+    "record_to", "stop_recording",  # record_to 경로는 BridgeServer.record_root 아래로 제한
+    "bridge_stats", "reset_stats", "memory_usage", "is_connected",
+})
+
+# 원격 호출 최대 대기 (초). 각 명령의 타임아웃은 서버 쪽 클라이언트가 적용
+RPC_TIMEOUT = 120.0
+
+_ERROR_TYPES = {"ConnectionError": ConnectionError, "TimeoutError": TimeoutError,
+                "ValueError": ValueError, "TypeError": TypeError}
+
+
+def create_bridge_client(server_config: dict[str, Any]) -> SolarBridgeClient:
+    """server.json 설정으로 로컬 SolarBridgeClient를 생성합니다. (start()는 호출 측)"""
+    return SolarBridgeClient(
+        host=server_config.get("bridge_host", "localhost"), port=server_config.get("bridge_port", 1883),
+        timeout=3.0, narrow_subscriptions=True,
+        adaptive_timeouts=True, timeout_policy=TimeoutPolicy.from_dict(server_config.get("bridge_timeouts")),
+        # MQTT 수신/파싱을 별도 프로세스에서 수행 (IO 스레드 애니메이션과 GIL 경합 방지)
+        transport=IngestWorkerTransport() if server_config.get("bridge_ingest_worker") else None,
+    )
+
+
+def connect_bridge(server_config: dict[str, Any], logger: Optional[logging.Logger] = None):
+    """
+    SOLAR_BRIDGE_SOCKET이 설정되어 있으면 감독 프로세스의 공유 세션에 연결하고,
+    없거나 연결할 수 없으면 로컬 SolarBridgeClient를 시작합니다.
+    """
+    path = os.environ.get(SOCKET_ENV)
+    if path:
+        remote = RemoteSolarBridgeClient(path)
+        try:
+            remote.start()
+            if logger: logger.info(f"Using shared bridge session via {path}")
+            return remote
+        except ConnectionError as e:
+            if logger: logger.warning(f"Shared bridge unavailable ({e}); connecting directly")
+    client = create_bridge_client(server_config)
+    client.start()
+    return client
+
+
+def _json_default(obj: Any) -> Any:
+    # NumPy 스칼라/배열 (ADC 버퍼 값)
+    if hasattr(obj, "tolist"):
+        return obj.tolist()
+    return str(obj)
+
+
+class _LogCapture:
+    """원격 호출 중 클라이언트가 남긴 로그를 모아 호출 측 logger로 다시 출력하기 위한 logger 대용."""
+
+    def __init__(self):
+        self.records: list[tuple[int, str]] = []
+
+    def log(self, level: int, msg: str, *args):
+        self.records.append((level, msg % args if args else str(msg)))
+
+    def debug(self, msg, *args): self.log(logging.DEBUG, msg, *args)
+    def info(self, msg, *args): self.log(logging.INFO, msg, *args)
+    def warning(self, msg, *args): self.log(logging.WARNING, msg, *args)
+    def error(self, msg, *args): self.log(logging.ERROR, msg, *args)
+
+
+class _RpcHandler(socketserver.StreamRequestHandler):
+    server: BridgeServer
+
+    def setup(self):
+        super().setup()
+        self._write_lock = threading.Lock()
+        self.focused = False
+        self.recording = False
+
+    def handle(self):
+        for line in self.rfile:
+            try:
+                req = json.loads(line)
+            except ValueError:
+                continue
+            self.server.executor.submit(self._dispatch, req)
+
+    def finish(self):
+        # 스테이지 프로세스 종료/크래시: 그 프로세스가 남긴 구독/녹화를 정리 (연결과 스틱 목록은 유지)
+        client = self.server.client
+        if self.focused:
+            client.release_device()
+        if self.recording:
+            client.stop_recording()
+        super().finish()
+
+    def _dispatch(self, req: dict):
+        rid = req.get("id")
+        method = req.get("method")
+        resp: dict[str, Any] = {"id": rid}
+        capture = None
+        try:
+            if method not in RPC_METHODS:
+                raise ValueError(f"method not allowed: {method}")
+            args = req.get("args") or []
+            kwargs = req.get("kwargs") or {}
+            if kwargs.pop("logger", False):
+                capture = kwargs["logger"] = _LogCapture()
+            resp["result"] = self.server.call(method, args, kwargs)
+            if method == "focus_device":
+                self.focused = True
+            elif method == "record_to":
+                self.recording = True
+        except Exception as e:
+            resp["error"] = str(e)
+            resp["type"] = type(e).__name__
+        if capture is not None and capture.records:
+            resp["logs"] = capture.records
+        data = (json.dumps(resp, default=_json_default) + "\n").encode()
+        with self._write_lock:
+            try:
+                self.wfile.write(data)
+                self.wfile.flush()
+            except OSError:
+                pass  # 호출 측이 이미 종료
+
+
+class BridgeServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """SolarBridgeClient를 Unix 소켓으로 노출합니다. 연결마다 스레드 하나, 요청은 공용 스레드 풀에서 동시 처리."""
+
+    daemon_threads = True
+
+    def __init__(self, client: SolarBridgeClient, path: str = DEFAULT_SOCKET_PATH, max_workers: int = 8,
+                 record_root: str | Path = "logs"):
+        self._prepare_socket_dir(os.path.dirname(path) or ".")
+        if os.path.exists(path):
+            os.unlink(path)  # 이전 감독 프로세스가 남긴 소켓
+        old_umask = os.umask(0o177)
+        try:
+            super().__init__(path, _RpcHandler)
+        finally:
+            os.umask(old_umask)
+        os.chmod(path, 0o600)
+        self.client = client
+        self.path = path
+        self.record_root = Path(record_root).resolve()
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="bridge-rpc")
+        self._thread: Optional[threading.Thread] = None
+
+    @staticmethod
+    def _prepare_socket_dir(directory: str):
+        """소켓 디렉터리를 만들고, 다른 사용자 소유이거나 그룹/기타 권한이 있으면 거부합니다."""
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+        st = os.stat(directory)
+        if st.st_mode & stat.S_ISVTX:
+            return  # /tmp 같은 공용 디렉터리를 직접 지정한 경우: 소켓 자체 권한(0600)으로 보호
+        if st.st_uid != os.getuid():
+            raise PermissionError(f"Bridge socket directory {directory} is owned by uid {st.st_uid}")
+        if stat.S_IMODE(st.st_mode) & 0o077:
+            os.chmod(directory, 0o700)
+
+    def _record_path(self, path: str) -> str:
+        """record_to 경로는 record_root(logs/) 아래의 .sbrec 파일만 허용 (소켓을 통한 임의 파일 쓰기 방지)."""
+        target = Path(path)
+        if not target.is_absolute():
+            target = Path.cwd() / target
+        target = target.parent.resolve() / target.name
+        if target.suffix != ".sbrec" or not target.is_relative_to(self.record_root):
+            raise ValueError(f"recording path must be a .sbrec file under {self.record_root}: {path}")
+        target.parent.mkdir(parents=True, exist_ok=True)
+        return str(target)
+
+    def call(self, method: str, args: list, kwargs: dict) -> Any:
+        if method == "is_connected":
+            return self.client.is_connected
+        if method == "record_to":
+            args = [self._record_path(str(args[0]))]
+        if method == "run_script":
+            script = ComplexScript()
+            script.steps = list(args[2])
+            args = [args[0], args[1], script]
+        return getattr(self.client, method)(*args, **kwargs)
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, name="bridge-server", daemon=True)
+        self._thread.start()
+
+    def close(self):
+        self.shutdown()
+        self.server_close()
+        self.executor.shutdown(wait=False)
+        try:
+            os.unlink(self.path)
+        except OSError:
+            pass
+
+
+class RemoteSolarBridgeClient:
+    """
+    BridgeServer에 붙는 SolarBridgeClient 대용. RPC_METHODS에 있는 메서드를 같은 시그니처로 제공합니다.
+    logger 인자는 서버에서 수집한 로그를 이 logger로 다시 출력하는 방식으로 전달됩니다.
+    stop()은 소켓만 닫으며 공유 세션은 감독 프로세스에 그대로 남습니다.
+    """
+
+    def __init__(self, path: str, timeout: float = RPC_TIMEOUT):
+        self.path = path
+        self.timeout = timeout
+        self._sock: Optional[socket.socket] = None
+        self._ids = itertools.count(1)
+        self._pending: dict[int, Future] = {}
+        self._lock = threading.Lock()
+        self._reader: Optional[threading.Thread] = None
+
+    def start(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.connect(self.path)
+        except OSError as e:
+            sock.close()
+            raise ConnectionError(f"Failed to connect to bridge service {self.path}: {e}") from e
+        self._sock = sock
+        self._reader = threading.Thread(target=self._read_loop, args=(sock.makefile("rb"),),
+                                        name="bridge-rpc-rx", daemon=True)
+        self._reader.start()
+
+    def stop(self):
+        sock, self._sock = self._sock, None
+        if sock is not None:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            sock.close()
+        self._fail_pending(ConnectionError("RemoteSolarBridgeClient stopped"))
+
+    def _fail_pending(self, exc: Exception):
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        for fut in pending.values():
+            if not fut.done():
+                fut.set_exception(exc)
+
+    def _read_loop(self, rfile):
+        for line in rfile:
+            try:
+                resp = json.loads(line)
+            except ValueError:
+                continue
+            with self._lock:
+                fut = self._pending.pop(resp.get("id"), None)
+            if fut is not None and not fut.done():
+                fut.set_result(resp)
+        self._fail_pending(ConnectionError(f"Bridge service connection closed ({self.path})"))
+
+    def _call(self, method: str, *args, logger=None, **kwargs) -> Any:
+        if self._sock is None:
+            raise ConnectionError("RemoteSolarBridgeClient is not connected")
+        rid = next(self._ids)
+        fut: Future = Future()
+        if logger is not None:
+            kwargs["logger"] = True
+        line = (json.dumps({"id": rid, "method": method, "args": args, "kwargs": kwargs}, default=_json_default) + "\n").encode()
+        with self._lock:
+            self._pending[rid] = fut
+            try:
+                self._sock.sendall(line)
+            except OSError as e:
+                self._pending.pop(rid, None)
+                raise ConnectionError(f"Bridge service send failed: {e}") from e
+        try:
+            resp = fut.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            with self._lock:
+                self._pending.pop(rid, None)
+            raise TimeoutError(f"Bridge service call {method} timed out")
+
+        if logger is not None:
+            for level, msg in resp.get("logs", []):
+                logger.log(level, msg)
+        if "error" in resp:
+            raise _ERROR_TYPES.get(resp.get("type"), RuntimeError)(resp["error"])
+        return resp.get("result")
+
+    def __getattr__(self, name: str):
+        if name in RPC_METHODS:
+            return lambda *args, **kwargs: self._call(name, *args, **kwargs)
+        raise AttributeError(name)
+
+    @property
+    def is_connected(self) -> bool:
+        return self._sock is not None and bool(self._call("is_connected"))
+
+    def run_script(self, target_id: str, stick_uid: str, script: ComplexScript, logger=None) -> dict:
+        return self._call("run_script", target_id, stick_uid, script.steps, logger=logger)
+
+    def record_to(self, path: str):
+        # 서버는 감독 프로세스의 작업 디렉터리 기준으로 경로를 해석하므로 절대 경로로 전달
+        return self._call("record_to", os.path.abspath(path))
+
+    def get_device_info_any(self, target_id: str, stick_uids, logger=None, attempts: int = 3):
+        uid, info = self._call("get_device_info_any", target_id, list(stick_uids), logger=logger, attempts=attempts)
+        return uid, info
@@ -0,0 +1,464 @@
+"""
+Pure-Python stand-in for the Go solar-bridge.
+
+실제 지그 없이 SolarBridgeClient와 단계별 파이프라인의 처리량/지연을 측정하기 위한 시뮬레이터입니다.
+- LoopbackTransport: paho Client 대신 SolarBridgeClient(transport=...)에 넣어 프로세스 내에서 바로 통신
+- BridgeSimulator.attach_broker(): 로컬 MQTT 브로커에 붙어 실제 Bridge처럼 동작
+"""
+
+from __future__ import annotations
+
+import heapq
+import itertools
+import json
+import logging
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional
+
+import paho.mqtt.client as mqtt
+
+# 시뮬레이터 출력 수신자: sink(topic, payload_bytes)
+Sink = Callable[[str, bytes], None]
+
+# Bridge 모델 이름 (solar-bridge/internal/models/metadata.go 와 동일 표기)
+VENDOR_NAMES = {0: "Stick", 1: "Conalog", 2: "Nanoom"}
+PRODUCT_NAMES = {0: "Stick", 1: "Guard_1_1", 2: "Guard_2_1", 3: "Booster_1_1", 4: "Booster_2_1"}
+
+UNCHANGED = 0xFFFFFFFF  # MPPT 설정에서 "변경하지 않음"
+
+
+@dataclass
+class SimConfig:
+    sticks: int = 1
+    devices: int = 8
+    latency: float = 0.02           # 명령 응답 지연 (초)
+    jitter: float = 0.01            # 지연 편차 (±초)
+    loss: float = 0.0               # 요청/비콘 손실 확률 (0~1)
+    asp_interval: int = 200         # 기본 비콘 주기 (ms)
+    vid: int = 1
+    pid: int = 4
+    version: tuple[int, int, int] = (1, 1, 0)
+    complex_api: bool = False       # False면 Complex API 요청에 UNSUPPORTED 응답
+    seed: Optional[int] = None
+
+
+@dataclass
+class SimDevice:
+    address: int                    # 48-bit 주소
+    rssi: int
+    vid: int
+    pid: int
+    version: tuple[int, int, int]
+    asp_interval: int = 200
+    vin1: int = 2000
+    vin2: int = 1900
+    iout: int = 300
+    vout: int = 3000
+    rsd1: bool = False
+    rsd2: bool = False
+    mppt: bool = False
+    max_duty: int = 400
+    min_limit: int = 0
+    max_limit: int = 400
+    bypass_condition: bool = False
+    boot_ts: float = field(default_factory=time.monotonic)
+
+    @property
+    def device_id(self) -> str:
+        return f"0x{self.address & 0xFFFFFFFF:08X}"
+
+    @property
+    def topic_id(self) -> str:
+        return f"{self.address:012X}"
+
+    @property
+    def uptime(self) -> int:
+        return int((time.monotonic() - self.boot_ts) * 1000)
+
+    def packed_version(self) -> int:
+        major, minor, patch = self.version
+        return (self.vid << 28) | (self.pid << 20) | (major << 14) | (minor << 8) | patch
+
+    def adc(self, rng: random.Random) -> tuple[int, int, int, int]:
+        vout = self.vout
+        if self.rsd1 or self.rsd2:
+            vout = 0
+        elif self.bypass_condition and self.min_limit == self.max_limit and self.max_duty:
+            # 고정 Duty: 출력 전압이 Duty 비율에 비례
+            vout = int(self.vout * min(self.min_limit, self.max_duty) / self.max_duty)
+
+        def noisy(v: int) -> int:
+            return max(0, min(0xFFFF, v + rng.randint(-5, 5))) if v else 0
+        return noisy(self.vin1), noisy(self.vin2), noisy(self.iout), noisy(vout)
+
+    def beacon(self, rng: random.Random) -> dict[str, Any]:
+        vin1, vin2, iout, vout = self.adc(rng)
+        return {"raw_0": (vin1 << 16) | vin2, "raw_1": (iout << 16) | vout, "uptime": self.uptime}
+
+
+class BridgeSimulator:
+    """
+    solar/bridge/tx, solar/simple/tx, solar/complex/tx 요청을 받아 실제 Bridge와 같은 형식으로 응답하고,
+    각 장치의 비콘(solar/mlpe/<id>/rx)을 asp_interval 주기로 발행합니다.
+    응답/비콘은 스케줄러 스레드에서 지연(latency ± jitter)과 손실(loss)을 적용해 sink로 전달됩니다.
+    """
+
+    def __init__(self, config: Optional[SimConfig] = None):
+        self.config = config or SimConfig()
+        self._rng = random.Random(self.config.seed)
+        cfg = self.config
+        self.sticks = [
+            {"uid": f"SIM{i:05d}", "port": f"/dev/ttySIM{i}", "major": 1, "minor": 0, "patch": 0}
+            for i in range(cfg.sticks)
+        ]
+        self.devices: dict[str, SimDevice] = {}
+        for _ in range(cfg.devices):
+            dev = SimDevice(
+                address=self._rng.getrandbits(48),
+                rssi=self._rng.randint(-90, -40),
+                vid=cfg.vid, pid=cfg.pid, version=cfg.version,
+                asp_interval=cfg.asp_interval,
+            )
+            self.devices[dev.device_id] = dev
+
+        # 스틱별 이웃 목록: CLEAR_NEIGHBORS 이후 비콘이 들어온 장치만 포함
+        self._neighbors: dict[str, dict[str, dict[str, Any]]] = {s["uid"]: {} for s in self.sticks}
+
+        self._sinks: list[Sink] = []
+        self._queue: list[tuple[float, int, Optional[str], Any]] = []
+        self._order = itertools.count()
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+        self._broker: Optional[mqtt.Client] = None
+
+        self.requests = 0
+        self.dropped = 0
+        self.published = 0
+
+    # --- 수명 주기 ---
+
+    def start(self):
+        if self._running:
+            return
+        self._running = True
+        now = time.monotonic()
+        for dev in self.devices.values():
+            # 장치마다 비콘 위상을 분산
+            self._schedule(now + self._rng.random() * dev.asp_interval / 1000.0, None, dev.device_id)
+        self._thread = threading.Thread(target=self._run, name="bridge-sim", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+        if self._broker is not None:
+            self._broker.loop_stop()
+            self._broker.disconnect()
+            self._broker = None
+
+    def add_sink(self, sink: Sink):
+        self._sinks.append(sink)
+
+    def remove_sink(self, sink: Sink):
+        if sink in self._sinks:
+            self._sinks.remove(sink)
+
+    def attach_broker(self, host: str = "localhost", port: int = 1883):
+        """MQTT 브로커에 연결해 요청 토픽을 구독하고 응답/비콘을 브로커로 발행합니다."""
+        client = mqtt.Client()
+
+        def on_connect(c, userdata, flags, rc):
+            if rc == 0:
+                c.subscribe([("solar/bridge/tx", 0), ("solar/simple/tx", 0), ("solar/complex/tx", 0)])
+
+        client.on_connect = on_connect
+        client.on_message = lambda c, userdata, msg: self.handle(msg.topic, msg.payload)
+        client.connect(host, port, keepalive=60)
+        client.loop_start()
+        self._broker = client
+        self.add_sink(lambda topic, payload: client.publish(topic, payload))
+
+    # --- 스케줄러 ---
+
+    def _schedule(self, due: float, topic: Optional[str], payload: Any):
+        with self._cond:
+            heapq.heappush(self._queue, (due, next(self._order), topic, payload))
+            self._cond.notify()
+
+    def _delay(self) -> float:
+        cfg = self.config
+        return max(0.0, cfg.latency + self._rng.uniform(-cfg.jitter, cfg.jitter))
+
+    def _lost(self) -> bool:
+        return self.config.loss > 0 and self._rng.random() < self.config.loss
+
+    def _reply(self, topic: str, data: dict[str, Any], extra_delay: float = 0.0):
+        self._schedule(time.monotonic() + self._delay() + extra_delay, topic, data)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._running and (not self._queue or self._queue[0][0] > time.monotonic()):
+                    timeout = self._queue[0][0] - time.monotonic() if self._queue else None
+                    self._cond.wait(timeout)
+                if not self._running:
+                    return
+                _, _, topic, payload = heapq.heappop(self._queue)
+
+            if topic is None:
+                self._emit_beacon(payload)
+            else:
+                self._publish(topic, payload)
+
+    def _publish(self, topic: str, data: dict[str, Any]):
+        raw = json.dumps(data).encode()
+        self.published += 1
+        for sink in list(self._sinks):
+            try:
+                sink(topic, raw)
+            except Exception as e:
+                logging.error(f"[BridgeSim] sink error: {e}")
+
+    def _emit_beacon(self, device_id: str):
+        dev = self.devices.get(device_id)
+        if dev is None:
+            return
+        self._schedule(time.monotonic() + dev.asp_interval / 1000.0, None, device_id)
+        if self._lost():
+            self.dropped += 1
+            return
+        for uid, seen in self._neighbors.items():
+            seen[dev.device_id] = self._neighbor_entry(dev)
+        self._publish(f"solar/mlpe/{dev.topic_id}/rx", {
+            "mlpe_packet": {"Protobuf": {"cmd": "BEACON_RAW_DATA", "beacon_raw_data": dev.beacon(self._rng)}}
+        })
+
+    def _neighbor_entry(self, dev: SimDevice) -> dict[str, Any]:
+        major, minor, patch = dev.version
+        return {
+            "id": dev.device_id,
+            "rssi": dev.rssi + self._rng.randint(-3, 3),
+            "version": f"v{major}.{minor}.{patch}",
+            "vid": VENDOR_NAMES.get(dev.vid, "Unknown"),
+            "pid": PRODUCT_NAMES.get(dev.pid, "Unknown"),
+        }
+
+    # --- 요청 처리 ---
+
+    def handle(self, topic: str, payload: bytes | str):
+        """요청 토픽(solar/*/tx)의 메시지 하나를 처리합니다."""
+        try:
+            data = json.loads(payload)
+        except ValueError:
+            return
+        self.requests += 1
+        if self._lost():
+            self.dropped += 1
+            return
+        if topic == "solar/bridge/tx":
+            self._handle_bridge(data)
+        elif topic == "solar/simple/tx":
+            self._handle_simple(data)
+        elif topic == "solar/complex/tx":
+            self._handle_complex(data)
+
+    def _handle_bridge(self, data: dict[str, Any]):
+        cmd = data.get("command")
+        seq = data.get("seq")
+        uid = data.get("stick_uid")
+        if cmd == "LIST_STICKS":
+            self._reply("solar/bridge/rx", {"type": "STICK_LIST", "seq": seq, "sticks": [dict(s) for s in self.sticks]})
+        elif cmd == "GET_NEIGHBORS" and uid in self._neighbors:
+            neighbors = list(self._neighbors[uid].values())
+            self._reply("solar/bridge/rx", {
+                "type": "SUCCESS", "command": cmd, "stick_uid": uid, "seq": seq, "data": {"neighbors": neighbors}
+            })
+        elif cmd == "CLEAR_NEIGHBORS" and uid in self._neighbors:
+            self._neighbors[uid].clear()
+            self._reply("solar/bridge/rx", {"type": "SUCCESS", "command": cmd, "stick_uid": uid, "seq": seq})
+
+    def _targets(self, target_id: str) -> list[SimDevice]:
+        if target_id in ("0x00000000", "0xFFFFFFFF"):
+            return list(self.devices.values())
+        dev = self.devices.get(target_id)
+        return [dev] if dev else []
+
+    def _handle_simple(self, data: dict[str, Any]):
+        cmd = data.get("command")
+        target_id = str(data.get("target_id", "")).upper().replace("0X", "0x")
+        base = {"command": cmd, "target_id": target_id, "stick_uid": data.get("stick_uid"), "seq": data.get("seq")}
+        if data.get("stick_uid") not in self._neighbors:
+            self._reply("solar/simple/rx", {**base, "status": "FAILED", "message": "unknown stick"})
+            return
+
+        targets = self._targets(target_id)
+        if not targets:
+            return  # 응답 없는 장치 (타임아웃)
+        for dev in targets:
+            resp = self._apply_command(dev, cmd, data.get("args") or {})
+            if resp is None:
+                self._reply("solar/simple/rx", {**base, "status": "FAILED", "message": f"unsupported command {cmd}"})
+                return
+            # 브로드캐스트는 조회 명령만 장치별로 응답
+            if len(targets) == 1 or "GET" in cmd:
+                self._reply("solar/simple/rx", {**base, "target_id": dev.device_id, "response": {"Protobuf": resp}})
+
+    def _apply_command(self, dev: SimDevice, cmd: str, args: dict[str, Any]) -> Optional[dict[str, Any]]:
+        """장치 상태를 갱신하고 Protobuf 응답 본문을 반환합니다. 지원하지 않는 명령이면 None."""
+        if cmd == "REQ_GET_INFO":
+            return {"cmd": "RESP_GET_INFO", "resp_get_info": {
+                "version": dev.packed_version(), "id_high": dev.address >> 32, "uptime": dev.uptime
+            }}
+        if cmd == "REQ_SHUTDOWN":
+            dev.rsd1 = bool(args.get("rsd1", dev.rsd1))
+            dev.rsd2 = bool(args.get("rsd2", dev.rsd2))
+            return {"cmd": "RESP_SHUTDOWN", "resp_shutdown": {"rsd1": dev.rsd1, "rsd2": dev.rsd2}}
+        if cmd == "REQ_SET_MESH_CONFIG":
+            asp = (args.get("l2") or {}).get("aspInterval")
+            if asp:
+                dev.asp_interval = max(10, int(asp))
+            return {"cmd": "RESP_SET_MESH_CONFIG", "resp_set_mesh_config": {"result": True}}
+        if cmd == "REQ_GET_MPPT_STATUS":
+            return {"cmd": "RESP_GET_MPPT_STATUS", "resp_get_mppt_status": self._mppt_status(dev)}
+        if cmd == "REQ_ENABLE_MPPT":
+            dev.mppt = bool(args.get("status", True))
+            return {"cmd": "RESP_ENABLE_MPPT", "resp_enable_mppt": {"mppt": dev.mppt}}
+        if cmd == "REQ_SET_MPPT_CONFIG":
+            for arg, attr in (("maxDuty", "max_duty"), ("dutyMinLimit", "min_limit"), ("dutyMaxLimit", "max_limit")):
+                val = args.get(arg, UNCHANGED)
+                if val != UNCHANGED:
+                    setattr(dev, attr, int(val))
+            dev.bypass_condition = bool(args.get("bypassCondition", False))
+            return {"cmd": "RESP_SET_MPPT_CONFIG", "resp_set_mppt_config": self._mppt_status(dev)}
+        if cmd == "BEACON_RAW_DATA":
+            return {"cmd": "BEACON_RAW_DATA", "beacon_raw_data": dev.beacon(self._rng)}
+        return None
+
+    @staticmethod
+    def _mppt_status(dev: SimDevice) -> dict[str, Any]:
+        return {
+            "mppt": dev.mppt, "max_duty": dev.max_duty, "min_limit": dev.min_limit,
+            "max_limit": dev.max_limit, "bypass_condition": dev.bypass_condition,
+        }
+
+    def _handle_complex(self, data: dict[str, Any]):
+        target_id = str(data.get("target_id", "")).upper().replace("0X", "0x")
+        dev = self.devices.get(target_id)
+        topic_id = dev.topic_id if dev else target_id[2:]
+        base = {"transaction_id": data.get("transaction_id"), "stick_uid": data.get("stick_uid")}
+        if not self.config.complex_api:
+            self._reply(f"solar/complex/{topic_id}/rx", {**base, "status": "UNSUPPORTED"})
+            return
+        if dev is None:
+            return
+
+        # 단계를 즉시 적용하고, 대기/수집 시간이 지난 뒤 한 번에 응답
+        results, samples, elapsed = [], [], 0.0
+        for step in data.get("steps") or []:
+            op = step.get("op")
+            if op == "command":
+                resp = self._apply_command(dev, step.get("command"), step.get("args") or {})
+                if resp is None:
+                    self._reply(f"solar/complex/{topic_id}/rx", {**base, "status": "FAILED", "results": results,
+                                                                 "message": f"unsupported command {step.get('command')}"}, elapsed)
+                    return
+                results.append(resp)
+                elapsed += self._delay()
+            elif op == "wait":
+                elapsed += step.get("ms", 0) / 1000.0
+            elif op == "capture_adc":
+                ms = step.get("ms", 0)
+                count = max(1, ms // dev.asp_interval)
+                if step.get("max_samples"):
+                    count = min(count, step["max_samples"])
+                samples += [dev.beacon(self._rng) for _ in range(count)]
+                elapsed += ms / 1000.0
+        self._reply(f"solar/complex/{topic_id}/rx", {**base, "status": "COMPLETED", "results": results, "samples": samples}, elapsed)
+
+
+class _LoopbackMessage:
+    __slots__ = ("topic", "payload")
+
+    def __init__(self, topic: str, payload: bytes):
+        self.topic = topic
+        self.payload = payload
+
+
+class LoopbackTransport:
+    """
+    SolarBridgeClient가 사용하는 paho Client 메서드만 구현한 프로세스 내 전송 계층.
+    publish()는 시뮬레이터로 바로 전달되고, 시뮬레이터 출력은 구독 필터에 맞는 것만 on_message로 전달됩니다.
+    """
+
+    def __init__(self, simulator: BridgeSimulator):
+        self.simulator = simulator
+        self.on_message = None
+        self.on_connect = None
+        self.on_subscribe = None
+        self.on_disconnect = None
+        self._filters: set[str] = set()
+        self._connected = False
+        self._mids = itertools.count(1)
+
+    def reconnect_delay_set(self, min_delay: int = 1, max_delay: int = 120):
+        pass
+
+    def connect(self, host: str = "localhost", port: int = 1883, keepalive: int = 60):
+        self.simulator.add_sink(self._deliver)
+
+    def loop_start(self):
+        self.simulator.start()
+        self._connected = True
+        if self.on_connect:
+            self.on_connect(self, None, {}, 0)
+
+    def loop_stop(self):
+        pass
+
+    def disconnect(self):
+        self._set_disconnected(0)
+        self.simulator.remove_sink(self._deliver)
+
+    def drop_connection(self, reconnect_after: Optional[float] = 1.0):
+        """연결 끊김을 흉내냅니다. reconnect_after초 후 자동으로 재연결합니다."""
+        self._set_disconnected(7)
+        if reconnect_after is not None:
+            threading.Timer(reconnect_after, self.loop_start).start()
+
+    def _set_disconnected(self, rc: int):
+        if not self._connected:
+            return
+        self._connected = False
+        self._filters.clear()  # 브로커 세션 초기화
+        if self.on_disconnect:
+            self.on_disconnect(self, None, rc)
+
+    def publish(self, topic: str, payload: Any = None, qos: int = 0, retain: bool = False):
+        if self._connected:
+            self.simulator.handle(topic, payload)
+
+    def subscribe(self, topic: Any, qos: int = 0):
+        topics = [t for t, _ in topic] if isinstance(topic, list) else [topic]
+        self._filters.update(topics)
+        mid = next(self._mids)
+        if self.on_subscribe:
+            self.on_subscribe(self, None, mid, tuple(0 for _ in topics))
+        return 0, mid
+
+    def unsubscribe(self, topic: str):
+        self._filters.discard(topic)
+        return 0, next(self._mids)
+
+    def _deliver(self, topic: str, payload: bytes):
+        if not self._connected or self.on_message is None:
+            return
+        if any(mqtt.topic_matches_sub(f, topic) for f in self._filters):
+            self.on_message(self, None, _LoopbackMessage(topic, payload))
@@ -3,10 +3,39 @@ import abc
 import json
 import logging
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from typing import Any
 from pocketbase import PocketBase
 from packaging.version import parse
 from common.logging_utils import log_event
+from common.result_spool import ResultSpool, UPLOAD_OK, UPLOAD_RETRY, UPLOAD_REJECTED
+
+def create_http_session(pool_size: int = 4, retries: int = 2, backoff: float = 0.3) -> requests.Session:
+    """
+    keep-alive 연결을 재사용하는 공용 HTTP 세션 (호출마다 TCP+TLS 연결을 새로 맺지 않음).
+    연결 실패는 모든 메서드를, 5xx/429 응답은 GET/HEAD만 backoff 후 재시도합니다.
+    """
+    retry = Retry(total=retries, connect=retries, read=retries, status=retries, backoff_factor=backoff,
+                  status_forcelist=(429, 502, 503, 504), allowed_methods=frozenset({"GET", "HEAD"}),
+                  raise_on_status=False)
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def firmware_query(vendor: str, product: str, fw_type: str) -> tuple[str, str, str]:
+    """
+    펌웨어 조회에 쓰는 (vendor, product, type).
+    bootloader인 경우 vendor, product, type을 모두 "bootloader"로 고정하고
+    그 외의 경우는 모두 "application"으로 처리 (FirmwareType Enum 의존성 제거)
+    """
+    if fw_type == "bootloader":
+        return "bootloader", "bootloader", "bootloader"
+    return vendor, product, "application"
+
 
 class DBServer(abc.ABC):
     @abc.abstractmethod
@@ -24,33 +53,89 @@ class DBServer(abc.ABC):
         """Vendor, Product, Type에 맞는 펌웨어를 다운로드하고 (바이너리, 버전) 튜플을 반환합니다."""
         pass
 
+    @abc.abstractmethod
+    def get_firmware_record(self, vendor: str, product: str, fw_type: str = "application", logger: logging.Logger | None = None) -> dict[str, Any] | None:
+        """최신 펌웨어 레코드의 메타데이터 {id, version, updated, url}를 조회합니다."""
+        pass
+
+    @abc.abstractmethod
+    def fetch_firmware(self, record: dict[str, Any], logger: logging.Logger | None = None) -> bytes | None:
+        """get_firmware_record()가 반환한 레코드의 바이너리를 다운로드합니다."""
+        pass
+
     @abc.abstractmethod
     def get_jig_config(self, jig_id: str, logger: logging.Logger | None = None) -> dict[str, Any] | None:
         """jig_id에 해당하는 설정을 서버에서 가져옵니다."""
         pass
 
+    def close(self) -> None:
+        """백그라운드 작업(업로드 대기열 등)을 정리합니다."""
+        pass
+
 class TestDBServer(DBServer):
     """PocketBase 기반 테스트 서버 구현"""
-    def __init__(self, url: str, collection: str, factory_id: str):
+    # 최신 펌웨어 조회 시 받는 상위 레코드 수와 필드 (get_file_url에 collectionId/collectionName 필요)
+    FIRMWARE_LATEST_WINDOW = 5
+    FIRMWARE_FIELDS = "id,collectionId,collectionName,version,firmware,updated,created"
+
+    def __init__(self, url: str, collection: str, factory_id: str, spool_path: str | None = None,
+                 batch_size: int = 50, batch_age: float = 2.0, batch_mode: str = "auto"):
         self.url = url.rstrip('/')
         self.collection = collection
         self.factory_id = factory_id # RELATION_RECORD_ID 매칭용 (예: 지그 ID 또는 공장 ID)
-        self.pb = PocketBase(self.url)
+        # 모든 HTTP 호출(push_log/health_check/펌웨어 다운로드/업로드 대기열)이 같은 연결 풀을 사용
+        self.session = create_http_session()
+        self._http_client = None
+        self.pb = self._create_pocketbase()
+        # 결과 업로드 대기열: push_log는 로컬 기록만 하고 업로드는 백그라운드에서 재시도
+        self.spool: ResultSpool | None = None
+        # 백그라운드 업로드 로그 (push_log에 전달된 logger)
+        self.logger: logging.Logger | None = None
+        # /api/batch 지원 여부: None=미확인, False이면 레코드별 전송
+        self._batch_api: bool | None = None if batch_mode == "auto" else batch_mode == "batch"
+        if spool_path:
+            self.spool = ResultSpool(spool_path, self._upload_spooled, upload_batch=self._upload_batch,
+                                     batch_size=batch_size, batch_age=batch_age)
+            self.spool.start()
 
-    def push_log(self, data: dict[str, Any], logger: logging.Logger | None = None) -> bool:
-        endpoint = f"{self.url}/api/collections/{self.collection}/records"
+    def _create_pocketbase(self) -> PocketBase:
+        """PocketBase SDK도 keep-alive httpx 클라이언트를 쓰도록 전달합니다. (http_client 인자를 지원하지 않는 버전은 기본값 사용)"""
+        try:
+            import httpx
+            self._http_client = httpx.Client(
+                timeout=10.0, limits=httpx.Limits(max_keepalive_connections=4),
+                transport=httpx.HTTPTransport(retries=2),
+            )
+            return PocketBase(self.url, http_client=self._http_client)
+        except (ImportError, TypeError):
+            if self._http_client is not None:
+                self._http_client.close()
+                self._http_client = None
+            return PocketBase(self.url)
 
+    def _build_payload(self, data: dict[str, Any]) -> dict[str, Any]:
         # Extract new fields from data and build the 4-column payload
         # data.pop() removes the field from data so remaining data becomes 'log'
-        payload = {
+        return {
             "jig": self.factory_id,
             "deviceid": data.pop("deviceid", ""),
             "message": data.pop("message", ""),
             "log": data  # Remaining: test, code, details, boot_data
         }
 
+    def push_log(self, data: dict[str, Any], logger: logging.Logger | None = None) -> bool:
+        payload = self._build_payload(data)
+        if self.spool is not None:
+            if self.logger is None:
+                self.logger = self.spool.logger = logger
+            record_id = self.spool.enqueue(payload)
+            if logger:
+                log_event(logger, event="db.push.spooled", level=logging.DEBUG, data={"server": "test", "id": record_id})
+            return True
+
+        endpoint = f"{self.url}/api/collections/{self.collection}/records"
         try:
-            response = requests.post(endpoint, json=payload, timeout=5.0)
+            response = self.session.post(endpoint, json=payload, timeout=5.0)
             if response.status_code != 200 and response.status_code != 201:
                 # 에러 상세 내용 확인
                 error_info = response.json() if response.headers.get('Content-Type') == 'application/json' else response.text
@@ -71,11 +156,73 @@ class TestDBServer(DBServer):
                 log_event(logger, event="db.push.exception", level=logging.WARNING, data={"server": "test", "error": str(e)})
             return False
 
+    def _upload_spooled(self, record_id: str, payload: dict[str, Any]) -> str:
+        """대기열 레코드 하나를 record_id로 생성합니다. 같은 ID가 이미 있으면(이전 시도가 저장됨) 성공으로 봅니다."""
+        endpoint = f"{self.url}/api/collections/{self.collection}/records"
+        try:
+            response = self.session.post(endpoint, json={**payload, "id": record_id}, timeout=5.0)
+        except requests.RequestException:
+            return UPLOAD_RETRY
+        if response.status_code in (200, 201):
+            return UPLOAD_OK
+        if response.status_code == 400:
+            try:
+                exists = self.session.get(f"{endpoint}/{record_id}", params={"fields": "id"}, timeout=5.0).status_code == 200
+            except requests.RequestException:
+                return UPLOAD_RETRY
+            if exists:
+                return UPLOAD_OK
+            if self.logger:
+                log_event(self.logger, event="db.spool.rejected", level=logging.WARNING,
+                          data={"server": "test", "id": record_id, "status": response.status_code, "error": response.text[:500]})
+            return UPLOAD_REJECTED
+        return UPLOAD_RETRY  # 401/403/404(설정 오류)도 수정 후 전송되도록 보관
+
+    def _upload_batch(self, records: list[tuple[str, dict[str, Any]]]) -> dict[str, str]:
+        """
+        대기열 레코드 묶음을 PocketBase /api/batch 요청 하나로 생성합니다 (트랜잭션: 전부 저장 또는 전부 실패).
+        batch API가 꺼져 있거나(403) 없는(404) 서버, 또는 묶음 중 일부가 거부된 경우 레코드별 전송으로 처리합니다.
+        """
+        if self._batch_api is not False and len(records) > 1:
+            requests_body = [
+                {"method": "POST", "url": f"/api/collections/{self.collection}/records", "body": {**payload, "id": record_id}}
+                for record_id, payload in records
+            ]
+            try:
+                response = self.session.post(f"{self.url}/api/batch", json={"requests": requests_body}, timeout=15.0)
+            except requests.RequestException:
+                return {record_id: UPLOAD_RETRY for record_id, _ in records}  # 전부 재시도
+            if response.status_code == 200:
+                self._batch_api = True
+                return {record_id: UPLOAD_OK for record_id, _ in records}
+            if response.status_code in (403, 404):
+                self._batch_api = False
+            elif response.status_code != 400:
+                return {record_id: UPLOAD_RETRY for record_id, _ in records}
+            if self.logger:
+                log_event(self.logger, event="db.spool.batch_fallback", level=logging.INFO,
+                          data={"server": "test", "status": response.status_code, "records": len(records)})
+            # 400: 일부 레코드 실패(중복 ID 포함)로 묶음 전체가 롤백됨 -> 레코드별로 판정
+
+        results: dict[str, str] = {}
+        for record_id, payload in records:
+            results[record_id] = self._upload_spooled(record_id, payload)
+            if results[record_id] == UPLOAD_RETRY:
+                break
+        return results
+
+    def close(self) -> None:
+        if self.spool is not None:
+            self.spool.close()
+        self.session.close()
+        if self._http_client is not None:
+            self._http_client.close()
+
     def health_check(self, logger: logging.Logger | None = None) -> bool:
         # PocketBase health check endpoint
         endpoint = f"{self.url}/api/health"
         try:
-            response = requests.get(endpoint, timeout=3.0)
+            response = self.session.get(endpoint, timeout=3.0)
             response.raise_for_status()
             # PocketBase returns {"code": 200, "message": "Health check successful", "data": {...}}
             return response.status_code == 200
@@ -84,41 +231,24 @@ class TestDBServer(DBServer):
                 log_event(logger, event="db.health_check.fail", level=logging.WARNING, data={"server": "test", "error": str(e)})
             return False
 
-    def download_firmware(self, vendor: str, product: str, fw_type: str = "application", logger: logging.Logger | None = None) -> tuple[bytes, str] | None:
-        """Vendor, Product, Type에 맞는 펌웨어를 다운로드하고 (바이너리, 버전) 튜플을 반환합니다."""
+    def get_firmware_record(self, vendor: str, product: str, fw_type: str = "application", logger: logging.Logger | None = None) -> dict[str, Any] | None:
+        """최신 펌웨어 레코드의 메타데이터 {id, version, updated, url}를 조회합니다. (바이너리는 받지 않음)"""
         try:
-            # bootloader인 경우 vendor, product, type을 모두 "bootloader"로 고정
-            # 그 외의 경우는 모두 "application"으로 처리 (FirmwareType Enum 의존성 제거)
-            if fw_type == "bootloader":
-                vendor = "bootloader"
-                product = "bootloader"
-                query_fw_type = "bootloader"
-            else:
-                query_fw_type = "application"
-
+            vendor, product, query_fw_type = firmware_query(vendor, product, fw_type)
             filter_str = f'vendor = "{vendor}" && product = "{product}" && type = "{query_fw_type}"'
             
             if logger:
                 log_event(logger, event="db.download_firmware.start", level=logging.INFO, 
                           data={"vendor": vendor, "product": product, "type": query_fw_type})
 
-            # factory_firmwares_2 컬렉션에서 필터링된 리스트 가져오기
-            records = self.pb.collection('factory_firmwares_2').get_full_list(query_params={
-                "filter": filter_str
-            })
+            latest_record = self._latest_firmware_record(filter_str, logger=logger)
 
-            if not records:
+            if latest_record is None:
                 if logger:
                     log_event(logger, event="db.download_firmware.not_found", level=logging.WARNING, 
                               data={"vendor": vendor, "product": product, "type": fw_type})
                 return None
 
-            # 최신 버전 찾기 (Semantic Versioning 비교)
-            latest_record = max(
-                records, 
-                key=lambda r: parse(getattr(r, "version", "0.0.0"))
-            )
-            
             latest_version = getattr(latest_record, "version", "unknown")
             file_field_value = getattr(latest_record, "firmware", None)
 
@@ -128,19 +258,64 @@ class TestDBServer(DBServer):
                               data={"vendor": vendor, "product": product, "version": latest_version})
                 return None
 
-            # 다운로드 URL 생성 및 실행
-            file_url = self.pb.get_file_url(latest_record, file_field_value)
-            response = requests.get(file_url, timeout=10.0)
+            return {
+                "id": getattr(latest_record, "id", ""),
+                "version": latest_version,
+                "updated": str(getattr(latest_record, "updated", "")),
+                "url": self.pb.get_file_url(latest_record, file_field_value),
+            }
+
+        except Exception as e:
+            if logger:
+                log_event(logger, event="db.download_firmware.exception", level=logging.ERROR, 
+                          data={"error": str(e)})
+            return None
+
+    def _latest_firmware_record(self, filter_str: str, logger: logging.Logger | None = None) -> Any | None:
+        """
+        최신 버전 레코드를 서버 정렬(-created)로 상위 FIRMWARE_LATEST_WINDOW개만 받아 고릅니다.
+        버전 문자열은 서버에서 semver 순으로 정렬할 수 없으므로, 받은 목록이 조건에 맞는 레코드 전체일 때만 그 안에서 고르고
+        (예전 버전 핫픽스가 나중에 여러 개 올라오면 최신 버전이 창 밖으로 밀려날 수 있음),
+        그 외에는 전체 목록(필드 제한)에서 semver 최댓값을 찾습니다. 조회 자체가 실패해도 기존 방식으로 조회합니다.
+        """
+        collection = self.pb.collection('factory_firmwares_2')
+        query = {"filter": filter_str, "sort": "-created", "fields": self.FIRMWARE_FIELDS}
+        try:
+            page = collection.get_list(1, self.FIRMWARE_LATEST_WINDOW, query_params=query)
+        except Exception as e:
+            # sort/fields를 지원하지 않는 서버(ClientResponseError 400 등): 기존 방식(전체 목록 + semver)으로 조회
+            if logger:
+                log_event(logger, event="db.download_firmware.query_fallback", level=logging.WARNING,
+                          data={"error": str(e)})
+            page = None
+        if page is not None:
+            items = page.items
+            if not items:
+                return None
+            if len(items) >= page.total_items:
+                return max(items, key=lambda r: parse(getattr(r, "version", "0.0.0")))
+
+        # 최신 버전 찾기 (Semantic Versioning 비교)
+        full_query = {"filter": filter_str} if page is None else {"filter": filter_str, "fields": self.FIRMWARE_FIELDS}
+        records = collection.get_full_list(query_params=full_query)
+        if not records:
+            return None
+        return max(records, key=lambda r: parse(getattr(r, "version", "0.0.0")))
+
+    def fetch_firmware(self, record: dict[str, Any], logger: logging.Logger | None = None) -> bytes | None:
+        """get_firmware_record()가 반환한 레코드의 바이너리를 다운로드합니다."""
+        try:
+            response = self.session.get(record["url"], timeout=10.0)
             
             if response.status_code == 200:
                 if logger:
                     log_event(logger, event="db.download_firmware.ok", level=logging.INFO, 
-                              data={"vendor": vendor, "product": product, "version": latest_version, "size": len(response.content)})
-                return response.content, latest_version
+                              data={"version": record["version"], "size": len(response.content)})
+                return response.content
             else:
                 if logger:
                     log_event(logger, event="db.download_firmware.fail", level=logging.WARNING, 
-                              data={"status": response.status_code, "url": file_url})
+                              data={"status": response.status_code, "url": record["url"]})
                 return None
 
         except Exception as e:
@@ -149,6 +324,14 @@ class TestDBServer(DBServer):
                           data={"error": str(e)})
             return None
 
+    def download_firmware(self, vendor: str, product: str, fw_type: str = "application", logger: logging.Logger | None = None) -> tuple[bytes, str] | None:
+        """Vendor, Product, Type에 맞는 펌웨어를 다운로드하고 (바이너리, 버전) 튜플을 반환합니다."""
+        record = self.get_firmware_record(vendor, product, fw_type, logger=logger)
+        if record is None:
+            return None
+        data = self.fetch_firmware(record, logger=logger)
+        return (data, record["version"]) if data is not None else None
+
     def get_jig_config(self, jig_id: str, logger: logging.Logger | None = None) -> dict[str, Any] | None:
         """factory_config 컬렉션에서 설정을 조회합니다."""
         try:
@@ -224,17 +407,34 @@ class RealDBServer(DBServer):
         prefix = b"BOOT_" if fw_type == "bootloader" else b"APP_"
         return prefix + b"\x00\x01\x02\x03_REAL_FIRMWARE_PLACEHOLDER", "1.0.0-real"
 
+    def get_firmware_record(self, vendor: str, product: str, fw_type: str = "application", logger: logging.Logger | None = None) -> dict[str, Any] | None:
+        vendor, product, query_fw_type = firmware_query(vendor, product, fw_type)
+        return {"id": f"real-{vendor}-{product}-{query_fw_type}", "version": "1.0.0-real", "updated": "", "url": "",
+                "type": fw_type}
+
+    def fetch_firmware(self, record: dict[str, Any], logger: logging.Logger | None = None) -> bytes | None:
+        fw_type = record.get("type", "application")
+        res = self.download_firmware("", "", fw_type=fw_type, logger=logger)
+        return res[0] if res else None
+
     def get_jig_config(self, jig_id: str, logger: logging.Logger | None = None) -> dict[str, Any] | None:
         return None
 
-def create_db_server(config: dict[str, Any], jig_id: str) -> DBServer | None:
-    """설정에 따라 적절한 DBServer 객체를 생성합니다."""
+def create_db_server(config: dict[str, Any], jig_id: str, spool: bool = True) -> DBServer | None:
+    """
+    설정에 따라 적절한 DBServer 객체를 생성합니다.
+    spool=True이면 결과 업로드 대기열(result_spool, 비우면 사용 안 함)과 업로더 스레드를 사용합니다.
+    """
     server_type = config.get("type", "none").lower()
     url = config.get("url")
 
     if server_type == "test":
         collection = config.get("collection", "factory_logs_2")
-        return TestDBServer(url=url, collection=collection, factory_id=jig_id)
+        spool_path = config.get("result_spool", "logs/result_spool.sqlite3") if spool else None
+        return TestDBServer(url=url, collection=collection, factory_id=jig_id, spool_path=spool_path,
+                            batch_size=int(config.get("upload_batch_size", 50)),
+                            batch_age=float(config.get("upload_batch_age", 2.0)),
+                            batch_mode=config.get("upload_batch_mode", "auto"))
     elif server_type == "real":
         api_key = config.get("api_key", "")
         return RealDBServer(url=url, api_key=api_key)
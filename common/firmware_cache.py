@@ -0,0 +1,320 @@
+"""
+Content-addressed local firmware cache.
+
+바이너리는 sha256 이름(blobs/<sha256>.bin)으로 한 번만 저장하고, index.json에
+(vendor, product, type)별 최신 레코드 {record_id, version, updated, sha256, checked}를 기록합니다.
+ttl 이내에는 서버에 묻지 않고, 지나면 메타데이터만 조회해 레코드 id/updated가 같으면 다운로드를 생략합니다.
+FirmwareWatcher가 실행 중이고 마지막 prefetch가 성공했으면 새 빌드를 미리 받아 두므로 get()은 서버에 묻지 않습니다.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Optional
+
+from common.config_utils import load_json, atomic_save_json, ConfigError
+from common.db_server import firmware_query
+from common.logging_utils import log_event
+
+
+@dataclass(frozen=True)
+class CachedFirmware:
+    version: str
+    sha256: str
+    data: bytes
+    path: str            # 캐시 파일 (blobs/<sha256>.bin)
+    record_id: str = ""
+
+
+def _atomic_write_bytes(path: Path, data: bytes) -> None:
+    with tempfile.NamedTemporaryFile("wb", dir=path.parent, delete=False) as tf:
+        tf.write(data)
+        tf.flush()
+        os.fsync(tf.fileno())
+    os.replace(tf.name, path)
+
+
+def write_if_changed(path: str | Path, data: bytes) -> bool:
+    """path의 내용이 data와 다를 때만 (원자적으로) 씁니다. 썼으면 True."""
+    p = Path(path)
+    try:
+        if p.stat().st_size == len(data) and p.read_bytes() == data:
+            return False
+    except FileNotFoundError:
+        pass
+    p.parent.mkdir(parents=True, exist_ok=True)
+    _atomic_write_bytes(p, data)
+    return True
+
+
+class FirmwareCache:
+    """
+    DBServer의 get_firmware_record()/fetch_firmware()를 감싸는 펌웨어 캐시.
+    최근 사용한 바이너리는 메모리에 유지합니다. 서버에 연결할 수 없으면 마지막으로 받은 버전을 사용합니다.
+    """
+
+    def __init__(self, db_server, root: str | Path = "./firmware/cache", ttl: float = 300.0,
+                 logger: Optional[logging.Logger] = None):
+        self.db_server = db_server
+        self.root = Path(root)
+        self.blob_dir = self.root / "blobs"
+        self.blob_dir.mkdir(parents=True, exist_ok=True)
+        self.index_path = self.root / "index.json"
+        self.ttl = ttl
+        self.logger = logger
+        self._lock = threading.RLock()
+        self.watcher: Optional[FirmwareWatcher] = None
+        self._memory: dict[str, bytes] = {}
+        # 진행 중인 다운로드 ((record_id, updated) -> Future). 같은 빌드를 get()과 watcher가 동시에 받지 않도록 공유
+        self._downloads: dict[tuple[str, str], Future] = {}
+        # 인덱스에 반영 전인 prefetch 빌드 (메모리에서 내리지 않음)
+        self._pinned: set[str] = set()
+        try:
+            self._index: dict[str, dict[str, Any]] = load_json(self.index_path)
+        except ConfigError:
+            self._index = {}
+
+    @staticmethod
+    def key(vendor: str, product: str, fw_type: str) -> str:
+        return "/".join(firmware_query(vendor, product, fw_type))
+
+    def _blob_path(self, sha256: str) -> Path:
+        return self.blob_dir / f"{sha256}.bin"
+
+    def _load_blob(self, sha256: str) -> Optional[bytes]:
+        """메모리 또는 디스크에서 바이너리를 읽고 해시를 검증합니다. 없거나 손상되었으면 None."""
+        data = self._memory.get(sha256)
+        if data is not None:
+            return data
+        try:
+            data = self._blob_path(sha256).read_bytes()
+        except FileNotFoundError:
+            return None
+        if hashlib.sha256(data).hexdigest() != sha256:
+            return None
+        self._memory[sha256] = data
+        return data
+
+    def _store_blob(self, data: bytes) -> str:
+        sha256 = hashlib.sha256(data).hexdigest()
+        path = self._blob_path(sha256)
+        if not path.exists():
+            _atomic_write_bytes(path, data)
+        self._memory[sha256] = data
+        return sha256
+
+    def _save_index(self):
+        atomic_save_json(self.index_path, self._index)
+        # 교체된 이전 빌드는 메모리에서 내림 (디스크 blob은 유지)
+        live = {e["sha256"] for e in self._index.values()} | self._pinned
+        for sha256 in [h for h in self._memory if h not in live]:
+            self._memory.pop(sha256, None)
+
+    def _from_entry(self, entry: dict[str, Any]) -> Optional[CachedFirmware]:
+        data = self._load_blob(entry["sha256"])
+        if data is None:
+            return None
+        return CachedFirmware(version=entry["version"], sha256=entry["sha256"], data=data,
+                              path=str(self._blob_path(entry["sha256"])), record_id=entry.get("record_id", ""))
+
+    def peek(self, vendor: str, product: str, fw_type: str) -> Optional[CachedFirmware]:
+        """서버를 조회하지 않고 캐시에 있는 버전을 반환합니다."""
+        with self._lock:
+            entry = self._index.get(self.key(vendor, product, fw_type))
+            return self._from_entry(entry) if entry else None
+
+    def get(self, vendor: str, product: str, fw_type: str = "application") -> Optional[CachedFirmware]:
+        """
+        최신 펌웨어를 반환합니다.
+        ttl 이내: 서버 조회 없음 / ttl 경과: 메타데이터 조회 후 레코드가 바뀐 경우에만 다운로드.
+        """
+        key = self.key(vendor, product, fw_type)
+        with self._lock:
+            entry = self._index.get(key)
+            cached = self._from_entry(entry) if entry else None
+            if cached is not None and (time.time() - entry.get("checked", 0) < self.ttl or self.watching):
+                return cached
+
+        # 메타데이터 조회/다운로드는 잠금 없이 (watcher의 prefetch와 진행 중인 다운로드를 공유)
+        record = self.db_server.get_firmware_record(vendor, product, fw_type, logger=self.logger)
+        if record is None:
+            if cached is not None and self.logger:
+                log_event(self.logger, event="firmware.cache.stale", level=logging.WARNING,
+                          data={"key": key, "version": cached.version})
+            return cached  # 서버 연결 불가: 마지막으로 받은 버전 사용
+
+        with self._lock:
+            # 조회하는 동안 watcher가 이미 교체했을 수 있음
+            if self._is_current(key, record):
+                entry = self._index[key]
+                entry["checked"] = time.time()
+                self._save_index()
+                return self._from_entry(entry)
+
+        return self._install(key, record)
+
+    def get_many(self, vendor: str, product: str, fw_types: tuple[str, ...] = ("bootloader", "application")) -> dict[str, Optional[CachedFirmware]]:
+        """
+        여러 종류를 한 번에 조회합니다. 갱신은 잠금 없이 종류별로 하고, 반환값은 잠금 안에서 같은 시점의 인덱스로 만들므로
+        도중에 FirmwareWatcher가 교체하더라도 섞이지 않은 조합을 반환합니다.
+        """
+        images = {t: self.get(vendor, product, t) for t in fw_types}
+        with self._lock:
+            for t, fw in images.items():
+                entry = self._index.get(self.key(vendor, product, t))
+                if fw is not None and entry:
+                    images[t] = self._from_entry(entry) or fw
+        return images
+
+    @property
+    def watching(self) -> bool:
+        """watcher가 실행 중이고 마지막 prefetch가 성공했는지 (실패 중이면 get()은 ttl 기준으로 다시 조회)."""
+        return self.watcher is not None and self.watcher.is_alive() and self.watcher.healthy
+
+    def _fetch(self, record: dict[str, Any]) -> Optional[bytes]:
+        """레코드의 바이너리를 받습니다 (잠금 없이). 같은 레코드를 다른 스레드가 받는 중이면 그 결과를 기다립니다."""
+        ident = (record["id"], record["updated"])
+        with self._lock:
+            fut = self._downloads.get(ident)
+            owner = fut is None
+            if owner:
+                fut = self._downloads[ident] = Future()
+        if not owner:
+            return fut.result()
+        try:
+            data = self.db_server.fetch_firmware(record, logger=self.logger)
+            fut.set_result(data)
+            return data
+        except BaseException as e:
+            fut.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._downloads.pop(ident, None)
+
+    def _stage(self, key: str, record: dict[str, Any], data: bytes) -> Optional[dict[str, Any]]:
+        """받은 바이너리를 저장/검증하고 인덱스 항목을 만듭니다. (인덱스에는 아직 반영하지 않음, self._lock 안에서 호출)"""
+        sha256 = self._store_blob(data)
+        # 디스크에 쓴 내용 검증 (잘린/손상된 파일이면 메모리 사본도 버리고 다음에 다시 받음)
+        self._memory.pop(sha256, None)
+        if self._load_blob(sha256) is None:
+            self._blob_path(sha256).unlink(missing_ok=True)
+            if self.logger:
+                log_event(self.logger, event="firmware.cache.verify_fail", level=logging.WARNING,
+                          data={"key": key, "version": record["version"]})
+            return None
+        if self.logger:
+            log_event(self.logger, event="firmware.cache.update", level=logging.INFO,
+                      data={"key": key, "version": record["version"], "sha256": sha256[:12], "size": len(data)})
+        return {
+            "record_id": record["id"],
+            "version": record["version"],
+            "updated": record["updated"],
+            "sha256": sha256,
+            "size": len(data),
+            "checked": time.time(),
+        }
+
+    def _install(self, key: str, record: dict[str, Any]) -> Optional[CachedFirmware]:
+        data = self._fetch(record)
+        if not data:
+            return None
+        with self._lock:
+            entry = self._stage(key, record, data)
+            if entry is None:
+                return None
+            self._index[key] = entry
+            self._save_index()
+            return self._from_entry(entry)
+
+    def _is_current(self, key: str, record: dict[str, Any]) -> bool:
+        with self._lock:
+            entry = self._index.get(key)
+            return bool(entry) and entry.get("record_id") == record["id"] and entry.get("updated") == record["updated"] \
+                and self._load_blob(entry["sha256"]) is not None
+
+    def prefetch(self, vendor: str, product: str, fw_types: tuple[str, ...] = ("bootloader", "application")) -> Optional[list[str]]:
+        """
+        서버의 최신 레코드를 확인해 바뀐 빌드를 미리 받아 둡니다. 조회/다운로드는 잠금 없이 진행하고,
+        모든 종류가 준비되면 인덱스를 한 번에 교체합니다. 교체된 key 목록을 반환합니다 (조회/다운로드 실패 시 None).
+        """
+        staged: dict[str, dict[str, Any]] = {}
+        checked: list[str] = []
+        try:
+            for fw_type in fw_types:
+                key = self.key(vendor, product, fw_type)
+                record = self.db_server.get_firmware_record(vendor, product, fw_type, logger=self.logger)
+                if record is None:
+                    return None  # 서버 연결 불가: 일부만 교체하지 않음
+                if self._is_current(key, record):
+                    checked.append(key)
+                    continue
+                data = self._fetch(record)
+                if not data:
+                    return None
+                with self._lock:
+                    new_entry = self._stage(key, record, data)
+                    if new_entry is None:
+                        return None
+                    self._pinned.add(new_entry["sha256"])
+                staged[key] = new_entry
+
+            with self._lock:
+                now = time.time()
+                for key in checked:
+                    if key in self._index:
+                        self._index[key]["checked"] = now
+                if staged:
+                    self._index.update(staged)
+                    self._save_index()
+            return list(staged)
+        finally:
+            with self._lock:
+                self._pinned.difference_update(e["sha256"] for e in staged.values())
+
+
+class FirmwareWatcher(threading.Thread):
+    """interval초마다 FirmwareCache.prefetch()로 새 빌드를 받아 두는 백그라운드 스레드."""
+
+    def __init__(self, cache: FirmwareCache, vendor: str, product: str,
+                 fw_types: tuple[str, ...] = ("bootloader", "application"), interval: float = 60.0,
+                 logger: Optional[logging.Logger] = None):
+        super().__init__(name="firmware-watcher", daemon=True)
+        self.cache = cache
+        self.vendor = vendor
+        self.product = product
+        self.fw_types = fw_types
+        self.interval = interval
+        self.logger = logger
+        self.healthy = False  # 마지막 prefetch 성공 여부
+        self._stop_event = threading.Event()
+
+    def start(self):
+        self.cache.watcher = self
+        super().start()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            try:
+                updated = self.cache.prefetch(self.vendor, self.product, self.fw_types)
+                self.healthy = updated is not None
+                if updated and self.logger:
+                    log_event(self.logger, event="firmware.watch.switched", level=logging.INFO, data={"keys": updated})
+            except Exception as e:
+                self.healthy = False
+                if self.logger:
+                    log_event(self.logger, event="firmware.watch.error", level=logging.WARNING, data={"error": str(e)})
+            self._stop_event.wait(self.interval)
+
+    def stop(self):
+        self._stop_event.set()
+        if self.cache.watcher is self:
+            self.cache.watcher = None
@@ -0,0 +1,139 @@
+"""
+MQTT session recorder / replayer for the Solar Bridge client.
+
+파일 형식 (append-only, little-endian):
+    헤더  b"SBREC1\\n"
+    레코드 <d ts><B direction><H topic_len><I payload_len> topic payload
+ts는 녹화 시작 기준 monotonic 초, direction은 0=RX(Bridge→클라이언트), 1=TX(클라이언트→Bridge).
+ts가 세션마다 0부터 시작하므로 파일 하나에는 세션 하나만 기록합니다 (session_path()로 세션별 파일명 생성).
+"""
+
+from __future__ import annotations
+
+import os
+import struct
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Iterator, Optional
+
+MAGIC = b"SBREC1\n"
+RX = 0
+TX = 1
+
+_HEADER = struct.Struct("<dBHI")
+
+
+@dataclass(frozen=True)
+class Record:
+    ts: float
+    direction: int
+    topic: str
+    payload: bytes
+
+
+def session_path(directory: str | Path, prefix: str = "bridge") -> Path:
+    """세션별 녹화 파일 경로 (<directory>/<prefix>_<HHMMSS>_<pid>.sbrec). 재시작해도 이전 세션에 이어 쓰지 않습니다."""
+    return Path(directory) / f"{prefix}_{time.strftime('%H%M%S')}_{os.getpid()}.sbrec"
+
+
+class RecordedMessage:
+    """paho MQTTMessage 대용 (topic, payload만 사용)."""
+    __slots__ = ("topic", "payload")
+
+    def __init__(self, topic: str, payload: bytes):
+        self.topic = topic
+        self.payload = payload
+
+
+class MqttRecorder:
+    """
+    TX/RX 메시지를 새 파일에 순서대로 기록합니다. 여러 스레드에서 호출해도 안전합니다.
+    이미 있는 파일에는 이어 쓰지 않습니다 (FileExistsError).
+    """
+
+    def __init__(self, path: str | Path, flush_interval: float = 1.0):
+        self.path = str(path)
+        self.flush_interval = flush_interval
+        self._fp = open(path, "xb")
+        self._fp.write(MAGIC)
+        self._lock = threading.Lock()
+        self._t0 = time.monotonic()
+        self._last_flush = self._t0
+        self.count = 0
+
+    def record(self, direction: int, topic: str, payload: Any):
+        if isinstance(payload, str):
+            payload = payload.encode()
+        elif payload is None:
+            payload = b""
+        topic_b = topic.encode()
+        now = time.monotonic()
+        with self._lock:
+            if self._fp.closed:
+                return
+            self._fp.write(_HEADER.pack(now - self._t0, direction, len(topic_b), len(payload)))
+            self._fp.write(topic_b)
+            self._fp.write(payload)
+            self.count += 1
+            if now - self._last_flush >= self.flush_interval:
+                self._fp.flush()
+                self._last_flush = now
+
+    def close(self):
+        with self._lock:
+            if not self._fp.closed:
+                self._fp.close()
+
+
+def read_records(path: str) -> Iterator[Record]:
+    """녹화 파일의 레코드를 순서대로 읽습니다. 마지막 레코드가 잘려 있으면 무시합니다."""
+    with open(path, "rb") as fp:
+        if fp.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"Not a Solar Bridge capture: {path}")
+        while True:
+            head = fp.read(_HEADER.size)
+            if len(head) < _HEADER.size:
+                return
+            ts, direction, topic_len, payload_len = _HEADER.unpack(head)
+            body = fp.read(topic_len + payload_len)
+            if len(body) < topic_len + payload_len:
+                return
+            yield Record(ts, direction, body[:topic_len].decode(), body[topic_len:])
+
+
+class MqttReplayer:
+    """
+    녹화된 RX 메시지를 on_message(client, userdata, msg) 콜백으로 다시 전달합니다.
+    speed=1.0이면 녹화 당시 간격 그대로, 2.0이면 두 배 빠르게, 0이면 대기 없이 최대 속도로 재생합니다.
+    """
+
+    def __init__(self, path: str, speed: float = 1.0):
+        self.path = path
+        self.speed = speed
+
+    def replay(self, on_message: Callable[[Any, Any, RecordedMessage], None],
+               on_tx: Optional[Callable[[Record], None]] = None) -> dict[str, float]:
+        """재생 후 통계 {messages, elapsed, max_lag}를 반환합니다. max_lag는 예정 시각 대비 최대 지연(초)."""
+        start = time.monotonic()
+        first_ts: Optional[float] = None
+        count = 0
+        max_lag = 0.0
+        for rec in read_records(self.path):
+            if first_ts is None:
+                first_ts = rec.ts
+            if self.speed > 0:
+                due = start + (rec.ts - first_ts) / self.speed
+                delay = due - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+                else:
+                    max_lag = max(max_lag, -delay)
+            if rec.direction == TX:
+                if on_tx is not None:
+                    on_tx(rec)
+                continue
+            on_message(None, None, RecordedMessage(rec.topic, rec.payload))
+            count += 1
+        return {"messages": count, "elapsed": time.monotonic() - start, "max_lag": max_lag}
@@ -0,0 +1,87 @@
+"""Incremental neighbor discovery with early termination on a stable RSSI lead."""
+
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional
+
+
+class RssiLeadTracker:
+    """
+    GET_NEIGHBORS 스냅샷을 순서대로 받아, 같은 후보가 다른 후보보다 margin(dB) 이상 강한 상태가
+    required회 연속 관측되면 그 후보를 확정합니다.
+    """
+
+    def __init__(self, margin: int = 6, required: int = 3):
+        self.margin = margin
+        self.required = required
+        self.leader: Optional[dict[str, Any]] = None
+        self.streak = 0
+
+    def observe(self, candidates: list[dict[str, Any]]) -> Optional[dict[str, Any]]:
+        """후보 목록(필터링된 이웃) 하나를 반영합니다. 확정되면 후보를, 아니면 None을 반환합니다."""
+        if not candidates:
+            self.leader, self.streak = None, 0
+            return None
+
+        ranked = sorted(candidates, key=lambda n: n.get("rssi", -100), reverse=True)
+        top = ranked[0]
+        lead = top.get("rssi", -100) - ranked[1].get("rssi", -100) if len(ranked) > 1 else self.margin
+
+        if lead < self.margin:
+            self.streak = 0
+        elif self.leader is not None and self.leader.get("id") == top.get("id"):
+            self.streak += 1
+        else:
+            self.streak = 1
+        self.leader = top
+        return top if self.streak >= self.required else None
+
+
+@dataclass
+class DiscoveryResult:
+    target: Optional[dict[str, Any]]
+    neighbors: list[dict[str, Any]] = field(default_factory=list)
+    matches: list[dict[str, Any]] = field(default_factory=list)
+    stable: bool = False        # RSSI 우위가 확정되어 조기 종료했는지 여부
+    polls: int = 0
+    elapsed: float = 0.0
+
+
+def discover_target(bridge, stick_uid: str, is_candidate: Callable[[dict[str, Any]], bool],
+                    timeout: float = 1.0, poll_interval: float = 0.2, margin: int = 6, required: int = 3,
+                    logger=None) -> DiscoveryResult:
+    """
+    이웃 목록을 초기화한 뒤 poll_interval마다 GET_NEIGHBORS로 갱신 내용을 받아,
+    is_candidate를 만족하는 장치가 안정적인 RSSI 우위를 보이면 바로 반환합니다.
+    timeout까지 확정되지 않으면 마지막 목록에서 RSSI가 가장 강한 후보를 반환합니다 (stable=False).
+    """
+    if bridge.clear_neighbors(stick_uid, logger=logger):
+        if logger: logger.info(f"  --> [OK] Neighbors list cleared on {stick_uid}")
+    elif logger:
+        logger.warning(f"  --> [FAIL] Failed to clear neighbors on {stick_uid}")
+
+    tracker = RssiLeadTracker(margin=margin, required=required)
+    result = DiscoveryResult(target=None)
+    start = time.monotonic()
+    deadline = start + timeout
+
+    while True:
+        time.sleep(max(0.0, min(poll_interval, deadline - time.monotonic())))
+        neighbors = bridge.get_neighbors(stick_uid, logger=logger)
+        result.polls += 1
+        if neighbors:
+            result.neighbors = neighbors
+            result.matches = [n for n in neighbors if is_candidate(n)]
+            chosen = tracker.observe(result.matches)
+            if chosen is not None:
+                result.target, result.stable = chosen, True
+                break
+        if time.monotonic() >= deadline:
+            if result.matches:
+                result.target = max(result.matches, key=lambda n: n.get("rssi", -100))
+            break
+
+    result.elapsed = time.monotonic() - start
+    return result
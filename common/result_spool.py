@@ -0,0 +1,227 @@
+"""
+Durable local spool for test results (SQLite, WAL).
+
+push_log는 결과를 로컬 DB에 기록만 하고 바로 반환하며, 백그라운드 업로더가 서버로 전송합니다.
+레코드마다 업로드 전에 정한 ID(PocketBase 레코드 ID 형식)를 그대로 사용하므로 재시도해도 서버에 한 번만 저장됩니다.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import secrets
+import sqlite3
+import string
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from common.logging_utils import log_event
+
+# 업로드 결과
+UPLOAD_OK = "ok"              # 저장됨 (이미 같은 ID로 저장된 경우 포함)
+UPLOAD_RETRY = "retry"        # 네트워크/서버 오류: 나중에 다시 시도
+UPLOAD_REJECTED = "rejected"  # 서버가 거부(검증 오류 등): 재시도하지 않고 보관
+
+# upload(record_id, payload) -> UPLOAD_*
+Uploader = Callable[[str, dict], str]
+# upload_batch([(record_id, payload), ...]) -> {record_id: UPLOAD_*} (빠진 ID는 보내지 않은 레코드: 재시도 횟수 없이 미룸)
+BatchUploader = Callable[[list[tuple[str, dict]]], dict[str, str]]
+
+_ID_ALPHABET = string.ascii_lowercase + string.digits
+
+
+def new_record_id(length: int = 15) -> str:
+    """PocketBase 레코드 ID 형식 ([a-z0-9] 15자)의 멱등 키."""
+    return "".join(secrets.choice(_ID_ALPHABET) for _ in range(length))
+
+
+class ResultSpool:
+    """
+    SQLite(WAL, synchronous=FULL) 기반 업로드 대기열. enqueue()는 커밋 후 반환하므로 전원이 꺼져도 결과가 남습니다.
+    start()로 업로더 스레드를 시작하며, 실패한 레코드는 retry_min초부터 두 배씩 retry_max초까지 간격을 늘려 재시도합니다.
+    upload_batch가 있으면 최대 batch_size개씩 묶어 보내며, 가장 오래된 레코드가 batch_age초 지나면 덜 찼어도 보냅니다.
+    """
+
+    def __init__(self, path: str | Path, upload: Uploader, retry_min: float = 5.0, retry_max: float = 300.0,
+                 logger: Optional[logging.Logger] = None, upload_batch: Optional[BatchUploader] = None,
+                 batch_size: int = 50, batch_age: float = 2.0):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.upload = upload
+        self.upload_batch = upload_batch
+        self.batch_size = batch_size if upload_batch is not None else 20
+        self.batch_age = batch_age if upload_batch is not None else 0.0
+        self.retry_min = retry_min
+        self.retry_max = retry_max
+        self.logger = logger
+        self._db = sqlite3.connect(str(self.path), timeout=10.0, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=FULL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            " id TEXT PRIMARY KEY, payload TEXT NOT NULL, created REAL NOT NULL,"
+            " attempts INTEGER NOT NULL DEFAULT 0, next_try REAL NOT NULL DEFAULT 0,"
+            " rejected INTEGER NOT NULL DEFAULT 0, last_error TEXT)"
+        )
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.uploaded = 0
+        self.failures = 0
+        # 처리량: 전송 호출 수/레코드 수/소요 시간
+        self.batches = 0
+        self.batch_records = 0
+        self.upload_seconds = 0.0
+        self.last_batch: dict[str, Any] = {}
+
+    def enqueue(self, payload: dict[str, Any], record_id: Optional[str] = None) -> str:
+        """결과를 대기열에 기록하고 레코드 ID를 반환합니다."""
+        record_id = record_id or new_record_id()
+        with self._lock:
+            self._db.execute("INSERT OR IGNORE INTO results (id, payload, created) VALUES (?, ?, ?)",
+                             (record_id, json.dumps(payload, ensure_ascii=False), time.time()))
+        self._wake.set()
+        return record_id
+
+    def _due(self, limit: int) -> list[tuple[str, dict, int, float]]:
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT id, payload, attempts, created FROM results WHERE rejected = 0 AND next_try <= ? ORDER BY created LIMIT ?",
+                (time.time(), limit)).fetchall()
+        return [(rid, json.loads(payload), attempts, created) for rid, payload, attempts, created in rows]
+
+    def _next_due_in(self) -> Optional[float]:
+        """다음 전송 시점까지 남은 초 (재시도 대기와 묶음 대기 중 빠른 쪽). 보낼 레코드가 없으면 None."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT MIN(MAX(next_try, created + ?)) FROM results WHERE rejected = 0", (self.batch_age,)).fetchone()
+        return None if row[0] is None else max(0.0, row[0] - time.time())
+
+    def _mark(self, record_id: str, status: str, attempts: int, error: str = ""):
+        with self._lock:
+            if status == UPLOAD_OK:
+                self._db.execute("DELETE FROM results WHERE id = ?", (record_id,))
+            elif status == UPLOAD_REJECTED:
+                self._db.execute("UPDATE results SET rejected = 1, attempts = ?, last_error = ? WHERE id = ?",
+                                 (attempts + 1, error, record_id))
+            else:
+                delay = min(self.retry_max, self.retry_min * (2 ** attempts))
+                self._db.execute("UPDATE results SET attempts = ?, next_try = ?, last_error = ? WHERE id = ?",
+                                 (attempts + 1, time.time() + delay, error, record_id))
+
+    def _defer(self, record_ids: list[str], delay: float):
+        with self._lock:
+            self._db.executemany("UPDATE results SET next_try = ? WHERE id = ?",
+                                 [(time.time() + delay, rid) for rid in record_ids])
+
+    def _send(self, batch: list[tuple[str, dict, int, float]]) -> dict[str, tuple[str, str]]:
+        """batch를 전송하고 {record_id: (status, error)}를 반환합니다."""
+        if self.upload_batch is not None:
+            try:
+                statuses = self.upload_batch([(rid, payload) for rid, payload, _, _ in batch])
+                return {rid: (statuses[rid], "") for rid, _, _, _ in batch if rid in statuses}
+            except Exception as e:
+                return {rid: (UPLOAD_RETRY, str(e)) for rid, _, _, _ in batch}
+
+        results: dict[str, tuple[str, str]] = {}
+        for record_id, payload, _, _ in batch:
+            try:
+                results[record_id] = (self.upload(record_id, payload), "")
+            except Exception as e:
+                results[record_id] = (UPLOAD_RETRY, str(e))
+            if results[record_id][0] == UPLOAD_RETRY:
+                break  # 서버/네트워크 문제: 나머지도 실패할 가능성이 높으므로 다음 주기로
+        return results
+
+    def drain(self, force: bool = False) -> int:
+        """
+        보낼 수 있는 레코드를 전송합니다. 묶음이 덜 찼고 batch_age가 지나지 않았으면 기다립니다 (force=True이면 바로 전송).
+        전송에 성공한 개수를 반환합니다.
+        """
+        sent = 0
+        while not self._stop.is_set():
+            batch = self._due(self.batch_size)
+            if not batch:
+                break
+            if not force and len(batch) < self.batch_size and time.time() - batch[0][3] < self.batch_age:
+                break
+
+            t0 = time.perf_counter()
+            results = self._send(batch)
+            elapsed = time.perf_counter() - t0
+            ok = 0
+            untried = []
+            for record_id, _, attempts, _ in batch:
+                if record_id not in results:
+                    untried.append(record_id)
+                    continue
+                status, error = results[record_id]
+                self._mark(record_id, status, attempts, error)
+                if status == UPLOAD_OK:
+                    ok += 1
+                else:
+                    self.failures += 1
+                    if self.logger:
+                        log_event(self.logger, event="db.spool.upload_fail", level=logging.WARNING,
+                                  data={"id": record_id, "status": status, "attempts": attempts + 1, "error": error})
+            sent += ok
+            self.uploaded += ok
+            self.batches += 1
+            self.batch_records += ok
+            self.upload_seconds += elapsed
+            self.last_batch = {"records": len(batch), "ok": ok, "ms": round(elapsed * 1000, 1)}
+            if self.logger:
+                # 묶음 결과와 누적 처리량/대기 건수
+                log_event(self.logger, event="db.spool.flush", level=logging.INFO, data=self.stats())
+            if ok < len(batch):
+                if untried:
+                    # 앞선 레코드 실패로 시도하지 않은 레코드도 같은 시점까지 미룸 (재시도 횟수는 유지)
+                    self._defer(untried, self.retry_min)
+                break  # 실패한 레코드는 backoff 후 재시도
+        return sent
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.drain()
+                wait = self._next_due_in()
+            except sqlite3.Error as e:
+                logging.error(f"[ResultSpool] {e}")
+                wait = self.retry_min
+            self._wake.wait(timeout=self.retry_max if wait is None else min(wait, self.retry_max))
+            self._wake.clear()
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="result-spool", daemon=True)
+            self._thread.start()
+
+    def close(self, timeout: float = 3.0):
+        """업로더를 멈춥니다. 남은 레코드는 파일에 보관되어 다음 실행 때 전송됩니다."""
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+        with self._lock:
+            self._db.close()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            pending, rejected, oldest = self._db.execute(
+                "SELECT SUM(rejected = 0), SUM(rejected = 1), MIN(CASE WHEN rejected = 0 THEN created END) FROM results"
+            ).fetchone()
+        return {
+            "pending": pending or 0,
+            "rejected": rejected or 0,
+            "oldest_age_s": round(time.time() - oldest, 1) if oldest else 0.0,
+            "uploaded": self.uploaded,
+            "failures": self.failures,
+            "batches": self.batches,
+            "avg_batch": round(self.batch_records / self.batches, 1) if self.batches else 0.0,
+            "records_per_s": round(self.batch_records / self.upload_seconds, 1) if self.upload_seconds else 0.0,
+            "last_batch": self.last_batch,
+        }
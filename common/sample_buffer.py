@@ -0,0 +1,204 @@
+"""Bounded per-device sample storage for the Solar Bridge client."""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Any, Optional
+
+import numpy as np
+
+# 비콘 1개에서 추출하는 컬럼과 저장 dtype (ADC raw 값은 16-bit)
+ADC_COLUMNS: dict[str, Any] = {
+    "vin1": np.uint16,
+    "vin2": np.uint16,
+    "iout": np.uint16,
+    "vout": np.uint16,
+    "uptime": np.int64,
+    "rx_ts": np.float64,    # 수신 시각 (monotonic 초)
+}
+
+# 중복 판정에 사용할 최근 비콘 키 개수 (같은 비콘이 simple/rx와 mlpe/rx로 거의 동시에 들어오는 경우)
+DEDUP_WINDOW = 32
+
+
+class DeviceSampleBuffer:
+    """
+    고정 용량 링 버퍼. 용량을 넘으면 가장 오래된 샘플부터 덮어씁니다.
+    비콘 키(장치 uptime 등)가 최근 DEDUP_WINDOW개 안에 이미 있으면 중복으로 보고 저장하지 않습니다.
+    """
+
+    def __init__(self, capacity: int = 256):
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self._cols = {name: np.zeros(capacity, dtype=dt) for name, dt in ADC_COLUMNS.items()}
+        self._head = 0   # 다음에 쓸 위치
+        self._count = 0
+        self._recent_keys: deque = deque(maxlen=DEDUP_WINDOW)
+        self.duplicates = 0
+        self.last_seen = time.monotonic()
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def nbytes(self) -> int:
+        return sum(a.nbytes for a in self._cols.values())
+
+    def append(self, vin1: int, vin2: int, iout: int, vout: int, uptime: int = 0,
+               rx_ts: Optional[float] = None, key: Optional[int] = None) -> bool:
+        """샘플을 추가합니다. key(기본 uptime, 0이면 중복 검사 안 함)가 최근에 본 값이면 False."""
+        now = time.monotonic()
+        self.last_seen = now
+        key = uptime if key is None else key
+        if key:
+            if key in self._recent_keys:
+                self.duplicates += 1
+                return False
+            self._recent_keys.append(key)
+
+        i = self._head
+        cols = self._cols
+        cols["vin1"][i] = vin1
+        cols["vin2"][i] = vin2
+        cols["iout"][i] = iout
+        cols["vout"][i] = vout
+        cols["uptime"][i] = uptime
+        cols["rx_ts"][i] = now if rx_ts is None else rx_ts
+        self._head = (i + 1) % self.capacity
+        self._count = min(self._count + 1, self.capacity)
+        return True
+
+    def clear(self) -> None:
+        self._head = 0
+        self._count = 0
+        self._recent_keys.clear()
+
+    def column(self, name: str) -> np.ndarray:
+        """오래된 순서로 정렬된 컬럼 복사본을 반환합니다."""
+        arr = self._cols[name]
+        if self._count < self.capacity:
+            return arr[:self._count].copy()
+        return np.concatenate((arr[self._head:], arr[:self._head]))
+
+    def columns(self) -> dict[str, np.ndarray]:
+        return {name: self.column(name) for name in self._cols}
+
+    def mean(self, name: str) -> Optional[float]:
+        if self._count == 0:
+            return None
+        return float(self.column(name).mean())
+
+    def effective_rate(self, clock: str = "rx_ts") -> Optional[float]:
+        """
+        저장된 샘플의 실제 수집 속도(Hz). clock="rx_ts"는 수신 시각 기준,
+        "uptime"은 장치 시계(ms) 기준입니다. 샘플이 2개 미만이면 None.
+        """
+        if self._count < 2:
+            return None
+        t = self.column(clock).astype(np.float64)
+        if clock == "uptime":
+            t = t / 1000.0
+        span = float(t.max() - t.min())
+        return (self._count - 1) / span if span > 0 else None
+
+
+class SampleBufferPool:
+    """
+    장치별 DeviceSampleBuffer 모음.
+    max_devices를 넘으면 가장 오래 갱신되지 않은 장치를 제거하고,
+    evict_idle()로 idle_timeout 동안 비콘이 없던 장치를 정리합니다.
+    """
+
+    def __init__(self, capacity: int = 256, max_devices: int = 64, idle_timeout: float = 300.0):
+        self.capacity = capacity
+        self.max_devices = max_devices
+        self.idle_timeout = idle_timeout
+        self._buffers: OrderedDict[str, DeviceSampleBuffer] = OrderedDict()
+        self._lock = threading.Lock()
+        self.evicted = 0
+
+    def __contains__(self, tid: str) -> bool:
+        return tid in self._buffers
+
+    def __len__(self) -> int:
+        return len(self._buffers)
+
+    def append(self, tid: str, vin1: int, vin2: int, iout: int, vout: int, uptime: int = 0,
+               rx_ts: Optional[float] = None, key: Optional[int] = None) -> bool:
+        """장치 버퍼에 샘플을 추가합니다. 중복 비콘이면 False."""
+        with self._lock:
+            buf = self._buffers.get(tid)
+            if buf is None:
+                buf = DeviceSampleBuffer(self.capacity)
+                self._buffers[tid] = buf
+                while len(self._buffers) > self.max_devices:
+                    self._buffers.popitem(last=False)
+                    self.evicted += 1
+            else:
+                self._buffers.move_to_end(tid)
+            return buf.append(vin1, vin2, iout, vout, uptime, rx_ts, key)
+
+    def get(self, tid: str) -> Optional[DeviceSampleBuffer]:
+        return self._buffers.get(tid)
+
+    def clear(self, tid: str) -> None:
+        with self._lock:
+            buf = self._buffers.get(tid)
+            if buf is not None:
+                buf.clear()
+
+    def evict_idle(self, now: Optional[float] = None) -> int:
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            idle = [tid for tid, buf in self._buffers.items() if now - buf.last_seen > self.idle_timeout]
+            for tid in idle:
+                del self._buffers[tid]
+            self.evicted += len(idle)
+        return len(idle)
+
+    def memory_usage(self) -> int:
+        """버퍼 배열이 차지하는 바이트 수."""
+        with self._lock:
+            return sum(buf.nbytes for buf in self._buffers.values())
+
+
+class BoundedDeviceMap(OrderedDict):
+    """
+    장치 ID를 키로 하는 LRU dict. max_entries를 넘으면 가장 오래 갱신되지 않은 항목을 제거하고,
+    evict_idle()로 idle_timeout 동안 갱신되지 않은 항목을 정리합니다.
+    """
+
+    def __init__(self, max_entries: int = 64, idle_timeout: float = 300.0):
+        super().__init__()
+        self.max_entries = max_entries
+        self.idle_timeout = idle_timeout
+        self._touched: dict[str, float] = {}
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self.move_to_end(key)
+        self._touched[key] = time.monotonic()
+        while len(self) > self.max_entries:
+            old, _ = self.popitem(last=False)
+            self._touched.pop(old, None)
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self._touched.pop(key, None)
+
+    def touch(self, key) -> None:
+        if key in self:
+            self.move_to_end(key)
+            self._touched[key] = time.monotonic()
+
+    def evict_idle(self, now: Optional[float] = None) -> int:
+        now = time.monotonic() if now is None else now
+        idle = [k for k, ts in self._touched.items() if now - ts > self.idle_timeout]
+        for k in idle:
+            self._touched.pop(k, None)
+            if k in self:
+                super().__delitem__(k)
+        return len(idle)
@@ -1,41 +1,167 @@
 from __future__ import annotations
 import json
+import itertools
+import queue
 import threading
 import time
 import logging
 import paho.mqtt.client as mqtt
-from typing import Any, Optional
+from contextlib import closing
+from functools import lru_cache
+from concurrent.futures import Future, InvalidStateError, TimeoutError as FutureTimeoutError, wait, FIRST_COMPLETED
+from typing import Any, Callable, Iterable, Iterator, Optional
+
+from common.sample_buffer import SampleBufferPool, BoundedDeviceMap
+from common.bridge_metrics import BridgeMetrics, LatencyTracker, TimeoutPolicy
+from common.mqtt_recorder import MqttRecorder, RX, TX
+
+# 요청 식별 키: (stick_uid, target_id, command, seq)
+# Bridge 관리 명령(LIST_STICKS 등)은 target_id를 빈 문자열로 사용합니다.
+RequestKey = tuple[str, str, str, int]
+
+BROADCAST_IDS = ("0x00000000", "0xFFFFFFFF")
+
+# ADC 비콘 리스너: callback(target_id, beacon)
+AdcListener = Callable[[str, dict], None]
+
+# 스틱 변경 리스너: callback(added_sticks, removed_sticks)
+StickListener = Callable[[list, list], None]
+
+# 스틱 목록을 무효화하는 Bridge 이벤트 (solar/bridge/rx의 type)
+STICK_EVENT_TYPES = ("STICK_CONNECTED", "STICK_DISCONNECTED", "STICK_ADDED", "STICK_REMOVED")
+
+# Complex API 트랜잭션 최종 상태 (solar/complex/<id>/rx의 status)
+COMPLEX_OK_STATUSES = ("COMPLETED", "SUCCESS")
+# 스크립트를 실행하지 않고 거부 (미지원/스키마·파싱 오류): 로컬 단계 실행으로 대체
+COMPLEX_REJECT_STATUSES = ("UNSUPPORTED", "ERROR", "INVALID", "REJECTED")
+COMPLEX_DONE_STATUSES = COMPLEX_OK_STATUSES + ("FAILED",) + COMPLEX_REJECT_STATUSES
+
+try:
+    # orjson이 설치되어 있으면 bytes를 바로 파싱 (표준 json 대비 수 배 빠름)
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+_bridge_log = logging.getLogger()
+
+
+@lru_cache(maxsize=1024)
+def _normalize_id(device_id: str) -> str:
+    """ID를 일관된 형식(0x + 8자리 대문자)으로 정규화합니다."""
+    if not device_id:
+        return "0x00000000"
+    
+    clean = str(device_id).upper()
+    if clean.startswith("0X"):
+        clean = clean[2:]
+    
+    # 6바이트(12자리) 이상의 주소인 경우 하위 4바이트(8자리)만 추출
+    if len(clean) > 8:
+        clean = clean[-8:]
+        
+    return f"0x{clean.zfill(8)}"
+
 
 class SolarBridgeClient:
     """
     Solar Bridge (Go MQTT Server)와 통신하기 위한 클라이언트.
     지속적인 연결(Persistent Connection)을 유지하여 통신 안정성을 확보합니다.
     """
-    def __init__(self, host: str = "localhost", port: int = 1883, timeout: float = 1.0):
+    # 유휴 장치 정리 주기 (초)
+    EVICT_INTERVAL = 30.0
+    # 자동 재연결 백오프 (초): 끊길 때마다 min부터 두 배씩 max까지
+    RECONNECT_MIN_DELAY = 1
+    RECONNECT_MAX_DELAY = 16
+
+    def __init__(self, host: str = "localhost", port: int = 1883, timeout: float = 1.0,
+                 adc_capacity: int = 256, max_devices: int = 64, device_idle_timeout: float = 300.0,
+                 narrow_subscriptions: bool = False, stick_ttl: float = 10.0,
+                 adaptive_timeouts: bool = False, timeout_policy: Optional[TimeoutPolicy] = None,
+                 transport: Any = None):
         self.host = host
         self.port = port
         self.timeout = timeout
-        self._client = mqtt.Client()
+        # True이면 명령/스틱별 RTT 분포(p99 + 여유)로 대기 시간을 정함 (관측치가 부족하면 고정 타임아웃 사용)
+        self.adaptive_timeouts = adaptive_timeouts
+        self.latency = LatencyTracker(timeout_policy)
+        # True이면 장치/스틱 와일드카드를 구독하지 않고 focus_device()로 선택된 대상의 토픽만 구독
+        self.narrow_subscriptions = narrow_subscriptions
+        # transport: paho Client와 같은 인터페이스의 대체 전송 계층 (예: bridge_simulator.LoopbackTransport)
+        self._client = transport if transport is not None else mqtt.Client()
         self._client.on_message = self._on_message
         self._client.on_connect = self._on_connect
         self._client.on_subscribe = self._on_subscribe
+        self._client.on_disconnect = self._on_disconnect
+        self._client.reconnect_delay_set(self.RECONNECT_MIN_DELAY, self.RECONNECT_MAX_DELAY)
         
         self._stick_list: list[dict[str, Any]] = []
+        # 스틱 목록 캐시: 마지막 STICK_LIST 수신 시각(monotonic). None이면 무효
+        self.stick_ttl = stick_ttl
+        self._stick_list_ts: Optional[float] = None
+        self._stick_listeners: dict[int, StickListener] = {}
+        self._stick_listener_ids = itertools.count(1)
+        self._stick_refresh_key: Optional[RequestKey] = None
+        self._stick_watcher: Optional[threading.Thread] = None
+        self._stick_watcher_stop = threading.Event()
         self._neighbor_map: dict[str, list[dict[str, Any]]] = {}
-        self._device_info_map: dict[str, dict[str, Any]] = {}
+        # 장치별 상태/샘플은 용량 제한 + 유휴 장치 제거 (공장 내 모든 비콘 장치가 누적되지 않도록)
+        self._device_info_map: BoundedDeviceMap = BoundedDeviceMap(max_devices, device_idle_timeout)
         self._cmd_results: dict[str, str] = {}
-        self._responses: dict[str, Any] = {}
-        self._mlpe_data: dict[str, Any] = {}
-        self._adc_data: dict[str, list[dict[str, Any]]] = {}
+        self._mlpe_data: BoundedDeviceMap = BoundedDeviceMap(max_devices, device_idle_timeout)
+        self._adc_buffers = SampleBufferPool(adc_capacity, max_devices, device_idle_timeout)
+        # 장치별로 마지막에 응답을 받은 스틱 (get_device_info_any)
+        self._device_routes: BoundedDeviceMap = BoundedDeviceMap(max_devices, device_idle_timeout)
+        self._last_evict = time.monotonic()
+        self._adc_listeners: dict[int, tuple[Optional[str], AdcListener]] = {}
+        self._adc_listener_ids = itertools.count(1)
+        self._adc_listener_lock = threading.Lock()
         self._clear_neighbors_results: dict[str, bool] = {}
-        self._upper_id_map: dict[str, int] = {}  # Map lower 4-byte ID to upper 2-byte ID
+        # 하위 4바이트 ID -> 상위 2바이트 (REQ_GET_INFO의 id_high). 장치 토픽(6바이트 주소) 구성에 사용
+        self._upper_id_map: BoundedDeviceMap = BoundedDeviceMap(max_devices, device_idle_timeout)
         
-        self._response_event = threading.Event()
+        # 토픽 라우팅 테이블 (파싱 전에 핸들러 결정)
+        self._topic_handlers = {
+            "solar/bridge/rx": self._handle_bridge,
+            "solar/simple/rx": self._handle_simple,
+        }
+        self._device_topic_handlers = {
+            "mlpe": self._handle_mlpe,
+            "complex": self._handle_complex,
+        }
+        self._debug_topics = frozenset(self._topic_handlers)
+        self._watched_ids: Optional[set[str]] = None
+        self._listener_ids: frozenset[str] = frozenset()
+        self._topic_classes = {"solar/bridge/rx": "bridge", "solar/simple/rx": "simple"}
+        # 성능 카운터 (bridge_stats()/reset_stats())
+        self.metrics = BridgeMetrics()
+        # 워커 프로세스에서 필터링/파싱하는 전송 계층 (bridge_ingest.IngestWorkerTransport)
+        if hasattr(self._client, "on_parsed"):
+            self._client.on_parsed = self._on_parsed
+            self._client.on_count = self.metrics.incr
+
+        # 요청별 Correlation ID(seq)와 Future로 다중 요청을 동시에 대기
+        self._seq = itertools.count(1)
+        self._pending: dict[RequestKey, Future] = {}
+        self._pending_sent: dict[RequestKey, float] = {}  # 요청 전송 시각 (RTT 측정용)
+        self._pending_lock = threading.Lock()
+
         self._result_event = threading.Event()
         self._connected_event = threading.Event()
+        self._stopping = False
+        self.disconnect_count = 0
+        # 유지해야 할 구독 목록 (재연결 시 그대로 다시 구독)
         self._subscribed_topics: set[str] = set()
         self._subscribe_event = threading.Event()
         self._target_subscribe_topic: Optional[str] = None
+        self._focus_topics: list[str] = []
+        # 주소를 몰라 와일드카드로 구독한 경우 비콘을 처리할 대상 장치 (정규화된 ID)
+        self._focus_id: Optional[str] = None
+        self._base_topics: frozenset[str] = frozenset()
+        # Complex API 지원 여부: None=미확인, False이면 스크립트를 로컬에서 단계별로 실행
+        self._complex_supported: Optional[bool] = None
+        # 세션 녹화 (record_to)
+        self._recorder: Optional[MqttRecorder] = None
 
     def start(self):
         """MQTT 클라이언트를 시작하고 연결될 때까지 대기합니다."""
@@ -45,22 +171,52 @@ class SolarBridgeClient:
             raise ConnectionError(f"Failed to connect to {self.host}:{self.port}")
         
         # 기본 브릿지 및 단순 API 채널 구독
-        self._subscribe_sync([
+        topics = [
             "solar/bridge/rx", 
             "solar/simple/rx",
-            "solar/mlpe/+/rx",
-            "solar/stick/+/rx",
             "solar/complex/+/rx"
-        ])
+        ]
+        if not self.narrow_subscriptions:
+            topics += ["solar/mlpe/+/rx", "solar/stick/+/rx"]
+        self._base_topics = frozenset(topics)
+        self._subscribe_sync(topics)
 
     def stop(self):
         """연결을 종료합니다."""
+        self._stopping = True
+        self.stop_stick_watcher()
         self._client.loop_stop()
         self._client.disconnect()
+        self._connected_event.clear()
+        self._fail_pending(ConnectionError("SolarBridgeClient stopped"))
+        self.stop_recording()
+
+    @property
+    def is_connected(self) -> bool:
+        return self._connected_event.is_set()
 
     def _on_connect(self, client, userdata, flags, rc):
-        if rc == 0:
-            self._connected_event.set()
+        if rc != 0:
+            return
+        if self._subscribed_topics:
+            # 재연결: 브로커 세션이 초기화되었으므로 기존 구독을 복구
+            logging.info(f"[SolarBridge] Reconnected to {self.host}:{self.port}, resubscribing {len(self._subscribed_topics)} topics")
+            client.subscribe([(t, 0) for t in sorted(self._subscribed_topics)])
+            # 끊긴 동안의 스틱 변경은 알 수 없으므로 목록을 다시 요청
+            self._stick_list_ts = None
+        self._connected_event.set()
+        if self._subscribed_topics:
+            self.refresh_sticks()
+
+    def _on_disconnect(self, client, userdata, rc):
+        self._connected_event.clear()
+        if self._stopping:
+            return
+        self.disconnect_count += 1
+        self._stick_list_ts = None
+        logging.warning(f"[SolarBridge] Disconnected from {self.host}:{self.port} (rc={rc}); reconnecting")
+        # 대기 중인 요청은 타임아웃까지 기다리지 않고 즉시 실패 처리
+        self._fail_pending(ConnectionError(f"MQTT connection lost (rc={rc})"))
 
     def _on_subscribe(self, client, userdata, mid, granted_qos):
         self._subscribe_event.set()
@@ -75,133 +231,423 @@ class SolarBridgeClient:
         for t in new_topics:
             self._client.subscribe(t)
             self._subscribed_topics.add(t)
-        
-        self._subscribe_event.wait(timeout=self.timeout)
+
+        # 끊긴 상태라면 재연결 시 _on_connect에서 구독되므로 기다리지 않음
+        if self.is_connected:
+            self._subscribe_event.wait(timeout=self.timeout)
+
+    def _unsubscribe(self, topics: list[str]):
+        for t in topics:
+            if t in self._subscribed_topics:
+                self._client.unsubscribe(t)
+                self._subscribed_topics.discard(t)
+
+    def _device_topic_id(self, target_id: str) -> Optional[str]:
+        """
+        장치 토픽(solar/mlpe/<id>/rx)에 쓰는 6바이트 주소(12자리 대문자).
+        이웃 목록의 ID는 하위 4바이트뿐이므로 REQ_GET_INFO 응답의 상위 2바이트(id_high)로 조합하며, 모르면 None.
+        """
+        raw = str(target_id)
+        if raw[:2] in ("0x", "0X"):
+            raw = raw[2:]
+        if len(raw) == 12:
+            return raw.upper()
+        tid = self._normalize_id(target_id)
+        upper = self._upper_id_map.get(tid)
+        if upper is None:
+            return None
+        return f"{upper & 0xFFFF:04X}{tid[2:]}"
+
+    def _remember_upper_id(self, tid: str, upper_id: Any):
+        try:
+            upper = int(upper_id, 16) if isinstance(upper_id, str) else int(upper_id)
+        except (TypeError, ValueError):
+            return
+        self._upper_id_map[tid] = upper
+
+    def focus_device(self, target_id: str, stick_uid: Optional[str] = None):
+        """
+        테스트 대상 장치(및 스틱)의 토픽만 구독합니다. 이전 대상의 토픽은 해제됩니다.
+        브로커 단에서 다른 장치의 트래픽이 걸러져 네트워크/CPU 부하가 줄어듭니다.
+        6바이트 주소를 모르면 stick_uid로 REQ_GET_INFO를 보내 상위 2바이트를 확인하고,
+        그래도 모르면 solar/mlpe/+/rx를 구독하고 대상 장치의 비콘만 처리합니다.
+        """
+        topic_id = self._device_topic_id(target_id)
+        if topic_id is None and stick_uid and self.get_device_info(target_id, stick_uid) is not None:
+            topic_id = self._device_topic_id(target_id)
+        if topic_id is not None:
+            topics = [f"solar/mlpe/{topic_id}/rx"]
+            self._focus_id = None
+        else:
+            logging.warning(f"[SolarBridge] Unknown 6-byte address for {target_id}; subscribing to all beacons")
+            topics = ["solar/mlpe/+/rx"]
+            self._focus_id = self._normalize_id(target_id)
+        if stick_uid:
+            topics.append(f"solar/stick/{stick_uid}/rx")
+        # start()에서 구독한 기본 토픽(와일드카드 모드)은 해제하지 않음
+        stale = [t for t in self._focus_topics if t not in topics and t not in self._base_topics]
+        self._unsubscribe(stale)
+        self._focus_topics = topics
+        self._push_device_filter()
+        self._subscribe_sync(topics)
+
+    def release_device(self):
+        """focus_device()로 구독한 장치/스틱 토픽을 해제합니다."""
+        self._unsubscribe([t for t in self._focus_topics if t not in self._base_topics])
+        self._focus_topics = []
+        self._focus_id = None
+        self._push_device_filter()
 
     def _normalize_id(self, device_id: str) -> str:
         """ID를 일관된 형식(0x + 8자리 대문자)으로 정규화합니다."""
-        if not device_id:
-            return "0x00000000"
-        
-        clean = str(device_id).upper()
-        if clean.startswith("0X"):
-            clean = clean[2:]
-        
-        # 6바이트(12자리) 이상의 주소인 경우 하위 4바이트(8자리)만 추출
-        if len(clean) > 8:
-            clean = clean[-8:]
-            
-        return f"0x{clean.zfill(8)}"
+        return _normalize_id(device_id)
+
+    def _register_pending(self, stick_uid: str, target_id: str, cmd_name: str) -> tuple[RequestKey, Future]:
+        """새 요청에 seq를 발급하고 응답을 받을 Future를 등록합니다."""
+        key = (stick_uid or "", target_id, cmd_name, next(self._seq))
+        fut: Future = Future()
+        self.metrics.command(cmd_name, "requests")
+        if not self.is_connected:
+            # 연결이 없으면 응답이 올 수 없으므로 등록하지 않고 바로 실패
+            fut.set_exception(ConnectionError(f"Not connected to {self.host}:{self.port}"))
+            self.metrics.command(cmd_name, "aborted")
+            return key, fut
+        with self._pending_lock:
+            self._pending[key] = fut
+            self._pending_sent[key] = time.monotonic()
+        return key, fut
+
+    def _fail_pending(self, exc: Exception) -> None:
+        """대기 중인 모든 요청을 exc로 완료합니다."""
+        with self._pending_lock:
+            items = list(self._pending.items())
+            self._pending.clear()
+            self._pending_sent.clear()
+        for key, fut in items:
+            self.metrics.command(key[2], "aborted")
+            try:
+                fut.set_exception(exc)
+            except InvalidStateError:
+                pass
+
+    def _discard_pending(self, key: RequestKey) -> None:
+        with self._pending_lock:
+            self._pending.pop(key, None)
+            self._pending_sent.pop(key, None)
+
+    def _resolve_pending(self, cmd_name: str, result: Any, stick_uid: Optional[str] = None,
+                         target_id: Optional[str] = None, seq: Optional[int] = None) -> bool:
+        """
+        응답과 일치하는 대기 요청을 찾아 Future를 완료합니다.
+        브릿지가 seq/stick_uid를 되돌려주지 않는 경우, 같은 명령/대상의 가장 오래된 요청과 매칭합니다.
+        """
+        with self._pending_lock:
+            match = None
+            for key in self._pending:
+                k_stick, k_tid, k_cmd, k_seq = key
+                if k_cmd != cmd_name:
+                    continue
+                if seq is not None and k_seq != seq:
+                    continue
+                if stick_uid and k_stick and k_stick != stick_uid:
+                    continue
+                if target_id is not None and k_tid and k_tid not in BROADCAST_IDS and k_tid != target_id:
+                    continue
+                match = key
+                break
+            fut = self._pending.pop(match, None) if match else None
+            sent = self._pending_sent.pop(match, None) if match else None
+
+        if fut is None:
+            # 대기 요청이 없는 응답 (이미 타임아웃/폐기된 요청 또는 다른 클라이언트의 요청)
+            self.metrics.command(cmd_name, "unsolicited")
+            return False
+        if sent is not None:
+            rtt = time.monotonic() - sent
+            self.metrics.observe_rtt(cmd_name, rtt)
+            if cmd_name != "COMPLEX":
+                # COMPLEX는 스크립트 대기/수집 시간이 포함되므로 적응형 타임아웃 통계에서 제외
+                self.latency.record(cmd_name, match[0], rtt)
+        try:
+            fut.set_result(result)
+        except InvalidStateError:
+            # 이미 취소된 요청 (타임아웃 처리 완료)
+            return False
+        return True
+
+    @staticmethod
+    def _parse_seq(data: dict) -> Optional[int]:
+        seq = data.get("seq")
+        try:
+            return int(seq) if seq is not None else None
+        except (TypeError, ValueError):
+            return None
+
+    def record_to(self, path: str):
+        """이후 송수신되는 모든 메시지를 path에 녹화합니다. (mqtt_recorder 형식, MqttReplayer로 재생)"""
+        self.stop_recording()
+        self._recorder = MqttRecorder(path)
+
+    def stop_recording(self):
+        rec, self._recorder = self._recorder, None
+        if rec is not None:
+            rec.close()
+
+    def _publish(self, topic: str, payload: str):
+        rec = self._recorder
+        if rec is not None:
+            rec.record(TX, topic, payload)
+        self._client.publish(topic, payload)
 
     def _on_message(self, client, userdata, msg):
+        self._ingest(msg.topic, msg.payload, None)
+
+    def _on_parsed(self, topic: str, data: dict):
+        """ingest 워커(bridge_ingest)가 이미 필터링/파싱한 메시지."""
+        self._ingest(topic, None, data)
+
+    def _ingest(self, topic: str, payload: Optional[bytes], data: Optional[dict]):
+        t0 = time.perf_counter()
+        kind = self._topic_classes.get(topic, "other")
+        rec = self._recorder
+        if rec is not None:
+            rec.record(RX, topic, payload if payload is not None else json.dumps(data))
         try:
-            topic = msg.topic
-            payload_str = msg.payload.decode()
-            data = json.loads(payload_str)
-            
-            if "solar/bridge" in topic or "solar/simple" in topic:
-                logging.debug(f"[MQTT] RX Topic: {topic}, Payload: {payload_str[:200]}")
-            
-            # 1. Bridge 관리 응답
-            if topic == "solar/bridge/rx":
-                msg_type = data.get("type")
-                if msg_type == "STICK_LIST":
-                    sticks = data.get("sticks", [])
-                    for s in sticks:
-                        # Reconstruct version string for backward compatibility (e.g. "1.2.3")
-                        if "major" in s and "minor" in s and "patch" in s:
-                            s["version"] = f"{s['major']}.{s['minor']}.{s['patch']}"
-                    self._stick_list = sticks
-                    self._response_event.set()
-                elif msg_type == "SUCCESS" and data.get("command") == "GET_NEIGHBORS":
-                    # Bridge API의 GET_NEIGHBORS 응답 처리
-                    res_data = data.get("data", {})
-                    self._neighbor_map["last"] = res_data.get("neighbors", [])
-                    self._response_event.set()
-                elif msg_type == "SUCCESS" and data.get("command") == "CLEAR_NEIGHBORS":
-                    self._response_event.set()
-
-            # 2. Simple API 응답
-            elif topic == "solar/simple/rx":
-                cmd_name = data.get("command")
-                res_payload = data.get("response", {})
-                
-                # Protobuf 응답 평탄화(Flatten) 및 하위 호환성 처리
-                if isinstance(res_payload, dict):
-                    # 1. Protobuf 필드가 중첩되어 있으면 하위로 진입
-                    if "Protobuf" in res_payload:
-                        res_payload = res_payload["Protobuf"]
-                    
-                    if isinstance(res_payload, dict):
-                        # 2. resp_... 또는 Resp... 로 시작하는 메시지 응답 객체 찾아서 평탄화
-                        # 예: resp_get_mppt_status -> 내부의 mppt, max_duty 등을 상위로 병합
-                        inner_data = None
-                        for k, v in res_payload.items():
-                            if (k.lower().startswith("resp_") or k.lower().startswith("resp")) and isinstance(v, dict):
-                                inner_data = v
-                                break
-                        
-                        if inner_data:
-                            res_payload.update(inner_data)
-                    
-                    # 3. 특정 명령별 추가 하위 호환성 처리
-                    cmd_val = res_payload.get("cmd")
-                    if cmd_val in ["RESP_GET_INFO", 103]:
-                        v_raw = res_payload.get("version", 0)
-                        if v_raw:
-                            res_payload.update({
-                                "vid": (v_raw >> 28) & 0x0F,
-                                "pid": (v_raw >> 20) & 0x0F,
-                                "version_unpacked": f"{(v_raw >> 14) & 0x3F}.{(v_raw >> 8) & 0x3F}.{v_raw & 0xFF}"
-                            })
-                        if "id_high" in res_payload:
-                            res_payload["upper_id"] = res_payload["id_high"]
-
-                tid = self._normalize_id(data.get("target_id") or "0")
-                if tid not in self._mlpe_data: self._mlpe_data[tid] = {}
-                
-                # 결과 상태 확인
-                if data.get("type") == "ERROR" or data.get("status") == "FAILED":
-                    self._mlpe_data[tid][cmd_name] = {"status": "FAILED", "message": data.get("message")}
-                else:
-                    # BEACON_RAW_DATA인 경우 추가 처리
-                    if cmd_name == "BEACON_RAW_DATA":
-                        beacon = res_payload.get("beacon_raw_data") or res_payload
-                        if isinstance(beacon, dict):
-                            self._unpack_beacon_data(tid, beacon)
-                            res_payload = beacon # 평탄화된 데이터로 교체
-
-                    self._mlpe_data[tid][cmd_name] = res_payload
-                
-                # 동기 대기용 결과 저장 및 이벤트 세트
-                self._responses[cmd_name] = self._mlpe_data[tid][cmd_name]
-                self._response_event.set()
-
-            # 3. MLPE 데이터 (BEACON_RAW_DATA 등)
-            elif "solar/mlpe" in topic and "/rx" in topic:
-                tid = self._normalize_id(topic.split("/")[2])
-                mlpe_pkt = data.get("mlpe_packet", {})
-                pb = mlpe_pkt.get("Protobuf", {})
-                
-                cmd_name = pb.get("cmd")
-                if cmd_name == "BEACON_RAW_DATA":
-                    beacon = pb.get("beacon_raw_data") or pb
-                    self._unpack_beacon_data(tid, beacon)
-                    # 일반 데이터로도 저장
-                    if tid not in self._mlpe_data: self._mlpe_data[tid] = {}
-                    self._mlpe_data[tid]["BEACON_RAW_DATA"] = beacon
+            # 1) 파싱 전 라우팅: 고정 토픽은 테이블 조회, 장치 토픽(solar/<kind>/<id>/rx)은 분해
+            handler = self._topic_handlers.get(topic)
+            tid = None
+            if handler is None:
+                parts = topic.split("/")
+                if len(parts) != 4 or parts[3] != "rx":
+                    return
+                handler = self._device_topic_handlers.get(parts[1])
+                if handler is None:
+                    return
+                kind = parts[1]
+                if kind == "mlpe":
+                    tid = self._normalize_id(parts[2])
+                    # 관심 없는 장치의 비콘은 JSON 파싱 없이 폐기
+                    if not self._wants_device(tid):
+                        self.metrics.incr("dropped_unwatched")
+                        return
+
+            # 2) 파싱 (orjson 사용 가능 시 bytes를 바로 디코드)
+            if data is None:
+                data = _json_loads(payload)
+
+            if topic in self._debug_topics and _bridge_log.isEnabledFor(logging.DEBUG):
+                _bridge_log.debug(f"[MQTT] RX Topic: {topic}, Payload: {str(payload if payload is not None else data)[:200]}")
 
-            # 4. Complex API 상태 (필요 시)
-            elif "solar/complex" in topic:
-                status = data.get("status")
-                if status in ["SUCCESS", "COMPLETED"]:
-                    self._response_event.set()
+            handler(topic, data, tid)
 
         except Exception as e:
+            self.metrics.incr("parse_errors")
             logging.error(f"[SolarBridge] Error parsing message: {e}")
 
+        finally:
+            self.metrics.observe_message(kind, time.perf_counter() - t0)
+            now = time.monotonic()
+            if now - self._last_evict > self.EVICT_INTERVAL:
+                self._last_evict = now
+                self._evict_idle_devices(now)
+
+    def _handle_bridge(self, topic: str, data: dict, tid: Optional[str]):
+        """Bridge 관리 응답 (solar/bridge/rx)"""
+        msg_type = data.get("type")
+        seq = self._parse_seq(data)
+        if msg_type == "STICK_LIST":
+            sticks = data.get("sticks", [])
+            for s in sticks:
+                # Reconstruct version string for backward compatibility (e.g. "1.2.3")
+                if "major" in s and "minor" in s and "patch" in s:
+                    s["version"] = f"{s['major']}.{s['minor']}.{s['patch']}"
+            self._update_stick_inventory(sticks)
+            self._resolve_pending("LIST_STICKS", sticks, seq=seq)
+        elif msg_type in STICK_EVENT_TYPES:
+            # 스틱 연결/해제: 캐시 무효화 후 백그라운드 갱신 요청
+            self._stick_list_ts = None
+            self.refresh_sticks()
+        elif msg_type == "SUCCESS" and data.get("command") == "GET_NEIGHBORS":
+            # Bridge API의 GET_NEIGHBORS 응답 처리
+            res_data = data.get("data", {})
+            neighbors = res_data.get("neighbors", [])
+            self._neighbor_map["last"] = neighbors
+            self._resolve_pending("GET_NEIGHBORS", neighbors, stick_uid=data.get("stick_uid"), seq=seq)
+        elif msg_type == "SUCCESS" and data.get("command") == "CLEAR_NEIGHBORS":
+            self._resolve_pending("CLEAR_NEIGHBORS", True, stick_uid=data.get("stick_uid"), seq=seq)
+
+    def _handle_simple(self, topic: str, data: dict, tid: Optional[str]):
+        """Simple API 응답 (solar/simple/rx)"""
+        cmd_name = data.get("command")
+        res_payload = data.get("response", {})
+
+        # Protobuf 응답 평탄화(Flatten) 및 하위 호환성 처리
+        if isinstance(res_payload, dict):
+            # 1. Protobuf 필드가 중첩되어 있으면 하위로 진입
+            if "Protobuf" in res_payload:
+                res_payload = res_payload["Protobuf"]
+
+            if isinstance(res_payload, dict):
+                # 2. resp_... 또는 Resp... 로 시작하는 메시지 응답 객체 찾아서 평탄화
+                # 예: resp_get_mppt_status -> 내부의 mppt, max_duty 등을 상위로 병합
+                inner_data = None
+                for k, v in res_payload.items():
+                    if (k.lower().startswith("resp_") or k.lower().startswith("resp")) and isinstance(v, dict):
+                        inner_data = v
+                        break
+
+                if inner_data:
+                    res_payload.update(inner_data)
+
+            # 3. 특정 명령별 추가 하위 호환성 처리
+            cmd_val = res_payload.get("cmd")
+            if cmd_val in ["RESP_GET_INFO", 103]:
+                v_raw = res_payload.get("version", 0)
+                if v_raw:
+                    res_payload.update({
+                        "vid": (v_raw >> 28) & 0x0F,
+                        "pid": (v_raw >> 20) & 0x0F,
+                        "version_unpacked": f"{(v_raw >> 14) & 0x3F}.{(v_raw >> 8) & 0x3F}.{v_raw & 0xFF}"
+                    })
+                if "id_high" in res_payload:
+                    res_payload["upper_id"] = res_payload["id_high"]
+
+        tid = self._normalize_id(data.get("target_id") or "0")
+        state = self._device_state(tid)
+        if isinstance(res_payload, dict) and res_payload.get("upper_id") is not None:
+            self._remember_upper_id(tid, res_payload["upper_id"])
+
+        # 결과 상태 확인
+        if data.get("type") == "ERROR" or data.get("status") == "FAILED":
+            state[cmd_name] = {"status": "FAILED", "message": data.get("message")}
+        else:
+            # BEACON_RAW_DATA인 경우 추가 처리
+            if cmd_name == "BEACON_RAW_DATA":
+                beacon = res_payload.get("beacon_raw_data") or res_payload
+                if isinstance(beacon, dict):
+                    self._unpack_beacon_data(tid, beacon)
+                    res_payload = beacon # 평탄화된 데이터로 교체
+
+            state[cmd_name] = res_payload
+
+        # 요청 키(stick, target, command, seq)로 대기 중인 Future 완료
+        self._resolve_pending(cmd_name, state[cmd_name],
+                              stick_uid=data.get("stick_uid"), target_id=tid,
+                              seq=self._parse_seq(data))
+
+    def _handle_mlpe(self, topic: str, data: dict, tid: Optional[str]):
+        """MLPE 데이터 (solar/mlpe/<id>/rx, BEACON_RAW_DATA 등)"""
+        mlpe_pkt = data.get("mlpe_packet", {})
+        pb = mlpe_pkt.get("Protobuf", {})
+
+        cmd_name = pb.get("cmd")
+        if cmd_name == "BEACON_RAW_DATA":
+            beacon = pb.get("beacon_raw_data") or pb
+            self._unpack_beacon_data(tid, beacon)
+            # 일반 데이터로도 저장
+            self._device_state(tid)["BEACON_RAW_DATA"] = beacon
+
+    def _handle_complex(self, topic: str, data: dict, tid: Optional[str]):
+        """Complex API 상태 (solar/complex/<id>/rx)"""
+        status = data.get("status")
+        if status is None and data.get("type") == "ERROR":
+            status = data["status"] = "ERROR"  # 요청 자체를 처리하지 못한 경우 (JSON/스키마 오류)
+        _bridge_log.debug(f"[MQTT] RX Topic: {topic}, Status: {status}")
+        if status not in COMPLEX_DONE_STATUSES:
+            return  # 진행 상황 보고 (RUNNING 등)
+        target_id = self._normalize_id(topic.split("/")[2])
+        seq = data.get("transaction_id", data.get("seq"))
+        try:
+            seq = int(seq) if seq is not None else None
+        except (TypeError, ValueError):
+            seq = None
+        self._resolve_pending("COMPLEX", data, stick_uid=data.get("stick_uid"), target_id=target_id, seq=seq)
+
+    def watch_devices(self, target_ids: Optional[Iterable[str]]):
+        """
+        solar/mlpe/<id>/rx 비콘을 처리할 장치를 제한합니다. None이면 모든 장치를 처리합니다.
+        ADC 리스너가 지정한 장치는 항상 처리됩니다.
+        """
+        self._watched_ids = None if target_ids is None else {self._normalize_id(t) for t in target_ids}
+        self._push_device_filter()
+
+    def _wants_device(self, tid: str) -> bool:
+        watched = self._watched_ids
+        return watched is None or tid in watched or tid in self._listener_ids or tid == self._focus_id
+
+    def _device_state(self, tid: str) -> dict:
+        """장치별 최근 응답 dict를 반환합니다. (없으면 생성, 있으면 LRU 갱신)"""
+        state = self._mlpe_data.get(tid)
+        if state is None:
+            state = {}
+            self._mlpe_data[tid] = state
+        else:
+            self._mlpe_data.touch(tid)
+        return state
+
+    def _evict_idle_devices(self, now: Optional[float] = None) -> int:
+        evicted = self._adc_buffers.evict_idle(now)
+        evicted += self._mlpe_data.evict_idle(now)
+        evicted += self._device_info_map.evict_idle(now)
+        evicted += self._upper_id_map.evict_idle(now)
+        return evicted
+
+    def get_adc_buffer(self, target_id: str):
+        """장치의 ADC 링 버퍼(DeviceSampleBuffer)를 반환합니다. 없으면 None."""
+        return self._adc_buffers.get(self._normalize_id(target_id))
+
+    def adc_sample_rate(self, target_id: str, clock: str = "rx_ts") -> Optional[float]:
+        """target_id 버퍼에 쌓인 (중복 제거된) 비콘의 실제 수집 속도(Hz)."""
+        buf = self._adc_buffers.get(self._normalize_id(target_id))
+        return buf.effective_rate(clock) if buf is not None else None
+
+    def bridge_stats(self) -> dict[str, Any]:
+        """
+        마지막 reset_stats() 이후의 성능 카운터 스냅샷.
+        명령별 요청/재시도/타임아웃/실패/RTT 히스토그램, 토픽 종류별 수신 수, 콜백 처리 시간, 연결/메모리 상태를 포함합니다.
+        """
+        stats = self.metrics.snapshot()
+        with self._pending_lock:
+            stats["pending"] = len(self._pending)
+        stats["connected"] = self.is_connected
+        stats["disconnects"] = self.disconnect_count
+        stats["memory"] = self.memory_usage()
+        return stats
+
+    def reset_stats(self):
+        """성능 카운터를 초기화합니다. (테스트 사이클 시작 시 호출)"""
+        self.metrics.reset()
+
+    def memory_usage(self) -> dict[str, int]:
+        """장치별 버퍼의 현재 사용량을 반환합니다."""
+        return {
+            "adc_buffer_bytes": self._adc_buffers.memory_usage(),
+            "adc_devices": len(self._adc_buffers),
+            "state_devices": len(self._mlpe_data),
+            "evicted_devices": self._adc_buffers.evicted,
+        }
+
     def _unpack_beacon_data(self, tid: str, beacon: dict):
         """BEACON_RAW_DATA 패킷에서 ADC 값을 추출하고 버퍼에 저장합니다."""
+        self._unpack_adc_fields(beacon)
+
+        # 같은 비콘이 solar/simple/rx와 solar/mlpe/+/rx로 중복 수신될 수 있으므로 uptime(없으면 seq) 기준으로 한 번만 저장
+        try:
+            uptime = int(beacon.get("uptime") or 0)
+            key = uptime or int(beacon.get("seq") or 0)
+        except (TypeError, ValueError):
+            uptime = key = 0
+        rx_ts = time.monotonic()
+        if not self._adc_buffers.append(tid, beacon["vin1_raw"], beacon["vin2_raw"], beacon["iout_raw"], beacon["vout_raw"],
+                                        uptime, rx_ts, key):
+            self.metrics.incr("duplicate_beacons")
+            return
+        beacon["rx_ts"] = rx_ts
+        self._notify_adc(tid, beacon)
+
+    @staticmethod
+    def _unpack_adc_fields(beacon: dict) -> dict:
+        """raw_0/raw_1에서 vin1_raw, vin2_raw, iout_raw, vout_raw 필드를 채웁니다."""
         # ADC 데이터 언패킹 (16-bit units)
         # raw_0 = (vin1_raw << 16) | vin2_raw
         # raw_1 = (iout_raw << 16) | vout_raw
@@ -221,98 +667,335 @@ class SolarBridgeClient:
         else: # 단일 값 또는 수집 전인 경우
             beacon["iout_raw"] = 0
             beacon["vout_raw"] = r1
-        
-        if tid not in self._adc_data: self._adc_data[tid] = []
-        # 중복 방지 (uptime 등으로 체크 가능하나 여기서는 단순 추가)
-        self._adc_data[tid].append(beacon)
+        return beacon
+
+    def _notify_adc(self, tid: str, beacon: dict):
+        with self._adc_listener_lock:
+            listeners = [cb for want, cb in self._adc_listeners.values() if want is None or want == tid]
+        for cb in listeners:
+            try:
+                cb(tid, beacon)
+            except Exception as e:
+                logging.error(f"[SolarBridge] ADC listener error: {e}")
+
+    def add_adc_listener(self, callback: AdcListener, target_id: Optional[str] = None) -> int:
+        """
+        수신되는 ADC 비콘(구독 중인 solar/mlpe/+/rx 및 BEACON_RAW_DATA 응답)을 콜백으로 전달합니다.
+        target_id를 생략하면 모든 장치의 비콘을 받습니다. 콜백은 paho 스레드에서 호출되므로 가볍게 유지해야 합니다.
+        반환된 핸들로 remove_adc_listener()를 호출해 해제합니다.
+        """
+        want = self._normalize_id(target_id) if target_id is not None else None
+        handle = next(self._adc_listener_ids)
+        with self._adc_listener_lock:
+            self._adc_listeners[handle] = (want, callback)
+            self._refresh_listener_ids()
+        return handle
+
+    def remove_adc_listener(self, handle: int):
+        with self._adc_listener_lock:
+            self._adc_listeners.pop(handle, None)
+            self._refresh_listener_ids()
+
+    def _refresh_listener_ids(self):
+        self._listener_ids = frozenset(want for want, _ in self._adc_listeners.values() if want is not None)
+        self._push_device_filter()
+
+    def _push_device_filter(self):
+        """전송 계층이 비콘을 직접 거를 수 있으면 (ingest 워커) 현재 관심 장치 목록을 전달합니다."""
+        set_filter = getattr(self._client, "set_device_filter", None)
+        if set_filter is not None:
+            watched = self._watched_ids
+            focus = {self._focus_id} if self._focus_id else set()
+            set_filter(None if watched is None else watched | self._listener_ids | focus)
+
+    def stream_adc(self, target_id: str, duration: Optional[float] = None, stick_uid: Optional[str] = None,
+                   poll_interval: float = 0.3) -> Iterator[dict]:
+        """
+        target_id의 ADC 비콘을 수신되는 즉시 yield하는 이터레이터.
+        duration(초)이 지나면 종료하며, None이면 호출 측이 break할 때까지 계속됩니다.
+        stick_uid를 지정하면 poll_interval 동안 비콘이 없을 때 BEACON_RAW_DATA 요청으로 장치를 깨웁니다.
+        """
+        q: queue.Queue = queue.Queue()
+        handle = self.add_adc_listener(lambda _tid, beacon: q.put(beacon), target_id)
+        poll_key: Optional[RequestKey] = None
+        deadline = time.monotonic() + duration if duration is not None else None
+        try:
+            while True:
+                wait = poll_interval
+                if deadline is not None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return
+                    wait = min(wait, remaining)
+                try:
+                    yield q.get(timeout=wait)
+                except queue.Empty:
+                    if stick_uid:
+                        # 비콘이 뜸한 경우에만 명시적 요청 (응답도 리스너로 들어옴)
+                        if poll_key is not None:
+                            self._discard_pending(poll_key)
+                        poll_key, _ = self.submit_command(stick_uid, target_id, "BEACON_RAW_DATA", {})
+        finally:
+            self.remove_adc_listener(handle)
+            if poll_key is not None:
+                self._discard_pending(poll_key)
+
+    def collect_adc(self, target_id: str, stick_uid: Optional[str] = None, max_samples: Optional[int] = None,
+                    duration: float = 1.0, poll_interval: float = 0.3, logger=None) -> list:
+        """ADC 비콘을 max_samples개 모으거나 duration초가 지날 때까지(먼저 도달하는 쪽) 수집합니다."""
+        if logger: logger.info(f"[{target_id}] Starting ADC capture (max {max_samples or '-'} samples / {duration}s)")
+
+        samples = []
+        start_time = time.monotonic()
+        with closing(self.stream_adc(target_id, duration=duration, stick_uid=stick_uid, poll_interval=poll_interval)) as stream:
+            for beacon in stream:
+                samples.append(beacon)
+                if max_samples is not None and len(samples) >= max_samples:
+                    break
+
+        if logger:
+            elapsed = time.monotonic() - start_time
+            rate = self._stream_rate(samples)
+            logger.info(f"[{target_id}] ADC capture finished. Collected {len(samples)} samples in {elapsed:.2f}s"
+                        + (f" ({rate:.1f} Hz)." if rate else "."))
+        if not samples and logger:
+            logger.warning(f"[SolarBridge] Failed to collect any ADC samples for {self._normalize_id(target_id)}")
+        return samples
+
+    @staticmethod
+    def _stream_rate(samples: list) -> Optional[float]:
+        """수신 시각(rx_ts)이 찍힌 샘플 목록의 수집 속도(Hz)."""
+        ts = [s["rx_ts"] for s in samples if "rx_ts" in s]
+        if len(ts) < 2 or ts[-1] <= ts[0]:
+            return None
+        return (len(ts) - 1) / (ts[-1] - ts[0])
+
+    def _submit_bridge(self, cmd_name: str, payload: dict[str, Any], stick_uid: str = "") -> tuple[RequestKey, Future]:
+        """Bridge 관리 명령(solar/bridge/tx)을 전송하고 응답 Future를 반환합니다."""
+        key, fut = self._register_pending(stick_uid, "", cmd_name)
+        self._publish("solar/bridge/tx", json.dumps({**payload, "command": cmd_name, "seq": key[3]}))
+        return key, fut
+
+    def _wait_bridge(self, key: RequestKey, fut: Future, timeout: float) -> Any:
+        try:
+            return fut.result(timeout=timeout)
+        except FutureTimeoutError:
+            self._discard_pending(key)
+            self.metrics.command(key[2], "timeouts")
+            return None
+        except ConnectionError:
+            self._discard_pending(key)
+            return None
+
+    def _deadline(self, cmd_name: str, stick_uid: str, default: float) -> float:
+        """명령 응답 대기 시간. adaptive_timeouts가 꺼져 있거나 관측치가 부족하면 default."""
+        if not self.adaptive_timeouts:
+            return default
+        return self.latency.deadline(cmd_name, stick_uid, default)
+
+    def _update_stick_inventory(self, sticks: list):
+        old_uids = {s.get("uid") for s in self._stick_list}
+        new_uids = {s.get("uid") for s in sticks}
+        added = [s for s in sticks if s.get("uid") not in old_uids]
+        removed = [s for s in self._stick_list if s.get("uid") not in new_uids]
+        self._stick_list = sticks
+        self._stick_list_ts = time.monotonic()
+        if not (added or removed):
+            return
+        for cb in list(self._stick_listeners.values()):
+            try:
+                cb(added, removed)
+            except Exception as e:
+                logging.error(f"[SolarBridge] Stick listener error: {e}")
+
+    def subscribe_sticks(self, callback: StickListener) -> int:
+        """스틱 추가/제거 시 callback(added, removed)를 호출합니다. (paho 스레드에서 호출됨)"""
+        handle = next(self._stick_listener_ids)
+        self._stick_listeners[handle] = callback
+        return handle
+
+    def unsubscribe_sticks(self, handle: int):
+        self._stick_listeners.pop(handle, None)
+
+    def refresh_sticks(self):
+        """LIST_STICKS를 전송만 하고 기다리지 않습니다. 응답이 오면 캐시가 갱신됩니다."""
+        if self._stick_refresh_key is not None:
+            self._discard_pending(self._stick_refresh_key)
+        self._stick_refresh_key, _ = self._submit_bridge("LIST_STICKS", {})
+
+    def get_sticks(self, max_age: Optional[float] = None, logger=None) -> list:
+        """
+        캐시된 스틱 목록을 반환합니다. 캐시가 max_age(기본 stick_ttl)보다 오래됐거나
+        무효화된 경우에만 list_sticks()로 동기 조회합니다.
+        """
+        max_age = self.stick_ttl if max_age is None else max_age
+        ts = self._stick_list_ts
+        if ts is not None and self._stick_list and time.monotonic() - ts <= max_age:
+            return list(self._stick_list)
+        return self.list_sticks(logger=logger)
+
+    def start_stick_watcher(self, interval: Optional[float] = None):
+        """백그라운드에서 주기적으로 LIST_STICKS를 요청해 캐시를 최신으로 유지합니다."""
+        if self._stick_watcher is not None and self._stick_watcher.is_alive():
+            return
+        interval = interval if interval is not None else max(self.stick_ttl / 2, 1.0)
+        self._stick_watcher_stop.clear()
+
+        def _run():
+            while not self._stick_watcher_stop.wait(interval):
+                try:
+                    self.refresh_sticks()
+                except Exception as e:
+                    logging.error(f"[SolarBridge] Stick watcher error: {e}")
+
+        self._stick_watcher = threading.Thread(target=_run, name="stick-watcher", daemon=True)
+        self._stick_watcher.start()
+
+    def stop_stick_watcher(self):
+        self._stick_watcher_stop.set()
+        if self._stick_watcher is not None:
+            self._stick_watcher.join(timeout=1.0)
+            self._stick_watcher = None
 
     def list_sticks(self, logger=None) -> list:
-        self._stick_list = []
-        self._response_event.clear()
-        
-        self._client.publish("solar/bridge/tx", json.dumps({"command": "LIST_STICKS"}))
-        
-        if self._response_event.wait(timeout=self.timeout):
-            return self._stick_list
-        else:
+        key, fut = self._submit_bridge("LIST_STICKS", {})
+        sticks = self._wait_bridge(key, fut, self._deadline("LIST_STICKS", "", self.timeout))
+        if sticks is None:
             if logger:
                 logger.warning("Timeout waiting for STICK_LIST response")
             return []
+        return sticks
 
     def dump_adc(self, target_id: str, stick_uid: str, duration: float = 1.0, logger=None) -> list:
-        """BEACON_RAW_DATA 명령을 폴링하여 ADC 데이터를 수집합니다."""
-        tid_fmt = self._normalize_id(target_id)
-        self._adc_data[tid_fmt] = []
-        
-        if logger: logger.info(f"[{target_id}] Starting ADC collection via BEACON_RAW_DATA polling for {duration}s")
-        
-        start_time = time.time()
-        while time.time() - start_time < duration:
-            # 타임아웃은 짧게 가져가서 빈번하게 요청 가능하도록 함 (500ms 이내 응답 예상)
-            self._run_command(stick_uid, target_id, "BEACON_RAW_DATA", {}, logger=logger, cmd_timeout=0.6, attempts=1)
-            
-            # 수집 주기 조절 (주기적으로 요청)
-            # 브릿지/장치 성능을 고려하여 0.2초 정도 대기
-            time.sleep(0.2)
-        
-        samples = self._adc_data.get(tid_fmt, [])
-        if logger: logger.info(f"[{target_id}] ADC collection finished. Collected {len(samples)} samples.")
-        
-        if not samples and logger:
-            logger.warning(f"[SolarBridge] Failed to collect any ADC samples for {tid_fmt}")
-        return samples
+        """duration초 동안 ADC 비콘을 수집합니다. (수신 비콘 기반, 비콘이 없을 때만 BEACON_RAW_DATA 요청)"""
+        self._adc_buffers.clear(self._normalize_id(target_id))
+        return self.collect_adc(target_id, stick_uid, duration=duration, logger=logger)
+
+    @staticmethod
+    def _is_broadcast(target_id: str) -> bool:
+        return target_id in ["0", "0xFFFFFFFF", "0xffffffff"]
+
+    @staticmethod
+    def _target_id_value(target_id: str) -> int:
+        try:
+            return int(target_id, 16) if target_id.lower().startswith("0x") else int(target_id)
+        except ValueError:
+            return 0
 
     def get_neighbors(self, stick_uid: str, target_id: str = "0", logger=None) -> list:
         """Bridge API를 사용하여 이웃 노드 정보를 가져옵니다."""
-        self._response_event.clear()
         self._neighbor_map.pop("last", None)
-        
-        try:
-            tid_val = int(target_id, 16) if target_id.lower().startswith("0x") else int(target_id)
-        except ValueError:
-            tid_val = 0
-            
-        payload = {
-            "command": "GET_NEIGHBORS",
+        key, fut = self._submit_bridge("GET_NEIGHBORS", {
             "stick_uid": stick_uid,
-            "target_id": tid_val
-        }
-        self._client.publish("solar/bridge/tx", json.dumps(payload))
-        
-        if self._response_event.wait(timeout=5.0): # Pagination 등으로 인해 타임아웃 넉넉히
-            return self._neighbor_map.get("last", [])
-        return []
+            "target_id": self._target_id_value(target_id)
+        }, stick_uid=stick_uid)
+
+        # Pagination 등으로 인해 기본 타임아웃 넉넉히
+        neighbors = self._wait_bridge(key, fut, self._deadline("GET_NEIGHBORS", stick_uid, 5.0))
+        return neighbors if neighbors is not None else []
 
     def clear_neighbors(self, stick_uid: str, target_id: str = "0", logger=None) -> bool:
-        self._response_event.clear()
-        try:
-            tid_val = int(target_id, 16) if target_id.lower().startswith("0x") else int(target_id)
-        except ValueError:
-            tid_val = 0
-            
-        self._client.publish("solar/bridge/tx", json.dumps({
-            "command": "CLEAR_NEIGHBORS", 
+        key, fut = self._submit_bridge("CLEAR_NEIGHBORS", {
             "stick_uid": stick_uid,
-            "target_id": tid_val
-        }))
-        return self._response_event.wait(timeout=self.timeout)
+            "target_id": self._target_id_value(target_id)
+        }, stick_uid=stick_uid)
+        return self._wait_bridge(key, fut, self._deadline("CLEAR_NEIGHBORS", stick_uid, self.timeout)) is not None
 
     def get_device_info(self, target_id: str, stick_uid: str, logger=None) -> Optional[dict]:
         return self._run_command(stick_uid, target_id, "REQ_GET_INFO", {}, logger=logger)
 
-    def req_shutdown(self, target_id: str, stick_uid: str, rsd1=True, rsd2=True, logger=None) -> Optional[dict]:
+    def get_device_info_any(self, target_id: str, stick_uids: Iterable[str], logger=None,
+                            attempts: int = 3) -> tuple[Optional[str], Optional[dict]]:
+        """
+        모든 스틱으로 REQ_GET_INFO를 동시에 보내고 가장 먼저 온 정상 응답을 (stick_uid, info)로 반환합니다.
+        응답한 스틱은 preferred_stick()으로 조회할 수 있도록 기억합니다. 응답이 없으면 (None, None).
+        (Bridge가 stick_uid/seq를 돌려주지 않으면 응답 스틱 구분은 요청 순서 기준으로 추정됩니다.)
+        """
+        uids = list(dict.fromkeys(u for u in stick_uids if u))
+        if not uids:
+            return None, None
+        tid_norm = self._normalize_id(target_id)
+        # 적응형 대기 시간은 첫 시도에만 적용하고, 재시도는 _run_command와 같이 두 배씩 늘림 (느린 장치 대비)
+        wait_timeout = max(self._deadline("REQ_GET_INFO", uid, self.timeout) for uid in uids)
+
+        for attempt in range(1, attempts + 1):
+            if logger:
+                logger.debug(f"[SolarBridge] TX REQ_GET_INFO to {target_id} via {len(uids)} sticks (Attempt {attempt}/{attempts})")
+            if attempt > 1:
+                self.metrics.command("REQ_GET_INFO", "retries")
+            reqs = {fut: key for key, fut in (self.submit_command(uid, target_id, "REQ_GET_INFO", {}) for uid in uids)}
+            deadline = time.monotonic() + wait_timeout
+            remaining = set(reqs)
+            failed = []
+            try:
+                while remaining:
+                    done, remaining = wait(remaining, timeout=max(0.0, deadline - time.monotonic()), return_when=FIRST_COMPLETED)
+                    if not done:
+                        break
+                    for fut in done:
+                        if fut.exception() is not None:
+                            continue
+                        res = fut.result()
+                        if isinstance(res, dict) and res.get("status") != "FAILED":
+                            uid = reqs[fut][0]
+                            self._device_routes[tid_norm] = uid
+                            return uid, res
+                        if isinstance(res, dict):
+                            failed.append(res)
+            finally:
+                for key in reqs.values():
+                    self._discard_pending(key)
+            if failed and not remaining:
+                # 모든 스틱이 FAILED로 응답: 타임아웃이 아니므로 대기 시간은 늘리지 않음
+                self.metrics.command("REQ_GET_INFO", "failures")
+                if logger:
+                    logger.warning(f"[SolarBridge] REQ_GET_INFO failed for {target_id} via {uids} (Attempt {attempt}): {failed[0].get('message')}")
+            else:
+                self.metrics.command("REQ_GET_INFO", "timeouts")
+                if logger:
+                    logger.warning(f"[SolarBridge] REQ_GET_INFO no response from {target_id} via {uids} (Attempt {attempt}, {wait_timeout:.2f}s)")
+                if self.adaptive_timeouts:
+                    wait_timeout = min(wait_timeout * 2, self.latency.policy.cap)
+            if not self.is_connected:
+                break
+        return None, None
+
+    def preferred_stick(self, target_id: str) -> Optional[str]:
+        """get_device_info_any()로 장치에 마지막으로 닿은 스틱 UID."""
+        return self._device_routes.get(self._normalize_id(target_id))
+
+    @staticmethod
+    def _shutdown_args(rsd1: bool, rsd2: bool) -> dict:
         # ReqShutdown Protobuf fields: rsd1, rsd2, groupNum1
-        # 트리거형 명령이므로 1회만 시도하여 지연 방지
-        args = {"rsd1": rsd1, "rsd2": rsd2, "groupNum1": 0xFFFFFFFF}
-        return self._run_command(stick_uid, target_id, "REQ_SHUTDOWN", args, logger=logger, attempts=1)
+        return {"rsd1": rsd1, "rsd2": rsd2, "groupNum1": 0xFFFFFFFF}
 
-    def set_mesh_config(self, target_id: str, stick_uid: str, asp_interval: int = 200, tx_pwr: int = -20, logger=None) -> Optional[dict]:
-        """메쉬 설정을 변경합니다. (기본: Channel 39, ASP 200ms, TxPwr -20dBm, Group 0xFF)"""
-        args = {
+    @staticmethod
+    def _mesh_config_args(asp_interval: int, tx_pwr: int) -> dict:
+        return {
             "l1": {"channel": 39, "txPwr": tx_pwr},
             "l2": {"aspInterval": asp_interval},
             "l3": {"meshGroupId": 0xff, "relayOption": 0, "relayRatio": 50}
         }
+
+    @staticmethod
+    def _mppt_config_args(max_duty=None, min_limit=None, max_limit=None, bypass_condition=None) -> dict:
+        # Protobuf 필드 이름(CamelCase)에 맞춰 아규먼트 생성
+        # 0xFFFFFFFF는 변경하지 않음을 의미 (서버/디바이스 스펙)
+        return {
+            "maxDuty": max_duty if max_duty is not None else 0xFFFFFFFF,
+            "dutyMinLimit": min_limit if min_limit is not None else 0xFFFFFFFF,
+            "dutyMaxLimit": max_limit if max_limit is not None else 0xFFFFFFFF,
+            "bypassCondition": bypass_condition if bypass_condition is not None else False
+        }
+
+    def req_shutdown(self, target_id: str, stick_uid: str, rsd1=True, rsd2=True, logger=None) -> Optional[dict]:
+        # 트리거형 명령이므로 1회만 시도하여 지연 방지
+        args = self._shutdown_args(rsd1, rsd2)
+        return self._run_command(stick_uid, target_id, "REQ_SHUTDOWN", args, logger=logger, attempts=1)
+
+    def set_mesh_config(self, target_id: str, stick_uid: str, asp_interval: int = 200, tx_pwr: int = -20, logger=None) -> Optional[dict]:
+        """메쉬 설정을 변경합니다. (기본: Channel 39, ASP 200ms, TxPwr -20dBm, Group 0xFF)"""
+        args = self._mesh_config_args(asp_interval, tx_pwr)
         return self._run_command(stick_uid, target_id, "REQ_SET_MESH_CONFIG", args, logger=logger)
 
     def get_mppt_status(self, target_id: str, stick_uid: str, logger=None) -> Optional[dict]:
@@ -323,54 +1006,197 @@ class SolarBridgeClient:
         return self._run_command(stick_uid, target_id, "REQ_ENABLE_MPPT", args, logger=logger, attempts=1)
 
     def set_mppt_config(self, target_id: str, stick_uid: str, max_duty=None, min_limit=None, max_limit=None, bypass_condition=None, logger=None) -> Optional[dict]:
-        # Protobuf 필드 이름(CamelCase)에 맞춰 아규먼트 생성
-        # 0xFFFFFFFF는 변경하지 않음을 의미 (서버/디바이스 스펙)
-        args = {
-            "maxDuty": max_duty if max_duty is not None else 0xFFFFFFFF,
-            "dutyMinLimit": min_limit if min_limit is not None else 0xFFFFFFFF,
-            "dutyMaxLimit": max_limit if max_limit is not None else 0xFFFFFFFF,
-            "bypassCondition": bypass_condition if bypass_condition is not None else False
-        }
+        args = self._mppt_config_args(max_duty, min_limit, max_limit, bypass_condition)
         return self._run_command(stick_uid, target_id, "REQ_SET_MPPT_CONFIG", args, logger=logger)
 
-    def _run_command(self, stick_uid: str, target_id: str, cmd_name: str, args: dict, logger=None, cmd_timeout=None, attempts=2) -> Optional[dict]:
+    def run_script(self, target_id: str, stick_uid: str, script: ComplexScript, logger=None) -> dict:
+        """
+        여러 명령/대기/ADC 수집 단계를 Complex API(solar/complex/tx) 트랜잭션 하나로 실행합니다.
+        Bridge가 Complex API를 지원하지 않거나(UNSUPPORTED/무응답) 스크립트를 거부하면 같은 단계를 로컬에서 순서대로 실행합니다.
+        반환: {"status": "COMPLETED"|"FAILED", "results": [명령별 응답], "samples": [ADC 비콘], "message": str}
+        """
+        if self._complex_supported is not False:
+            res = self._run_complex(target_id, stick_uid, script, logger=logger)
+            if res is not None:
+                return res
+        return self._run_script_locally(target_id, stick_uid, script, logger=logger)
+
+    def _run_complex(self, target_id: str, stick_uid: str, script: ComplexScript, logger=None) -> Optional[dict]:
         tid_norm = self._normalize_id(target_id)
-        
-        # 새로운 Simple API 페이로드 구성
-        is_broadcast = target_id in ["0", "0xFFFFFFFF", "0xffffffff"]
-        route = 1 if is_broadcast else 2
-        
+        key, fut = self._register_pending(stick_uid, tid_norm, "COMPLEX")
+        payload = {
+            "stick_uid": stick_uid,
+            "target_id": tid_norm,
+            "transaction_id": key[3],
+            "steps": script.steps,
+        }
+        # 대기/수집 시간 + 명령별 응답 시간만큼 기다림
+        per_cmd = max((self._deadline(st["command"], stick_uid, self.timeout) for st in script.steps if st["op"] == "command"),
+                      default=self.timeout)
+        wait_timeout = script.duration() + per_cmd * max(1, script.command_count())
+
+        if logger:
+            logger.debug(f"[SolarBridge] TX COMPLEX to {target_id}: {len(script.steps)} steps (timeout {wait_timeout:.1f}s)")
+        self._publish("solar/complex/tx", json.dumps(payload))
+        try:
+            data = fut.result(timeout=wait_timeout)
+        except ConnectionError as e:
+            return {"status": "FAILED", "results": [], "samples": [], "message": str(e)}
+        except FutureTimeoutError:
+            self._discard_pending(key)
+            self.metrics.command("COMPLEX", "timeouts")
+            if self._complex_supported is None:
+                # 응답을 한 번도 받지 못한 Bridge는 Complex API 미지원으로 간주
+                self._complex_supported = False
+                if logger: logger.warning("[SolarBridge] Complex API not responding; falling back to local steps")
+                return None
+            return {"status": "FAILED", "results": [], "samples": [], "message": "COMPLEX timeout"}
+
+        status = data.get("status")
+        if status in COMPLEX_REJECT_STATUSES:
+            # 미지원이거나, 한 번도 성공한 적 없는 Bridge가 스크립트를 거부하면 이후에도 로컬에서 실행
+            if status == "UNSUPPORTED" or self._complex_supported is None:
+                self._complex_supported = False
+            if logger: logger.warning(f"[SolarBridge] Complex API rejected script ({status}: {data.get('message', '')}); "
+                                      "falling back to local steps")
+            return None
+        if status == "FAILED" and self._complex_supported is not True and not data.get("results"):
+            # 지원 여부를 확인하지 못한 Bridge가 아무 단계도 실행하지 않고 실패: 이번 스크립트만 로컬에서 실행
+            if logger: logger.warning(f"[SolarBridge] Complex script failed before any step ({data.get('message', '')}); "
+                                      "running steps locally")
+            return None
+        if status in COMPLEX_OK_STATUSES:
+            self._complex_supported = True
+
+        samples = [self._unpack_adc_fields(b) for b in data.get("samples") or [] if isinstance(b, dict)]
+        return {
+            "status": "FAILED" if status == "FAILED" else "COMPLETED",
+            "results": data.get("results") or [],
+            "samples": samples,
+            "message": data.get("message", ""),
+        }
+
+    def _run_script_locally(self, target_id: str, stick_uid: str, script: ComplexScript, logger=None) -> dict:
+        results: list = []
+        samples: list = []
+        for step in script.steps:
+            op = step["op"]
+            if op == "command":
+                cmd_name = step["command"]
+                res = self._run_command(stick_uid, target_id, cmd_name, step.get("args", {}), logger=logger,
+                                        attempts=ComplexScript.LOCAL_ATTEMPTS.get(cmd_name, 2))
+                if res is None:
+                    return {"status": "FAILED", "results": results, "samples": samples, "message": f"{cmd_name} no response"}
+                results.append(res)
+            elif op == "wait":
+                time.sleep(step["ms"] / 1000.0)
+            elif op == "capture_adc":
+                samples.extend(self.collect_adc(target_id, stick_uid, max_samples=step.get("max_samples"),
+                                                duration=step["ms"] / 1000.0, logger=logger))
+        return {"status": "COMPLETED", "results": results, "samples": samples, "message": ""}
+
+    def submit_command(self, stick_uid: str, target_id: str, cmd_name: str, args: dict) -> tuple[RequestKey, Future]:
+        """
+        Simple API 명령을 전송하고 즉시 (요청 키, Future)를 반환합니다.
+        서로 다른 장치/스틱에 대한 여러 요청을 동시에 보내고 각각 기다릴 수 있습니다.
+        """
+        tid_norm = self._normalize_id(target_id)
+        is_broadcast = self._is_broadcast(target_id)
+        key, fut = self._register_pending(stick_uid, tid_norm, cmd_name)
+
         payload = {
             "stick_uid": stick_uid,
             "command": cmd_name,
             "target_id": tid_norm,
-            "routing_type": route,
+            "routing_type": 1 if is_broadcast else 2,
+            "seq": key[3],
             "args": args
         }
+        self._publish("solar/simple/tx", json.dumps(payload))
+        return key, fut
 
-        wait_timeout = cmd_timeout if cmd_timeout is not None else self.timeout
+    def _run_command(self, stick_uid: str, target_id: str, cmd_name: str, args: dict, logger=None, cmd_timeout=None, attempts=2) -> Optional[dict]:
+        is_broadcast = self._is_broadcast(target_id)
+        adaptive = cmd_timeout is None and self.adaptive_timeouts
+        wait_timeout = cmd_timeout if cmd_timeout is not None else self._deadline(cmd_name, stick_uid, self.timeout)
 
         max_attempts = attempts
         for attempt in range(1, max_attempts + 1):
-            self._response_event.clear()
-            self._responses.pop(cmd_name, None)
-            
             if logger:
                 logger.debug(f"[SolarBridge] TX {cmd_name} to {target_id} (Attempt {attempt}/{max_attempts})")
-            
-            self._client.publish("solar/simple/tx", json.dumps(payload))
+            if attempt > 1:
+                self.metrics.command(cmd_name, "retries")
+
+            key, fut = self.submit_command(stick_uid, target_id, cmd_name, args)
 
-            if is_broadcast and "GET" not in cmd_name:
+            if is_broadcast and "GET" not in cmd_name and not fut.done():
+                self._discard_pending(key)
                 return {"status": "SUCCESS"}
 
-            if self._response_event.wait(timeout=wait_timeout):
-                res = self._mlpe_data.get(tid_norm, {}).get(cmd_name) or self._responses.get(cmd_name)
-                if isinstance(res, dict) and res.get("status") == "FAILED":
-                    if logger: logger.warning(f"[SolarBridge] {cmd_name} failed: {res.get('message')}")
-                    continue # Retry on failure
-                return res
-            
-            if logger:
-                logger.warning(f"[SolarBridge] {cmd_name} timeout for {target_id} (Attempt {attempt})")
-        
+            try:
+                res = fut.result(timeout=wait_timeout)
+            except ConnectionError as e:
+                # 연결 끊김: 재시도해도 응답이 없으므로 즉시 반환
+                if logger:
+                    logger.warning(f"[SolarBridge] {cmd_name} aborted for {target_id}: {e}")
+                return None
+            except FutureTimeoutError:
+                self._discard_pending(key)
+                self.metrics.command(cmd_name, "timeouts")
+                if logger:
+                    logger.warning(f"[SolarBridge] {cmd_name} timeout for {target_id} (Attempt {attempt}, {wait_timeout:.2f}s)")
+                if adaptive:
+                    # 재시도는 대기 시간을 늘려 느린 장치에 기회를 줌 (cap 이내)
+                    wait_timeout = min(wait_timeout * 2, self.latency.policy.cap)
+                continue
+
+            if isinstance(res, dict) and res.get("status") == "FAILED":
+                self.metrics.command(cmd_name, "failures")
+                if logger: logger.warning(f"[SolarBridge] {cmd_name} failed: {res.get('message')}")
+                continue # Retry on failure
+            return res
+
         return None
+
+
+class ComplexScript:
+    """
+    Complex API 트랜잭션으로 보낼 단계 목록 빌더.
+    예) ComplexScript().req_shutdown(True, False).wait(100).capture_adc(1000, max_samples=10)
+    """
+    # 로컬 실행 시 재시도하지 않는 트리거형 명령 (SolarBridgeClient의 개별 메서드와 동일)
+    LOCAL_ATTEMPTS = {"REQ_SHUTDOWN": 1, "REQ_ENABLE_MPPT": 1}
+
+    def __init__(self):
+        self.steps: list[dict[str, Any]] = []
+
+    def command(self, cmd_name: str, args: Optional[dict] = None) -> ComplexScript:
+        self.steps.append({"op": "command", "command": cmd_name, "args": args or {}})
+        return self
+
+    def wait(self, ms: int) -> ComplexScript:
+        self.steps.append({"op": "wait", "ms": int(ms)})
+        return self
+
+    def capture_adc(self, ms: int, max_samples: Optional[int] = None) -> ComplexScript:
+        step: dict[str, Any] = {"op": "capture_adc", "ms": int(ms)}
+        if max_samples is not None:
+            step["max_samples"] = max_samples
+        self.steps.append(step)
+        return self
+
+    def req_shutdown(self, rsd1: bool = True, rsd2: bool = True) -> ComplexScript:
+        return self.command("REQ_SHUTDOWN", SolarBridgeClient._shutdown_args(rsd1, rsd2))
+
+    def enable_mppt(self, enable: bool = True) -> ComplexScript:
+        return self.command("REQ_ENABLE_MPPT", {"status": enable})
+
+    def set_mppt_config(self, max_duty=None, min_limit=None, max_limit=None, bypass_condition=None) -> ComplexScript:
+        return self.command("REQ_SET_MPPT_CONFIG", SolarBridgeClient._mppt_config_args(max_duty, min_limit, max_limit, bypass_condition))
+
+    def duration(self) -> float:
+        """대기/수집 단계 시간의 합 (초)."""
+        return sum(s["ms"] for s in self.steps if s["op"] in ("wait", "capture_adc")) / 1000.0
+
+    def command_count(self) -> int:
+        return sum(1 for s in self.steps if s["op"] == "command")
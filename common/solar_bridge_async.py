@@ -0,0 +1,191 @@
+from __future__ import annotations
+import asyncio
+from typing import Any, Optional
+
+from common.solar_bridge import SolarBridgeClient, ComplexScript, RequestKey
+
+class AsyncSolarBridgeClient:
+    """
+    SolarBridgeClient의 asyncio 버전.
+    MQTT 연결과 응답 파싱은 내부 SolarBridgeClient(paho 스레드)가 담당하고,
+    요청별 Future를 asyncio Future로 감싸 하나의 이벤트 루프에서 여러 장치/스틱과 동시에 통신합니다.
+    타임아웃은 asyncio.wait_for, 취소는 Task.cancel()로 처리되며 취소된 요청은 대기 목록에서 제거됩니다.
+    """
+    def __init__(self, host: str = "localhost", port: int = 1883, timeout: float = 1.0,
+                 client: Optional[SolarBridgeClient] = None):
+        self._sync = client if client is not None else SolarBridgeClient(host=host, port=port, timeout=timeout)
+        self.timeout = self._sync.timeout
+
+    @property
+    def sync_client(self) -> SolarBridgeClient:
+        return self._sync
+
+    def bridge_stats(self) -> dict[str, Any]:
+        """내부 SolarBridgeClient와 같은 성능 카운터 (동기/비동기 호출 합산)."""
+        return self._sync.bridge_stats()
+
+    def reset_stats(self):
+        self._sync.reset_stats()
+
+    async def start(self):
+        """연결 및 기본 토픽 구독 (블로킹 구간은 executor에서 실행)."""
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self._sync.start)
+
+    async def stop(self):
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self._sync.stop)
+
+    async def _await_request(self, key: RequestKey, fut, timeout: float) -> Any:
+        """
+        요청 Future를 기다립니다. 타임아웃/취소 시 대기 목록에서 제거하고 타임아웃이면 None을 반환합니다.
+        연결이 끊겨 요청이 중단되면 그 ConnectionError를 반환합니다 (재시도해도 응답이 없으므로 호출자가 바로 중단).
+        요청 수/RTT는 SolarBridgeClient가, 타임아웃은 여기서 같은 BridgeMetrics에 기록합니다 (bridge_stats()).
+        """
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(fut), timeout=timeout)
+        except asyncio.TimeoutError:
+            self._sync.metrics.command(key[2], "timeouts")
+            return None
+        except ConnectionError as e:
+            return e
+        finally:
+            self._sync._discard_pending(key)
+
+    async def _run_command(self, stick_uid: str, target_id: str, cmd_name: str, args: dict, logger=None, cmd_timeout=None, attempts=2) -> Optional[dict]:
+        is_broadcast = self._sync._is_broadcast(target_id)
+        adaptive = cmd_timeout is None and self._sync.adaptive_timeouts
+        wait_timeout = cmd_timeout if cmd_timeout is not None else self._sync._deadline(cmd_name, stick_uid, self.timeout)
+
+        for attempt in range(1, attempts + 1):
+            if logger:
+                logger.debug(f"[SolarBridge] TX {cmd_name} to {target_id} (Attempt {attempt}/{attempts})")
+            if attempt > 1:
+                self._sync.metrics.command(cmd_name, "retries")
+
+            key, fut = self._sync.submit_command(stick_uid, target_id, cmd_name, args)
+
+            if fut.done() and fut.exception() is not None:
+                # 연결 없음: 재시도하지 않음
+                if logger:
+                    logger.warning(f"[SolarBridge] {cmd_name} aborted for {target_id}: {fut.exception()}")
+                return None
+
+            if is_broadcast and "GET" not in cmd_name:
+                self._sync._discard_pending(key)
+                return {"status": "SUCCESS"}
+
+            res = await self._await_request(key, fut, wait_timeout)
+            if isinstance(res, ConnectionError):
+                # 연결 끊김: 재시도해도 응답이 없으므로 즉시 반환 (SolarBridgeClient._run_command와 동일)
+                if logger:
+                    logger.warning(f"[SolarBridge] {cmd_name} aborted for {target_id}: {res}")
+                return None
+            if res is None:
+                if logger:
+                    logger.warning(f"[SolarBridge] {cmd_name} timeout for {target_id} (Attempt {attempt}, {wait_timeout:.2f}s)")
+                if adaptive:
+                    wait_timeout = min(wait_timeout * 2, self._sync.latency.policy.cap)
+                continue
+
+            if isinstance(res, dict) and res.get("status") == "FAILED":
+                self._sync.metrics.command(cmd_name, "failures")
+                if logger: logger.warning(f"[SolarBridge] {cmd_name} failed: {res.get('message')}")
+                continue # Retry on failure
+            return res
+
+        return None
+
+    async def list_sticks(self, logger=None) -> list:
+        key, fut = self._sync._submit_bridge("LIST_STICKS", {})
+        sticks = await self._await_request(key, fut, self._sync._deadline("LIST_STICKS", "", self.timeout))
+        if isinstance(sticks, ConnectionError):
+            if logger:
+                logger.warning(f"STICK_LIST aborted: {sticks}")
+            return []
+        if sticks is None:
+            if logger:
+                logger.warning("Timeout waiting for STICK_LIST response")
+            return []
+        return sticks
+
+    async def get_neighbors(self, stick_uid: str, target_id: str = "0", logger=None) -> list:
+        key, fut = self._sync._submit_bridge("GET_NEIGHBORS", {
+            "stick_uid": stick_uid,
+            "target_id": self._sync._target_id_value(target_id)
+        }, stick_uid=stick_uid)
+        neighbors = await self._await_request(key, fut, self._sync._deadline("GET_NEIGHBORS", stick_uid, 5.0))
+        return neighbors if neighbors is not None and not isinstance(neighbors, ConnectionError) else []
+
+    async def clear_neighbors(self, stick_uid: str, target_id: str = "0", logger=None) -> bool:
+        key, fut = self._sync._submit_bridge("CLEAR_NEIGHBORS", {
+            "stick_uid": stick_uid,
+            "target_id": self._sync._target_id_value(target_id)
+        }, stick_uid=stick_uid)
+        res = await self._await_request(key, fut, self._sync._deadline("CLEAR_NEIGHBORS", stick_uid, self.timeout))
+        return res is not None and not isinstance(res, ConnectionError)
+
+    async def get_device_info(self, target_id: str, stick_uid: str, logger=None) -> Optional[dict]:
+        return await self._run_command(stick_uid, target_id, "REQ_GET_INFO", {}, logger=logger)
+
+    async def req_shutdown(self, target_id: str, stick_uid: str, rsd1=True, rsd2=True, logger=None) -> Optional[dict]:
+        args = self._sync._shutdown_args(rsd1, rsd2)
+        return await self._run_command(stick_uid, target_id, "REQ_SHUTDOWN", args, logger=logger, attempts=1)
+
+    async def set_mesh_config(self, target_id: str, stick_uid: str, asp_interval: int = 200, tx_pwr: int = -20, logger=None) -> Optional[dict]:
+        args = self._sync._mesh_config_args(asp_interval, tx_pwr)
+        return await self._run_command(stick_uid, target_id, "REQ_SET_MESH_CONFIG", args, logger=logger)
+
+    async def get_mppt_status(self, target_id: str, stick_uid: str, logger=None) -> Optional[dict]:
+        return await self._run_command(stick_uid, target_id, "REQ_GET_MPPT_STATUS", {}, logger=logger)
+
+    async def enable_mppt(self, target_id: str, stick_uid: str, enable: bool = True, logger=None) -> Optional[dict]:
+        return await self._run_command(stick_uid, target_id, "REQ_ENABLE_MPPT", {"status": enable}, logger=logger, attempts=1)
+
+    async def set_mppt_config(self, target_id: str, stick_uid: str, max_duty=None, min_limit=None, max_limit=None, bypass_condition=None, logger=None) -> Optional[dict]:
+        args = self._sync._mppt_config_args(max_duty, min_limit, max_limit, bypass_condition)
+        return await self._run_command(stick_uid, target_id, "REQ_SET_MPPT_CONFIG", args, logger=logger)
+
+    async def run_script(self, target_id: str, stick_uid: str, script: ComplexScript, logger=None) -> dict:
+        """Complex API 트랜잭션 (로컬 폴백 포함)을 executor에서 실행합니다."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, lambda: self._sync.run_script(target_id, stick_uid, script, logger=logger))
+
+    async def collect_adc(self, target_id: str, stick_uid: Optional[str] = None, max_samples: Optional[int] = None,
+                          duration: float = 1.0, poll_interval: float = 0.3, logger=None) -> list:
+        """ADC 비콘을 max_samples개 모으거나 duration초가 지날 때까지(먼저 도달하는 쪽) 수집합니다."""
+        loop = asyncio.get_running_loop()
+        q: asyncio.Queue = asyncio.Queue()
+        handle = self._sync.add_adc_listener(lambda _tid, beacon: loop.call_soon_threadsafe(q.put_nowait, beacon), target_id)
+        poll_key: Optional[RequestKey] = None
+
+        if logger: logger.info(f"[{target_id}] Starting ADC capture (max {max_samples or '-'} samples / {duration}s)")
+
+        samples = []
+        deadline = loop.time() + duration
+        try:
+            while max_samples is None or len(samples) < max_samples:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    samples.append(await asyncio.wait_for(q.get(), timeout=min(poll_interval, remaining)))
+                except asyncio.TimeoutError:
+                    if stick_uid:
+                        if poll_key is not None:
+                            self._sync._discard_pending(poll_key)
+                        poll_key, _ = self._sync.submit_command(stick_uid, target_id, "BEACON_RAW_DATA", {})
+        finally:
+            self._sync.remove_adc_listener(handle)
+            if poll_key is not None:
+                self._sync._discard_pending(poll_key)
+
+        if logger: logger.info(f"[{target_id}] ADC capture finished. Collected {len(samples)} samples.")
+        if not samples and logger:
+            logger.warning(f"[SolarBridge] Failed to collect any ADC samples for {self._sync._normalize_id(target_id)}")
+        return samples
+
+    async def dump_adc(self, target_id: str, stick_uid: str, duration: float = 1.0, logger=None) -> list:
+        """duration초 동안 ADC 비콘을 수집합니다. (수신 비콘 기반, 비콘이 없을 때만 BEACON_RAW_DATA 요청)"""
+        self._sync._adc_buffers.clear(self._sync._normalize_id(target_id))
+        return await self.collect_adc(target_id, stick_uid, duration=duration, logger=logger)
@@ -11,6 +11,7 @@ from pathlib import Path
 
 from common.config_utils import load_json, get_hostname_jig_id, ConfigSyncThread
 from common.db_server import create_db_server
+from common.bridge_service import BridgeServer, SOCKET_ENV, DEFAULT_SOCKET_PATH, create_bridge_client
 from common.logging_utils import build_logger, ensure_log_dir
 
 # Global flags for stage management
@@ -57,7 +58,8 @@ def main() -> int:
     logger.info(f"Using System Jig ID: {jig_id}")
     
     # 3. Initialize DB Server
-    db_server = create_db_server(server_cfg, jig_id=jig_id)
+    # 결과 업로드 대기열은 스테이지 프로세스가 사용 (감독 프로세스는 설정 동기화만)
+    db_server = create_db_server(server_cfg, jig_id=jig_id, spool=False)
     if not db_server:
         logger.error("Failed to initialize DB Server")
         return 1
@@ -85,16 +87,37 @@ def main() -> int:
     )
     sync_thread.start()
 
-    # 5. Signal Handlers for Supervisor itself
+    # 5. Shared Bridge session: 스테이지 재시작/전환에도 MQTT 연결, 구독, 스틱 목록을 유지
+    bridge_server = None
+    if server_cfg.get("bridge_shared", True):
+        bridge = create_bridge_client(server_cfg)
+        try:
+            bridge.start()
+            bridge.start_stick_watcher()
+            bridge_server = BridgeServer(bridge, server_cfg.get("bridge_socket", DEFAULT_SOCKET_PATH))
+            bridge_server.start()
+            logger.info(f"Shared bridge session listening on {bridge_server.path}")
+        except Exception as e:
+            # 스테이지 프로세스가 각자 직접 연결
+            logger.warning(f"Shared bridge session unavailable: {e}")
+            bridge.stop()
+
+    def shutdown_bridge():
+        if bridge_server is not None:
+            bridge_server.close()
+            bridge_server.client.stop()
+
+    # 6. Signal Handlers for Supervisor itself
     def supervisor_signal_handler(signum, frame):
         logger.info(f"Supervisor received signal {signum}. Shutting down...")
         sync_thread.stop()
+        shutdown_bridge()
         sys.exit(0)
 
     signal.signal(signal.SIGINT, supervisor_signal_handler)
     signal.signal(signal.SIGTERM, supervisor_signal_handler)
 
-    # 6. Main Supervisor Loop
+    # 7. Main Supervisor Loop
     while True:
         # Load current stage from config
         try:
@@ -115,6 +138,8 @@ def main() -> int:
             env["PYTHONPATH"] = f"{os.getcwd()}:{env.get('PYTHONPATH', '')}"
             # Force lgpio factory to avoid /dev/mem access issues (no root required)
             env["GPIOZERO_PIN_FACTORY"] = "lgpio"
+            if bridge_server is not None:
+                env[SOCKET_ENV] = bridge_server.path
             
             process = subprocess.Popen(cmd, env=env)
         except Exception as e:
@@ -148,6 +173,7 @@ def main() -> int:
             logger.info("Supervisor interrupted. Shutting down child...")
             process.terminate()
             process.wait()
+            shutdown_bridge()
             raise
 
         exit_code = process.wait()
@@ -0,0 +1,79 @@
+import sys
+import os
+import json
+import time
+import random
+import argparse
+
+# 상위 디렉토리 임포트 허용
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import common.solar_bridge as sb
+from common.solar_bridge import SolarBridgeClient
+
+
+class FakeMsg:
+    __slots__ = ("topic", "payload")
+
+    def __init__(self, topic: str, payload: bytes):
+        self.topic = topic
+        self.payload = payload
+
+
+def build_traffic(n: int, devices: int) -> tuple[list[FakeMsg], list[str]]:
+    """공장 라인을 흉내낸 메시지 묶음: 대부분 비콘, 일부 Simple API 응답."""
+    ids = [f"{random.getrandbits(48):012X}" for _ in range(devices)]
+    msgs = []
+    for i in range(n):
+        dev = ids[i % devices]
+        if i % 10 == 0:
+            payload = {
+                "command": "REQ_GET_INFO",
+                "target_id": f"0x{dev[-8:]}",
+                "response": {"Protobuf": {"cmd": "RESP_GET_INFO", "resp_get_info": {"version": 0x11104203, "id_high": 0x1234, "uptime": i}}}
+            }
+            msgs.append(FakeMsg("solar/simple/rx", json.dumps(payload).encode()))
+        else:
+            payload = {"mlpe_packet": {"Protobuf": {"cmd": "BEACON_RAW_DATA", "beacon_raw_data": {
+                "raw_0": (random.randint(0, 4095) << 16) | random.randint(0, 4095),
+                "raw_1": (random.randint(0, 4095) << 16) | random.randint(0, 4095),
+                "uptime": i
+            }}}}
+            msgs.append(FakeMsg(f"solar/mlpe/{dev}/rx", json.dumps(payload).encode()))
+    return msgs, ids
+
+
+def run_case(name: str, msgs: list[FakeMsg], watch: list[str] | None, loads) -> None:
+    sb._json_loads = loads
+    client = SolarBridgeClient()
+    client.watch_devices(watch)
+    start = time.perf_counter()
+    for m in msgs:
+        client._on_message(None, None, m)
+    elapsed = time.perf_counter() - start
+    print(f"{name:<32} {len(msgs) / elapsed:>12,.0f} msg/s  (dropped before parse: {client.metrics.counters.get('dropped_unwatched', 0)})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SolarBridgeClient 수신 처리량 마이크로 벤치마크 (브로커 불필요)")
+    parser.add_argument("-n", "--messages", type=int, default=50000)
+    parser.add_argument("-d", "--devices", type=int, default=200)
+    opts = parser.parse_args()
+
+    msgs, ids = build_traffic(opts.messages, opts.devices)
+    print(f"--- SolarBridgeClient parser benchmark ({opts.messages} msgs, {opts.devices} devices) ---")
+
+    backends = [("json", json.loads)]
+    try:
+        import orjson
+        backends.append(("orjson", orjson.loads))
+    except ImportError:
+        print("(orjson not installed: skipping orjson cases)")
+
+    for backend, loads in backends:
+        run_case(f"{backend} / no filter", msgs, None, loads)
+        run_case(f"{backend} / watch 1 device", msgs, [ids[0]], loads)
+
+
+if __name__ == "__main__":
+    main()
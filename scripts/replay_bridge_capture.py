@@ -0,0 +1,88 @@
+import sys
+import os
+import json
+import time
+import argparse
+from collections import Counter, defaultdict
+
+# 상위 디렉토리 임포트 허용
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from common.mqtt_recorder import MqttReplayer, read_records, TX
+from common.solar_bridge import SolarBridgeClient
+
+
+def topic_class(topic: str) -> str:
+    parts = topic.split("/")
+    return f"solar/{parts[1]}/+/{parts[3]}" if len(parts) == 4 else topic
+
+
+def info(path: str):
+    """녹화 요약: 토픽별 메시지 수, 구간 길이, 명령별 TX→RX 지연(seq 기준)."""
+    counts: Counter = Counter()
+    sent: dict[int, tuple[str, float]] = {}
+    latencies: dict[str, list[float]] = defaultdict(list)
+    first = last = None
+
+    for rec in read_records(path):
+        first = rec.ts if first is None else first
+        last = rec.ts
+        counts[("TX " if rec.direction == TX else "RX ") + topic_class(rec.topic)] += 1
+        if rec.topic.startswith("solar/mlpe/"):
+            continue
+        try:
+            data = json.loads(rec.payload)
+        except ValueError:
+            continue
+        seq = data.get("seq", data.get("transaction_id"))
+        if seq is None:
+            continue
+        if rec.direction == TX:
+            sent[seq] = (data.get("command") or "COMPLEX", rec.ts)
+        elif seq in sent:
+            cmd, ts = sent.pop(seq)
+            latencies[cmd].append(rec.ts - ts)
+
+    if first is None:
+        print("(empty capture)")
+        return
+    print(f"--- {path}: {sum(counts.values())} messages over {last - first:.1f}s ---")
+    for name, n in counts.most_common():
+        print(f"{name:<32} {n:>8}")
+    print("\ncommand latency (TX -> RX, by seq)")
+    for cmd, vals in sorted(latencies.items()):
+        vals.sort()
+        p99 = vals[min(len(vals) - 1, int(len(vals) * 0.99))]
+        print(f"{cmd:<24} n={len(vals):<6} p50={vals[len(vals) // 2] * 1000:7.1f}ms  p99={p99 * 1000:7.1f}ms  max={vals[-1] * 1000:7.1f}ms")
+    if sent:
+        print(f"\nunanswered requests: {Counter(cmd for cmd, _ in sent.values())}")
+
+
+def replay(path: str, speed: float, watch: list[str] | None):
+    """녹화된 수신 메시지를 새 클라이언트의 파서에 다시 넣어 처리 시간을 측정합니다. (브로커 불필요)"""
+    client = SolarBridgeClient()
+    client.watch_devices(watch)
+    cpu_start = time.process_time()
+    stats = MqttReplayer(path, speed=speed).replay(client._on_message)
+    cpu = time.process_time() - cpu_start
+    rate = stats["messages"] / stats["elapsed"] if stats["elapsed"] > 0 else 0
+    print(f"replayed {stats['messages']} RX messages in {stats['elapsed']:.2f}s ({rate:,.0f} msg/s, cpu {cpu:.2f}s, max lag {stats['max_lag'] * 1000:.1f}ms)")
+    print(f"dropped before parse: {client.metrics.counters.get('dropped_unwatched', 0)}, memory: {client.memory_usage()}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Solar Bridge MQTT 녹화 파일 분석/재생")
+    parser.add_argument("mode", choices=["info", "replay"])
+    parser.add_argument("path")
+    parser.add_argument("--speed", type=float, default=0, help="replay: 재생 배속 (1=실시간, 0=최대 속도)")
+    parser.add_argument("--watch", nargs="*", default=None, help="replay: 비콘을 파싱할 장치 ID")
+    opts = parser.parse_args()
+
+    if opts.mode == "info":
+        info(opts.path)
+    else:
+        replay(opts.path, opts.speed, opts.watch)
+
+
+if __name__ == "__main__":
+    main()
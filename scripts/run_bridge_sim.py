@@ -0,0 +1,113 @@
+import sys
+import os
+import time
+import argparse
+import logging
+from concurrent.futures import wait
+
+# 상위 디렉토리 임포트 허용
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from common.bridge_simulator import BridgeSimulator, SimConfig, LoopbackTransport
+from common.solar_bridge import SolarBridgeClient
+
+
+def build_config(opts) -> SimConfig:
+    return SimConfig(
+        sticks=opts.sticks,
+        devices=opts.devices,
+        latency=opts.latency,
+        jitter=opts.jitter,
+        loss=opts.loss,
+        asp_interval=opts.asp_interval,
+        complex_api=opts.complex_api,
+        seed=opts.seed,
+    )
+
+
+def serve(opts):
+    """로컬 브로커에 붙어 Solar Bridge 대신 응답합니다. (Ctrl+C로 종료)"""
+    sim = BridgeSimulator(build_config(opts))
+    sim.attach_broker(opts.host, opts.port)
+    sim.start()
+    print(f"--- Bridge simulator on {opts.host}:{opts.port} ---")
+    print(f"Sticks: {[s['uid'] for s in sim.sticks]}")
+    print(f"Devices: {list(sim.devices)}")
+    try:
+        while True:
+            time.sleep(5)
+            print(f"requests={sim.requests} published={sim.published} dropped={sim.dropped}")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        sim.stop()
+
+
+def bench(opts):
+    """프로세스 내 시뮬레이터로 SolarBridgeClient의 명령 지연/처리량을 측정합니다."""
+    sim = BridgeSimulator(build_config(opts))
+    client = SolarBridgeClient(timeout=1.0, transport=LoopbackTransport(sim), adaptive_timeouts=opts.adaptive)
+    client.start()
+    try:
+        sticks = client.list_sticks()
+        uid = sticks[0]["uid"]
+        ids = list(sim.devices)
+        print(f"--- SolarBridgeClient vs simulator ({len(ids)} devices, latency {opts.latency * 1000:.0f}±{opts.jitter * 1000:.0f}ms, loss {opts.loss:.0%}) ---")
+
+        # 1) 순차 REQ_GET_INFO
+        start = time.perf_counter()
+        ok = sum(1 for i in range(opts.requests) if client.get_device_info(ids[i % len(ids)], uid))
+        elapsed = time.perf_counter() - start
+        print(f"{'sequential REQ_GET_INFO':<28} {opts.requests / elapsed:>8,.1f} req/s  ok {ok}/{opts.requests}")
+
+        # 2) 동시 REQ_GET_INFO (submit_command로 한 번에 전송)
+        start = time.perf_counter()
+        reqs = [client.submit_command(uid, ids[i % len(ids)], "REQ_GET_INFO", {}) for i in range(opts.requests)]
+        done, _ = wait([fut for _, fut in reqs], timeout=5.0)
+        for key, _ in reqs:
+            client._discard_pending(key)
+        elapsed = time.perf_counter() - start
+        ok = sum(1 for f in done if f.exception() is None)
+        print(f"{'concurrent REQ_GET_INFO':<28} {opts.requests / elapsed:>8,.1f} req/s  ok {ok}/{opts.requests}")
+
+        # 3) 이웃 탐색 + ADC 수집
+        client.clear_neighbors(uid)
+        time.sleep(opts.asp_interval / 1000.0 * 2)
+        start = time.perf_counter()
+        neighbors = client.get_neighbors(uid)
+        samples = client.collect_adc(ids[0], uid, max_samples=10, duration=5.0)
+        print(f"{'neighbors + 10 ADC samples':<28} {time.perf_counter() - start:>8.3f} s      neighbors {len(neighbors)}")
+
+        print(f"RTT: {client.latency.snapshot().get('REQ_GET_INFO')}")
+        print(f"simulator: requests={sim.requests} published={sim.published} dropped={sim.dropped}")
+    finally:
+        client.stop()
+        sim.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Solar Bridge 시뮬레이터 (브로커 모드 / 프로세스 내 벤치마크)")
+    parser.add_argument("mode", choices=["serve", "bench"])
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=1883)
+    parser.add_argument("--sticks", type=int, default=1)
+    parser.add_argument("-d", "--devices", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.02, help="응답 지연 (초)")
+    parser.add_argument("--jitter", type=float, default=0.01, help="지연 편차 (±초)")
+    parser.add_argument("--loss", type=float, default=0.0, help="손실 확률 (0~1)")
+    parser.add_argument("--asp-interval", type=int, default=200, help="비콘 주기 (ms)")
+    parser.add_argument("--complex-api", action="store_true", help="Complex API 트랜잭션 지원")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("-n", "--requests", type=int, default=200, help="bench: 명령 수")
+    parser.add_argument("--adaptive", action="store_true", help="bench: 적응형 타임아웃 사용")
+    opts = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s [%(levelname)s] %(message)s')
+    if opts.mode == "serve":
+        serve(opts)
+    else:
+        bench(opts)
+
+
+if __name__ == "__main__":
+    main()
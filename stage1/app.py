@@ -11,7 +11,8 @@ from common.logging_utils import build_logger, ensure_log_dir, log_event
 from stage1.io_thread import IOThread
 from stage1.self_test import run_self_test
 from stage1 import globals as g
-from common.solar_bridge import SolarBridgeClient
+from common.bridge_service import connect_bridge
+from common.mqtt_recorder import session_path
 
 
 @dataclass(frozen=True)
@@ -115,11 +116,26 @@ def run_stage1(cfg: Stage1Config) -> int:
     # 2) db 서버 초기화
     from common.db_server import create_db_server
     db_server = create_db_server(cfg.server_config, jig_id=cfg.jig_id)
-
-    bridge_host = cfg.server_config.get("bridge_host", "localhost")
-    bridge_port = cfg.server_config.get("bridge_port", 1883)
-    g.bridge = SolarBridgeClient(host=bridge_host, port=bridge_port, timeout=3.0)
-    g.bridge.start()
+    fw_watcher = None
+    if db_server:
+        # 펌웨어 캐시: TTL 이내에는 DUT마다 서버를 조회하지 않음
+        from common.firmware_cache import FirmwareCache, FirmwareWatcher
+        g.firmware_cache = FirmwareCache(db_server, root="./firmware/cache",
+                                         ttl=float(cfg.server_config.get("firmware_cache_ttl", 300)), logger=logger)
+        # 새 펌웨어 릴리스를 백그라운드에서 미리 받아 둠 (시퀀스 중에는 서버 조회 없음)
+        fw_watcher = FirmwareWatcher(g.firmware_cache, cfg.vendor, cfg.product,
+                                     interval=float(cfg.server_config.get("firmware_watch_interval", 60)), logger=logger)
+        fw_watcher.start()
+
+    # 감독 프로세스의 공유 Bridge 세션(SOLAR_BRIDGE_SOCKET)이 있으면 사용, 없으면 직접 연결
+    g.bridge = connect_bridge(cfg.server_config, logger=logger)
+    if cfg.server_config.get("bridge_record"):
+        # 현장 타이밍 재현용 MQTT 세션 녹화 (scripts/replay_bridge_capture.py로 분석/재생)
+        g.bridge.record_to(str(session_path(log_dir)))
+    # 비콘은 ADC 수집 중인 장치만 파싱 (그 외 장치의 비콘은 파싱 전에 폐기)
+    g.bridge.watch_devices([])
+    # 스틱 목록은 백그라운드에서 갱신 (단계 코드는 캐시를 사용)
+    g.bridge.start_stick_watcher()
     
     # ADC 공식 데이터 로드
     try:
@@ -279,6 +295,8 @@ def run_stage1(cfg: Stage1Config) -> int:
 
             from stage1.steps import run_stage_test
 
+            # 사이클별 Bridge 성능 카운터 초기화
+            g.bridge.reset_stats()
             # 1단계 양산 시퀀스 실행
             results = run_stage_test(
                 logger=logger,
@@ -290,6 +308,14 @@ def run_stage1(cfg: Stage1Config) -> int:
                 adc_config=adc_config
             )
 
+            # 시퀀스 종료: 대상 장치/스틱 토픽 구독 해제 (공유 Bridge 연결이 끊겨도 결과는 아래에서 전송)
+            try:
+                g.bridge.release_device()
+                results.bridge_stats = g.bridge.bridge_stats()
+                log_event(logger, event="bridge.stats", stage="stage1", data=results.bridge_stats)
+            except (ConnectionError, TimeoutError) as e:
+                log_event(logger, event="bridge.release_fail", level=logging.WARNING, stage="stage1", data={"error": str(e)})
+
             # 서버 로그 전송 (성공/실패 상관없이 시퀀스 종료 시 한 번만)
             if db_server:
                 db_server.push_log(results.to_dict(), logger=logger)
@@ -309,5 +335,9 @@ def run_stage1(cfg: Stage1Config) -> int:
         io.stop()
         if g.bridge:
             g.bridge.stop()
+        if fw_watcher:
+            fw_watcher.stop()
+        if db_server:
+            db_server.close()
 
     return 0
@@ -1,7 +1,9 @@
 from typing import Optional
 from stage1.types import Mlpe
 from common.solar_bridge import SolarBridgeClient
+from common.firmware_cache import FirmwareCache
 
 # Global State
 target_device = Mlpe()
 bridge: Optional[SolarBridgeClient] = None
+firmware_cache: Optional[FirmwareCache] = None
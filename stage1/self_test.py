@@ -82,7 +82,7 @@ class StickChecker(TestCase):
         if not g.bridge:
             return {"code": E_STICK_NOT_FOUND.code, "log": "Solar Bridge client not initialized"}
         try:
-            sticks = g.bridge.list_sticks(logger=args.get("logger"))
+            sticks = g.bridge.get_sticks(logger=args.get("logger"))
             if sticks:
                 version = sticks[0].get("version", "unknown")
                 return {"code": 0, "log": f"Stick is connected. Version : {version}"}
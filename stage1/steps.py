@@ -10,6 +10,8 @@ from typing import Any
 from common.test_base import TestCase
 from stage1.types import AggregatedResult, TestDetail
 from common.logging_utils import log_event
+from common.beacon_boost import BeaconBoost
+from common.firmware_cache import FirmwareCache, write_if_changed
 from stage1.nrf52_ficr import NRF52FICR
 from stage1 import globals as g
 from common.error_codes import (
@@ -23,6 +25,9 @@ from common.error_codes import (
     E_MESH_CONFIG_FAIL
 )
 
+# ADC 수집 목표 샘플 수 (이 개수에 도달하면 duration 전에 종료)
+ADC_SAMPLE_TARGET = 10
+
 
 class VoltageChecker(TestCase):
     def run(self, args: dict[str, Any]) -> dict[str, Any]:
@@ -104,29 +109,37 @@ class FirmwareDownloader(TestCase):
         product = args["product"]
         fw_dir = "./firmware"
         if not os.path.exists(fw_dir): os.makedirs(fw_dir)
+        # 캐시가 유효하면 서버 조회/다운로드 없이 바로 사용 (app에서 생성, 없으면 여기서 생성)
+        if g.firmware_cache is None:
+            g.firmware_cache = FirmwareCache(db_server, root=os.path.join(fw_dir, "cache"), logger=args.get("logger"))
+        cache = g.firmware_cache
+
+        # 부트로더/애플리케이션을 같은 시점의 조합으로 가져옴 (FirmwareWatcher 교체 중에도 섞이지 않음)
+        images = cache.get_many(vendor, product, ("bootloader", "application"))
 
         # Bootloader
-        res_boot = db_server.download_firmware(vendor, product, fw_type="bootloader")
-        if not res_boot:
+        boot_fw = images["bootloader"]
+        if not boot_fw:
             return {"code": E_FIRMWARE_DOWNLOAD_FAIL.code, "log": f"Failed to download bootloader for {vendor}/{product}"}
-        boot_bin, boot_ver = res_boot
+        boot_ver = boot_fw.version
         boot_path = os.path.join(fw_dir, f"bootloader_{boot_ver}.bin")
         
         # Application
-        res_app = db_server.download_firmware(vendor, product, fw_type="application")
-        if not res_app:
+        app_fw = images["application"]
+        if not app_fw:
             return {"code": E_FIRMWARE_DOWNLOAD_FAIL.code, "log": f"Failed to download application for {vendor}/{product}"}
-        app_bin, app_ver = res_app
+        app_ver = app_fw.version
         app_path = os.path.join(fw_dir, f"{vendor}_{product}_application_{app_ver}.bin")
 
         try:
-            with open(boot_path, "wb") as f: f.write(boot_bin)
-            with open(app_path, "wb") as f: f.write(app_bin)
+            # 같은 내용이면 파일을 다시 쓰지 않음
+            write_if_changed(boot_path, boot_fw.data)
+            write_if_changed(app_path, app_fw.data)
             args["boot_path"] = boot_path
             args["app_path"] = app_path
             log_msg = f"Downloaded Bootloader({boot_ver}) and App({app_ver})"
-            boot_info = {"name": "bootloader", "version": boot_ver}
-            app_info = {"name": "application", "version": app_ver}
+            boot_info = {"name": "bootloader", "version": boot_ver, "sha256": boot_fw.sha256}
+            app_info = {"name": "application", "version": app_ver, "sha256": app_fw.sha256}
             return {
                 "code": 0, 
                 "log": log_msg, 
@@ -214,25 +227,25 @@ class CommTester(TestCase):
             return {"code": E_DEVICE_COMMUNICATION_FAIL.code, "log": "Solar Bridge client not initialized."}
 
         for attempt in range(3):
-            sticks = g.bridge.list_sticks()
-            for s in sticks:
-                uid = s.get("uid")
-                if not uid: continue
-                info = g.bridge.get_device_info(device_id_hex, uid)
-                if info:
-                    # 전역 MLPE 상태 업데이트
-                    g.target_device.info = info
-                    args["stick_uid"] = uid # ADC Tester에서 필요할 수 있지만 일단 globals에 넣을까 고민 중
-                    log_msg = f"Comm verified via {uid} (ID: {device_id_hex})"
-                    return {
-                        "code": 0, 
+            # 모든 스틱으로 동시에 요청하고 먼저 응답한 스틱을 사용
+            sticks = g.bridge.get_sticks()
+            uid, info = g.bridge.get_device_info_any(device_id_hex, [s.get("uid") for s in sticks])
+            if info:
+                # 전역 MLPE 상태 업데이트
+                g.target_device.info = info
+                args["stick_uid"] = uid # 이후 단계(RSD/ADC)는 응답한 스틱을 사용
+                # 이후 단계는 이 장치/스틱의 토픽만 구독
+                g.bridge.focus_device(device_id_hex, uid)
+                log_msg = f"Comm verified via {uid} (ID: {device_id_hex})"
+                return {
+                    "code": 0, 
+                    "log": log_msg,
+                    "parameter": {
                         "log": log_msg,
-                        "parameter": {
-                            "log": log_msg,
-                            "version": info.get("version_unpacked", "Unknown"),
-                            "uptime": info.get("uptime", 0)
-                        }
+                        "version": info.get("version_unpacked", "Unknown"),
+                        "uptime": info.get("uptime", 0)
                     }
+                }
             time.sleep(0.7)
             
         return {"code": E_DEVICE_COMMUNICATION_FAIL.code, "log": f"Device {device_id_hex} did not respond to REQ_GET_INFO"}
@@ -291,7 +304,7 @@ class ADCResultChecker(TestCase):
             return {"code": E_ADC_VERIFICATION_FAIL.code, "log": f"ADC ranges not found for {stage}/{board_type}/{check_type}"}
 
         # Collect samples
-        samples = g.bridge.dump_adc(target_id, stick_uid, duration=1.0, logger=args["logger"])
+        samples = g.bridge.collect_adc(target_id, stick_uid, max_samples=ADC_SAMPLE_TARGET, duration=1.0, logger=args["logger"])
         if not samples:
             return {"code": E_ADC_VERIFICATION_FAIL.code, "log": "Failed to collect ADC samples"}
 
@@ -476,11 +489,18 @@ def run_stage_test(
     
     try:
         board_module = importlib.import_module(f"stage1.boards.{board_type}")
-        board_results = board_module.run_stage_test(context)
+        # 보드 시퀀스(ADC 수집 위주) 동안 비콘 주기를 줄이고, 끝나면(실패 포함) 원래 주기로 복원
+        with BeaconBoost(g.bridge, g.target_device.device_id, context.get("stick_uid"), logger=logger) as boost:
+            board_results = board_module.run_stage_test(context)
+            boost.settle(board_results, restored_by="Mesh Configurator")
         
         # Merge board results into main results
         results.details.extend(board_results.details)
         results.code = board_results.code
+        if not boost.restored:
+            results.details.append(TestDetail(case="Beacon Rate Restore", parameter=boost.to_parameter(), code=E_MESH_CONFIG_FAIL.code))
+            if results.code == 0:
+                results.code = E_MESH_CONFIG_FAIL.code
         
     except ImportError:
         logger.error(f"Test implementation for board '{board_type}' not found.")
@@ -10,6 +10,9 @@ from typing import Any
 from common.test_base import TestCase
 from .types import AggregatedResult, TestDetail
 from common.logging_utils import log_event
+from common.solar_bridge import ComplexScript
+from common.beacon_boost import BeaconBoost
+from common.neighbor_discovery import discover_target
 from .nrf52_ficr import NRF52FICR
 from . import globals as g
 from common.label_utils import LabelGenerator, load_label_profiles, generate_zpl_from_png, send_zpl_to_printer
@@ -44,15 +47,18 @@ PRODUCT_MAP = {
     "booster_2_1": 4,
 }
 
+# ADC 수집 목표 샘플 수 (이 개수에 도달하면 duration 전에 종료)
+ADC_SAMPLE_TARGET = 10
+
 
 
 
 class NeighborScanner(TestCase):
     """
     Stage 2 Device Recognition:
-    1. Initialize Neighbors List (Placeholder)
-    2. Wait for a few seconds
-    3. Get Neighbors and select the one with the lowest RSSI
+    1. Initialize Neighbors List
+    2. Poll neighbors until a vendor/product match keeps a stable RSSI lead (or scan timeout)
+    3. Select the matching device with the strongest RSSI
     """
     def run(self, args: dict[str, Any]) -> dict[str, Any]:
         if not g.bridge:
@@ -60,24 +66,40 @@ class NeighborScanner(TestCase):
         
         try:
             # 1. Discover Stick
-            sticks = g.bridge.list_sticks()
+            sticks = g.bridge.get_sticks()
             if not sticks:
                 return {"code": E_NEIGHBOR_NOT_FOUND.code, "log": "No active sticks found for scanning"}
             
             stick_uid = sticks[0]["uid"]
 
-            # 2. Initialize Neighbors List (Timing Point 1)
-            if g.bridge.clear_neighbors(stick_uid, logger=args.get("logger")):
-                args["logger"].info(f"  --> [OK] Neighbors list cleared on {stick_uid}")
-            else:
-                args["logger"].warning(f"  --> [FAIL] Failed to clear neighbors on {stick_uid}")
+            # 2. Filter by Vendor and Product ID from Config
+            expected_vendor = args.get("vendor", "conalog").lower()
+            expected_product = args.get("product", "unknown").lower()
             
-            # 3. Wait for discovery
-            scan_duration = 1.0
-            time.sleep(scan_duration)
-
-            # 4. Get Neighbors (Timing Point 2)
-            neighbors = g.bridge.get_neighbors(stick_uid, logger=args.get("logger"))
+            # Map names to IDs
+            target_vid = VENDOR_MAP.get(expected_vendor)
+            target_pid = PRODUCT_MAP.get(expected_product)
+            
+            if target_vid is None or target_pid is None:
+                args["logger"].warning(f"Unknown vendor/product in config: {expected_vendor}/{expected_product}. ID filtering bypassed.")
+                is_candidate = lambda n: True
+            else:
+                # Filter by string match (case-insensitive)
+                # Bridge returns "Conalog", "Guard_2_1" etc via models.GetSolarVendorName
+                is_candidate = lambda n: (n.get("vid", "unknown").lower() == expected_vendor
+                                          and n.get("pid", "unknown").lower() == expected_product)
+
+            # 3. Clear neighbors and poll until a matching device keeps a stable RSSI lead
+            #    (timeout 시 마지막 목록에서 RSSI가 가장 강한 장치 선택)
+            found = discover_target(
+                g.bridge, stick_uid, is_candidate,
+                timeout=args.get("scan_timeout", 1.0),
+                margin=args.get("rssi_margin", 6),
+                required=args.get("rssi_stable_count", 3),
+                logger=args.get("logger"),
+            )
+            neighbors = found.neighbors
+            matching_neighbors = found.matches
             
             if not neighbors:
                 return {"code": E_NEIGHBOR_NOT_FOUND.code, "log": "No neighbors found"}
@@ -88,37 +110,14 @@ class NeighborScanner(TestCase):
                 return v
 
             neighbor_list_str = ", ".join([f"{n['id']}({n['rssi']}, v:{get_ver(n)})" for n in neighbors])
-            args["logger"].debug(f"Found {len(neighbors)} neighbors: [{neighbor_list_str}]")
+            args["logger"].debug(f"Found {len(neighbors)} neighbors in {found.elapsed:.2f}s ({found.polls} polls): [{neighbor_list_str}]")
 
-            # 5. Filter by Vendor and Product ID from Config
-            expected_vendor = args.get("vendor", "conalog").lower()
-            expected_product = args.get("product", "unknown").lower()
-            
-            # Map names to IDs
-            target_vid = VENDOR_MAP.get(expected_vendor)
-            target_pid = PRODUCT_MAP.get(expected_product)
-            
-            if target_vid is None or target_pid is None:
-                args["logger"].warning(f"Unknown vendor/product in config: {expected_vendor}/{expected_product}. ID filtering bypassed.")
-                matching_neighbors = neighbors
-            else:
-                matching_neighbors = []
-                for n in neighbors:
-                    # Filter by string match (case-insensitive)
-                    # Bridge returns "Conalog", "Guard_2_1" etc via models.GetSolarVendorName
-                    vid_name = n.get("vid", "unknown").lower()
-                    pid_name = n.get("pid", "unknown").lower()
-                    
-                    if vid_name == expected_vendor and pid_name == expected_product:
-                        matching_neighbors.append(n)
-                
-                if not matching_neighbors:
-                    log_err = f"No devices found matching {expected_vendor}/{expected_product}. Found: {neighbor_list_str}"
-                    return {"code": E_NEIGHBOR_NOT_FOUND.code, "log": log_err}
+            if not matching_neighbors:
+                log_err = f"No devices found matching {expected_vendor}/{expected_product}. Found: {neighbor_list_str}"
+                return {"code": E_NEIGHBOR_NOT_FOUND.code, "log": log_err}
 
-            # 6. Choose device with the STRONGEST RSSI from matches
-            sorted_matches = sorted(matching_neighbors, key=lambda x: x.get("rssi", -100), reverse=True)
-            target = sorted_matches[0]
+            # 4. Choose device with the STRONGEST RSSI from matches
+            target = found.target
             
             g.target_device.device_id = target["id"]
             args["stick_uid"] = stick_uid
@@ -127,6 +126,7 @@ class NeighborScanner(TestCase):
                 f"Found {len(neighbors)} neighbors total.",
                 f"Filtered {len(matching_neighbors)} matches for {expected_vendor}/{expected_product}.",
                 f"Target selected via RSSI({target['rssi']}): {target['id']}"
+                + (f" (stable lead after {found.elapsed:.2f}s)" if found.stable else f" (no stable lead within {found.elapsed:.2f}s)")
             ]
             log_summary = "\n".join(final_log)
             return {
@@ -162,6 +162,8 @@ class CommTester(TestCase):
             g.target_device.info = info
             upper_id = info.get("upper_id")
             g.target_device.upper_id = upper_id
+            # 이후 단계는 이 장치/스틱의 토픽만 구독 (upper_id는 위 응답으로 이미 확보됨)
+            g.bridge.focus_device(target_id, stick_uid)
             
             log_msg = f"Communication OK. Version: {info.get('version_unpacked', 'Unknown')}"
             if upper_id is not None:
@@ -223,7 +225,7 @@ class ADCResultChecker(TestCase):
         
         if not stick_uid:
             # Step context에서 stick_uid가 없는 경우 NeighborScanner가 남긴 args에서 찾아보거나 bridge에서 다시 조회
-            sticks = g.bridge.list_sticks()
+            sticks = g.bridge.get_sticks()
             if not sticks:
                  return {"code": E_DEVICE_RECOGNITION_FAIL.code, "log": "No active sticks found for ADC dump"}
             stick_uid = sticks[0]["uid"]
@@ -234,7 +236,7 @@ class ADCResultChecker(TestCase):
             return {"code": E_ADC_VERIFICATION_FAIL.code, "log": f"ADC ranges not found for {stage}/{board_type}/{check_type}"}
 
         # Collect samples
-        samples = g.bridge.dump_adc(target_id, stick_uid, duration=1.0, logger=args["logger"])
+        samples = g.bridge.collect_adc(target_id, stick_uid, max_samples=ADC_SAMPLE_TARGET, duration=1.0, logger=args["logger"])
         if not samples:
             return {"code": E_ADC_VERIFICATION_FAIL.code, "log": "Failed to collect ADC samples via MQTT DUMP_RAW_ADC"}
 
@@ -368,21 +370,18 @@ class DutyRatioTester(TestCase):
                 target_duty = int(max_pwm * ratio)
                 logger.info(f"  --> Setting Duty to {ratio*100:.0f}% ({target_duty})...")
                 
-                # Set fixed duty by setting min=max=target_duty
-                res_set = g.bridge.set_mppt_config(
-                    target_id, stick_uid, 
-                    min_limit=target_duty, 
-                    max_limit=target_duty, 
-                    bypass_condition=True,
-                    logger=logger
-                )
-                if not res_set:
-                    return {"code": E_DEVICE_COMMUNICATION_FAIL.code, "log": f"Failed to set duty to {ratio*100:.0f}%"}
-                
-                time.sleep(1.5) # Wait for stability
-                
+                # Set fixed duty (min=max=target_duty) -> wait for stability -> ADC capture
+                # 하나의 Complex API 트랜잭션으로 실행 (미지원 Bridge는 로컬 순차 실행)
+                script = (ComplexScript()
+                          .set_mppt_config(min_limit=target_duty, max_limit=target_duty, bypass_condition=True)
+                          .wait(1500)
+                          .capture_adc(1000, max_samples=ADC_SAMPLE_TARGET))
+                res_script = g.bridge.run_script(target_id, stick_uid, script, logger=logger)
+                if res_script["status"] != "COMPLETED":
+                    return {"code": E_DEVICE_COMMUNICATION_FAIL.code, "log": f"Failed to set duty to {ratio*100:.0f}%: {res_script['message']}"}
+
                 # ADC Check
-                samples = g.bridge.dump_adc(target_id, stick_uid, duration=1.0, logger=logger)
+                samples = res_script["samples"]
                 if not samples:
                     return {"code": E_ADC_VERIFICATION_FAIL.code, "log": f"Failed to collect ADC samples for {ratio*100:.0f}% duty"}
                 
@@ -735,10 +734,17 @@ def run_stage_test(
     
     try:
         board_module = importlib.import_module(f"stage3.boards.{board_type}")
-        board_results = board_module.run_stage_test(context)
+        # 보드 시퀀스(ADC 수집 위주) 동안 비콘 주기를 줄이고, 끝나면(실패 포함) 원래 주기로 복원
+        with BeaconBoost(g.bridge, g.target_device.device_id, context.get("stick_uid"), logger=logger) as boost:
+            board_results = board_module.run_stage_test(context)
+            boost.settle(board_results)
         
         results.details.extend(board_results.details)
         results.code = board_results.code
+        if not boost.restored:
+            results.details.append(TestDetail(case="Beacon Rate Restore", parameter=boost.to_parameter(), code=E_MESH_CONFIG_FAIL.code))
+            if results.code == 0:
+                results.code = E_MESH_CONFIG_FAIL.code
         
         if results.code == 0:
             logger.info(">>> Running Final Steps (Mesh Config & Label Printer)...")
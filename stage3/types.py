@@ -33,6 +33,7 @@ class AggregatedResult:
     upper_id: Optional[int] = None       # Upper 2-byte ID (integer)
     details: list[TestDetail] = field(default_factory=list)
     boot_data: Optional[dict[str, Any]] = None  # Additional context (e.g., boot info)
+    bridge_stats: Optional[dict[str, Any]] = None  # SolarBridgeClient.bridge_stats() snapshot for this cycle
 
     def to_dict(self) -> dict[str, Any]:
         # Generate message: "Success" or "Failed(first_failed_test_name)"
@@ -71,6 +72,8 @@ class AggregatedResult:
         }
         if self.boot_data:
             d["boot_data"] = self.boot_data
+        if self.bridge_stats:
+            d["bridge_stats"] = self.bridge_stats
         return d
 
 
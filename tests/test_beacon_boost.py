@@ -0,0 +1,55 @@
+"""BeaconBoost: 복원은 한 번만 보내고, 통신 실패/이미 적용된 경우에는 보내지 않는지 확인합니다."""
+
+from common.beacon_boost import BeaconBoost
+from common.error_codes import E_ADC_VERIFICATION_FAIL, E_DEVICE_COMMUNICATION_FAIL
+from stage1 import types as stage_types
+from stage1.types import AggregatedResult
+
+
+class FakeBridge:
+    def __init__(self, respond=True):
+        self.respond = respond
+        self.calls = []
+
+    def set_mesh_config(self, target_id, stick_uid, asp_interval=200, tx_pwr=-20, logger=None):
+        self.calls.append(asp_interval)
+        return {"l2": {"asp_interval": asp_interval}} if self.respond else None
+
+
+def run(bridge, results, restored_by=None):
+    with BeaconBoost(bridge, "0x00000001", "stick-1") as boost:
+        boost.settle(results, restored_by=restored_by)
+    return boost
+
+
+def test_single_restore_attempt_when_unacknowledged():
+    bridge = FakeBridge()
+    results = AggregatedResult(test="t", code=E_ADC_VERIFICATION_FAIL.code)
+    with BeaconBoost(bridge, "0x00000001", "stick-1") as boost:
+        bridge.respond = False
+        boost.settle(results)
+    assert bridge.calls == [50, 200]
+    assert not boost.restored
+
+
+def test_skip_restore_after_communication_failure():
+    bridge = FakeBridge()
+    boost = run(bridge, AggregatedResult(test="t", code=E_DEVICE_COMMUNICATION_FAIL.code))
+    assert bridge.calls == [50]
+    assert not boost.restored
+    assert "skipped" in boost.to_parameter()["log"]
+
+
+def test_skip_restore_when_mesh_configurator_applied_it():
+    bridge = FakeBridge()
+    results = AggregatedResult(test="t", code=0, details=[stage_types.TestDetail(case="Mesh Configurator", parameter={}, code=0)])
+    boost = run(bridge, results, restored_by="Mesh Configurator")
+    assert bridge.calls == [50]
+    assert boost.restored
+
+
+def test_restore_on_success_without_configurator():
+    bridge = FakeBridge()
+    boost = run(bridge, AggregatedResult(test="t", code=0))
+    assert bridge.calls == [50, 200]
+    assert boost.restored
@@ -0,0 +1,46 @@
+"""공유 Bridge 소켓: 실행 사용자만 접속할 수 있고, record_to는 logs/ 아래 .sbrec 파일만 허용합니다."""
+
+import os
+import stat
+
+import pytest
+
+from common.bridge_service import BridgeServer, RemoteSolarBridgeClient
+from common.bridge_simulator import BridgeSimulator, LoopbackTransport, SimConfig
+from common.solar_bridge import SolarBridgeClient
+
+
+@pytest.fixture
+def served(tmp_path):
+    sim = BridgeSimulator(SimConfig(devices=1, asp_interval=1000, latency=0.005, jitter=0.0, seed=1))
+    client = SolarBridgeClient(timeout=1.0, transport=LoopbackTransport(sim))
+    client.start()
+    server = BridgeServer(client, str(tmp_path / "run" / "bridge.sock"), record_root=tmp_path / "logs")
+    server.start()
+    remote = RemoteSolarBridgeClient(server.path, timeout=5.0)
+    remote.start()
+    yield tmp_path, server, remote
+    remote.stop()
+    server.close()
+    client.stop()
+    sim.stop()
+
+
+def test_socket_is_private(served):
+    _, server, _ = served
+    assert stat.S_IMODE(os.stat(server.path).st_mode) == 0o600
+    assert stat.S_IMODE(os.stat(os.path.dirname(server.path)).st_mode) == 0o700
+
+
+def test_record_to_is_confined_to_record_root(served):
+    tmp_path, _, remote = served
+    outside = tmp_path / "victim.txt"
+    for path in (str(outside), str(tmp_path / "logs" / ".." / "victim.sbrec"), str(tmp_path / "logs" / "notes.txt")):
+        with pytest.raises(ValueError):
+            remote.record_to(path)
+    assert not outside.exists()
+
+    capture = tmp_path / "logs" / "stage1" / "bridge_000000_1.sbrec"
+    remote.record_to(str(capture))
+    remote.stop_recording()
+    assert capture.exists()
@@ -0,0 +1,88 @@
+"""FirmwareCache: get()/prefetch()는 잠금 밖에서 다운로드하고 같은 빌드를 두 번 받지 않습니다."""
+
+import threading
+import time
+
+from common.firmware_cache import FirmwareCache, FirmwareWatcher
+
+
+class FakeDB:
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.fetches = 0
+        self.updated = "t1"
+        self.online = True
+        self.queries = 0
+
+    def get_firmware_record(self, vendor, product, fw_type, logger=None):
+        self.queries += 1
+        if not self.online:
+            return None
+        return {"id": f"rec-{fw_type}", "version": "1.0.0", "updated": self.updated}
+
+    def fetch_firmware(self, record, logger=None):
+        self.fetches += 1
+        time.sleep(self.delay)
+        return f"{record['id']}:{record['updated']}".encode() * 64
+
+
+def test_prefetch_and_get_share_one_download(tmp_path):
+    db = FakeDB(delay=0.2)
+    cache = FirmwareCache(db, root=tmp_path, ttl=300)
+    t = threading.Thread(target=cache.prefetch, args=("conalog", "guard", ("application",)))
+    t.start()
+    time.sleep(0.05)  # watcher가 다운로드 중
+    fw = cache.get("conalog", "guard", "application")
+    t.join()
+    assert fw is not None and fw.data.startswith(b"rec-application:t1")
+    assert db.fetches == 1
+
+
+def test_prefetch_saves_index_only_when_switched(tmp_path, monkeypatch):
+    db = FakeDB()
+    cache = FirmwareCache(db, root=tmp_path, ttl=300)
+    assert len(cache.prefetch("conalog", "guard")) == 2
+
+    saves = []
+    monkeypatch.setattr("common.firmware_cache.atomic_save_json", lambda path, data: saves.append(path))
+    assert cache.prefetch("conalog", "guard") == []
+    assert saves == [] and db.fetches == 2
+
+    db.updated = "t2"
+    assert len(cache.prefetch("conalog", "guard")) == 2
+    assert len(saves) == 1 and db.fetches == 4
+
+
+def test_get_download_is_shared_with_prefetch(tmp_path):
+    db = FakeDB(delay=0.3)
+    cache = FirmwareCache(db, root=tmp_path, ttl=300)
+    t = threading.Thread(target=cache.get, args=("conalog", "guard", "application"))
+    t.start()
+    time.sleep(0.05)  # get()이 다운로드 중
+    started = time.monotonic()
+    assert cache.peek("conalog", "guard", "application") is None  # 다운로드 중에도 잠금을 잡고 있지 않음
+    assert time.monotonic() - started < 0.1
+    assert cache.prefetch("conalog", "guard", ("application",)) is not None
+    t.join()
+    assert db.fetches == 1
+
+
+def test_failing_watcher_falls_back_to_ttl(tmp_path):
+    db = FakeDB()
+    cache = FirmwareCache(db, root=tmp_path, ttl=0.0)
+    assert cache.get("conalog", "guard", "application") is not None
+
+    db.online = False
+    watcher = FirmwareWatcher(cache, "conalog", "guard", fw_types=("application",), interval=60)
+    watcher.start()
+    try:
+        while db.queries < 2:
+            time.sleep(0.01)
+        assert not cache.watching  # 마지막 prefetch가 실패했으므로 신뢰하지 않음
+
+        db.online = True
+        db.updated = "t2"
+        fw = cache.get("conalog", "guard", "application")
+        assert fw.data.startswith(b"rec-application:t2")
+    finally:
+        watcher.stop()
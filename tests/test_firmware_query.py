@@ -0,0 +1,59 @@
+"""최신 펌웨어 조회: 정렬/필드 지정 조회가 실패하면 전체 목록 + semver 방식으로 대체합니다."""
+
+from types import SimpleNamespace
+
+import pytest
+from pocketbase.utils import ClientResponseError
+
+from common import db_server
+
+
+class FakeCollection:
+    def __init__(self, records, reject_list=False):
+        self.records = records
+        self.reject_list = reject_list
+        self.full_queries = []
+
+    def get_list(self, page, per_page, query_params=None):
+        if self.reject_list:
+            raise ClientResponseError("Something went wrong while processing your request.", status=400)
+        items = sorted(self.records, key=lambda r: r.created, reverse=True)[:per_page]
+        return SimpleNamespace(items=items, total_items=len(self.records))
+
+    def get_full_list(self, query_params=None):
+        self.full_queries.append(query_params)
+        return list(self.records)
+
+
+def _record(version, created):
+    return SimpleNamespace(id=f"r{version}", version=version, created=created, updated=created, firmware="fw.bin")
+
+
+@pytest.fixture
+def server():
+    srv = db_server.TestDBServer("http://pb.invalid", "results", "jig1")
+    yield srv
+    srv.close()
+
+
+def test_rejected_projection_falls_back_to_full_list(server, monkeypatch):
+    coll = FakeCollection([_record("1.2.0", "2026-01-02"), _record("1.10.0", "2026-01-01")], reject_list=True)
+    monkeypatch.setattr(server.pb, "collection", lambda name: coll)
+    assert server._latest_firmware_record('type = "application"').version == "1.10.0"
+    assert coll.full_queries == [{"filter": 'type = "application"'}]  # fields 없이 기존 쿼리
+
+
+def test_ordered_window_skips_full_list(server, monkeypatch):
+    coll = FakeCollection([_record("1.2.0", "2026-01-02"), _record("1.1.0", "2026-01-01")])
+    monkeypatch.setattr(server.pb, "collection", lambda name: coll)
+    assert server._latest_firmware_record('type = "application"').version == "1.2.0"
+    assert coll.full_queries == []
+
+
+def test_partial_window_uses_full_list(server, monkeypatch):
+    # 2.0.0 이후 예전 라인 핫픽스가 창 크기 이상 올라오면 2.0.0은 창 밖으로 밀려남
+    hotfixes = [_record(f"1.9.{i}", f"2026-02-0{i}") for i in range(1, server.FIRMWARE_LATEST_WINDOW + 1)]
+    coll = FakeCollection([_record("2.0.0", "2026-01-01")] + hotfixes)
+    monkeypatch.setattr(server.pb, "collection", lambda name: coll)
+    assert server._latest_firmware_record('type = "application"').version == "2.0.0"
+    assert coll.full_queries == [{"filter": 'type = "application"', "fields": server.FIRMWARE_FIELDS}]
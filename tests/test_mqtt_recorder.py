@@ -0,0 +1,25 @@
+"""녹화 파일은 세션 하나만 담아야 재생 타이밍/기간이 맞습니다."""
+
+import pytest
+
+from common.mqtt_recorder import RX, MqttRecorder, read_records, session_path
+
+
+def test_recorder_does_not_append_to_existing_capture(tmp_path):
+    path = tmp_path / "bridge.sbrec"
+    rec = MqttRecorder(path)
+    rec.record(RX, "solar/simple/rx", b"{}")
+    rec.close()
+
+    with pytest.raises(FileExistsError):
+        MqttRecorder(path)
+    assert len(list(read_records(str(path)))) == 1
+
+
+def test_session_path_is_per_process(tmp_path):
+    path = session_path(tmp_path)
+    assert path.parent == tmp_path and path.suffix == ".sbrec"
+    rec = MqttRecorder(path)
+    rec.record(RX, "solar/bridge/rx", "{}")
+    rec.close()
+    assert [r.topic for r in read_records(str(path))] == ["solar/bridge/rx"]
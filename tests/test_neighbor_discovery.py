@@ -0,0 +1,30 @@
+"""discover_target(): 안정적인 RSSI 우위가 없어도 기존 스캔 시간(1초) 안에 끝나야 합니다."""
+
+from common.neighbor_discovery import discover_target
+
+
+class TiedBridge:
+    """RSSI가 비슷한 후보 둘만 보이는 스틱."""
+
+    def clear_neighbors(self, stick_uid, logger=None):
+        return True
+
+    def get_neighbors(self, stick_uid, logger=None):
+        return [{"id": "0x00000001", "rssi": -50}, {"id": "0x00000002", "rssi": -52}]
+
+
+class LeaderBridge(TiedBridge):
+    def get_neighbors(self, stick_uid, logger=None):
+        return [{"id": "0x00000001", "rssi": -40}, {"id": "0x00000002", "rssi": -70}]
+
+
+def test_no_stable_lead_stays_within_default_budget():
+    found = discover_target(TiedBridge(), "SIM00000", lambda n: True, poll_interval=0.05)
+    assert not found.stable and found.target["id"] == "0x00000001"
+    assert found.elapsed < 1.2
+
+
+def test_stable_lead_exits_early():
+    found = discover_target(LeaderBridge(), "SIM00000", lambda n: True, poll_interval=0.05)
+    assert found.stable and found.polls == 3
+    assert found.elapsed < 0.5
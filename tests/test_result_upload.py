@@ -0,0 +1,75 @@
+"""결과 업로드: 거부된 레코드와 묶음 처리량이 log_event로 로그 파일에 남아야 합니다."""
+
+import json
+import logging
+
+from common import db_server
+from common.result_spool import UPLOAD_OK, UPLOAD_REJECTED, UPLOAD_RETRY, ResultSpool
+
+
+class _Response:
+    def __init__(self, status_code, text=""):
+        self.status_code = status_code
+        self.text = text
+
+
+def _events(caplog):
+    return [json.loads(r.getMessage()) for r in caplog.records]
+
+
+def test_rejected_record_is_logged(caplog, monkeypatch):
+    server = db_server.TestDBServer("http://pb.invalid", "results", "jig1")
+    try:
+        server.logger = logging.getLogger("test.upload")
+        monkeypatch.setattr(server.session, "post", lambda *a, **k: _Response(400, '{"message":"bad deviceid"}'))
+        monkeypatch.setattr(server.session, "get", lambda *a, **k: _Response(404))
+        with caplog.at_level(logging.INFO, logger="test.upload"):
+            assert server._upload_spooled("abc", {"deviceid": ""}) == UPLOAD_REJECTED
+        (event,) = [e for e in _events(caplog) if e["event"] == "db.spool.rejected"]
+        assert event["data"]["id"] == "abc" and "bad deviceid" in event["data"]["error"]
+    finally:
+        server.close()
+
+
+def test_flush_logs_spool_stats(tmp_path, caplog):
+    logger = logging.getLogger("test.spool")
+    spool = ResultSpool(tmp_path / "spool.sqlite3", upload=lambda rid, p: UPLOAD_OK, logger=logger,
+                        upload_batch=lambda recs: {rid: UPLOAD_OK for rid, _ in recs}, batch_size=10)
+    try:
+        for i in range(3):
+            spool.enqueue({"n": i})
+        with caplog.at_level(logging.INFO, logger="test.spool"):
+            assert spool.drain(force=True) == 3
+        (event,) = [e for e in _events(caplog) if e["event"] == "db.spool.flush"]
+        assert event["data"]["pending"] == 0
+        assert event["data"]["uploaded"] == 3 and event["data"]["batches"] == 1
+        assert event["data"]["last_batch"]["ok"] == 3
+    finally:
+        spool.close()
+
+
+def test_batch_defers_records_that_were_not_sent(tmp_path):
+    # 레코드별 대체 전송이 첫 레코드에서 멈추면 나머지는 시도 횟수 없이 미뤄져야 함
+    spool = ResultSpool(tmp_path / "spool.sqlite3", upload=lambda rid, p: UPLOAD_OK,
+                        upload_batch=lambda recs: {recs[0][0]: UPLOAD_RETRY}, batch_size=10)
+    try:
+        for i in range(3):
+            spool.enqueue({"n": i})
+        assert spool.drain(force=True) == 0
+        attempts = [a for (a,) in spool._db.execute("SELECT attempts FROM results ORDER BY created")]
+        assert attempts == [1, 0, 0]
+        assert spool.failures == 1
+    finally:
+        spool.close()
+
+
+def test_batch_request_error_retries_every_record(monkeypatch):
+    server = db_server.TestDBServer("http://pb.invalid", "results", "jig1")
+    try:
+        def fail(*a, **k):
+            raise db_server.requests.ConnectionError("down")
+        monkeypatch.setattr(server.session, "post", fail)
+        records = [("a", {}), ("b", {})]
+        assert server._upload_batch(records) == {"a": UPLOAD_RETRY, "b": UPLOAD_RETRY}
+    finally:
+        server.close()
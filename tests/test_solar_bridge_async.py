@@ -0,0 +1,58 @@
+"""AsyncSolarBridgeClient도 동기 클라이언트와 같은 BridgeMetrics에 재시도/타임아웃/RTT를 기록합니다."""
+
+import asyncio
+
+from common.bridge_simulator import BridgeSimulator, LoopbackTransport, SimConfig
+from common.solar_bridge import SolarBridgeClient
+from common.solar_bridge_async import AsyncSolarBridgeClient
+
+
+def test_async_commands_update_bridge_stats():
+    sim = BridgeSimulator(SimConfig(devices=1, asp_interval=1000, latency=0.005, jitter=0.0, seed=2))
+    client = AsyncSolarBridgeClient(client=SolarBridgeClient(timeout=0.2, transport=LoopbackTransport(sim)))
+    dev_id = next(iter(sim.devices))
+    stick_uid = sim.sticks[0]["uid"]
+
+    async def scenario():
+        await client.start()
+        try:
+            assert await client.get_device_info(dev_id, stick_uid) is not None
+            assert await client.get_device_info("0x0BADBEEF", stick_uid) is None  # 없는 장치: 2회 타임아웃
+        finally:
+            await client.stop()
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        sim.stop()
+    stats = client.bridge_stats()["commands"]["REQ_GET_INFO"]
+    assert stats["requests"] == 3
+    assert stats["rtt"]["count"] == 1
+    assert stats["timeouts"] == 2 and stats["retries"] == 1
+
+
+def test_async_command_aborts_on_connection_loss_without_retry():
+    sim = BridgeSimulator(SimConfig(devices=1, asp_interval=1000, latency=0.005, jitter=0.0, seed=2))
+    client = AsyncSolarBridgeClient(client=SolarBridgeClient(timeout=0.5, transport=LoopbackTransport(sim)))
+    stick_uid = sim.sticks[0]["uid"]
+
+    async def scenario():
+        await client.start()
+        try:
+            loop = asyncio.get_running_loop()
+            # 응답 없는 장치를 기다리는 중에 연결이 끊김
+            loop.call_later(0.05, client.sync_client._fail_pending, ConnectionError("MQTT connection lost"))
+            started = loop.time()
+            assert await client.get_device_info("0x0BADBEEF", stick_uid) is None
+            return loop.time() - started
+        finally:
+            await client.stop()
+
+    try:
+        elapsed = asyncio.run(scenario())
+    finally:
+        sim.stop()
+    assert elapsed < 0.4
+    stats = client.bridge_stats()["commands"]["REQ_GET_INFO"]
+    assert stats["requests"] == 1
+    assert stats.get("retries", 0) == 0 and stats.get("timeouts", 0) == 0
@@ -0,0 +1,67 @@
+"""run_script(): Complex API 지원은 성공 응답으로만 확인하고, 거부된 스크립트는 로컬에서 실행합니다."""
+
+import pytest
+
+from common.bridge_simulator import BridgeSimulator, LoopbackTransport, SimConfig
+from common.solar_bridge import ComplexScript, SolarBridgeClient
+
+
+class RejectingSimulator(BridgeSimulator):
+    """Complex 요청을 스키마 오류로 거부하는 Bridge."""
+
+    def __init__(self, config, reply):
+        super().__init__(config)
+        self.reject_reply = reply
+
+    def _handle_complex(self, data):
+        dev = self.devices.get(str(data.get("target_id", "")).upper().replace("0X", "0x"))
+        self._reply(f"solar/complex/{dev.topic_id}/rx", {
+            "transaction_id": data.get("transaction_id"), "stick_uid": data.get("stick_uid"),
+            "message": "invalid step schema", **self.reject_reply,
+        })
+
+
+def _run(sim):
+    client = SolarBridgeClient(timeout=1.0, transport=LoopbackTransport(sim))
+    client.start()
+    try:
+        dev = next(iter(sim.devices.values()))
+        script = ComplexScript().req_shutdown(True, True).wait(10)
+        res = client.run_script(dev.device_id, sim.sticks[0]["uid"], script)
+        return client, dev, res
+    finally:
+        client.stop()
+        sim.stop()
+
+
+@pytest.fixture
+def config():
+    return SimConfig(devices=2, asp_interval=1000, latency=0.005, jitter=0.0, seed=5, complex_api=True)
+
+
+@pytest.mark.parametrize("reply", [{"status": "INVALID"}, {"type": "ERROR"}])
+def test_rejected_script_falls_back_to_local_steps(config, reply):
+    client, dev, res = _run(RejectingSimulator(config, reply))
+    assert res["status"] == "COMPLETED"
+    assert res["results"] and res["results"][0]["cmd"] == "RESP_SHUTDOWN"
+    assert client._complex_supported is False
+
+
+def test_failed_script_on_unconfirmed_bridge_runs_locally(config):
+    sim = BridgeSimulator(config)
+    dev = next(iter(sim.devices.values()))
+    client = SolarBridgeClient(timeout=1.0, transport=LoopbackTransport(sim))
+    client.start()
+    try:
+        # 첫 단계에서 실패 (Bridge가 아무 단계도 실행하지 않음)
+        failing = ComplexScript().command("REQ_UNKNOWN").req_shutdown(True, False)
+        res = client.run_script(dev.device_id, sim.sticks[0]["uid"], failing)
+        assert client._complex_supported is None  # FAILED 응답으로 지원 여부를 확정하지 않음
+        assert res["status"] == "FAILED"           # 로컬 실행에서도 REQ_UNKNOWN은 실패
+
+        ok = client.run_script(dev.device_id, sim.sticks[0]["uid"], ComplexScript().req_shutdown(True, False))
+        assert ok["status"] == "COMPLETED"
+        assert client._complex_supported is True
+    finally:
+        client.stop()
+        sim.stop()
@@ -0,0 +1,66 @@
+"""focus_device(): 이웃 목록의 4바이트 ID로도 장치 토픽(6바이트 주소)을 구독하는지 확인합니다."""
+
+import pytest
+
+from common.bridge_simulator import BridgeSimulator, LoopbackTransport, SimConfig
+from common.solar_bridge import SolarBridgeClient
+
+
+@pytest.fixture
+def bridge():
+    sim = BridgeSimulator(SimConfig(devices=4, asp_interval=20, latency=0.005, jitter=0.0, seed=7))
+    client = SolarBridgeClient(timeout=1.0, narrow_subscriptions=True, transport=LoopbackTransport(sim))
+    client.start()
+    client.watch_devices([])
+    yield sim, client
+    client.stop()
+    sim.stop()
+
+
+def test_focus_with_neighbor_id_subscribes_full_address(bridge):
+    sim, client = bridge
+    dev = next(iter(sim.devices.values()))
+    stick_uid = sim.sticks[0]["uid"]
+    assert len(dev.device_id) == 10  # 이웃 목록 표기: 0x + 하위 4바이트
+
+    client.focus_device(dev.device_id, stick_uid)
+    assert f"solar/mlpe/{dev.topic_id}/rx" in client._subscribed_topics
+    assert "solar/mlpe/+/rx" not in client._subscribed_topics
+
+    # stick_uid 없이 수집: BEACON_RAW_DATA 폴링 없이 비콘만으로 채워져야 함
+    samples = client.collect_adc(dev.device_id, max_samples=5, duration=2.0)
+    assert len(samples) == 5
+
+    client.release_device()
+    assert not any(t.startswith("solar/mlpe/") for t in client._subscribed_topics)
+
+
+def test_focus_without_address_falls_back_to_wildcard(bridge):
+    sim, client = bridge
+    dev, other = list(sim.devices.values())[:2]
+
+    # 스틱을 모르면 상위 2바이트를 확인할 수 없으므로 와일드카드 + 대상 장치만 처리
+    client.focus_device(dev.device_id)
+    assert "solar/mlpe/+/rx" in client._subscribed_topics
+    assert client._wants_device(client._normalize_id(dev.device_id))
+    assert not client._wants_device(client._normalize_id(other.device_id))
+
+    samples = client.collect_adc(dev.device_id, max_samples=5, duration=2.0)
+    assert len(samples) == 5
+
+    client.release_device()
+    assert "solar/mlpe/+/rx" not in client._subscribed_topics
+    assert not client._wants_device(client._normalize_id(dev.device_id))
+
+
+def test_focus_after_get_info_sends_no_extra_request(bridge):
+    sim, client = bridge
+    dev = next(iter(sim.devices.values()))
+    stick_uid = sim.sticks[0]["uid"]
+
+    # CommTester 순서: get_device_info 응답의 upper_id로 주소가 확보된 뒤 focus
+    assert client.get_device_info(dev.device_id, stick_uid)
+    before = sim.requests
+    client.focus_device(dev.device_id, stick_uid)
+    assert sim.requests == before
+    assert f"solar/mlpe/{dev.topic_id}/rx" in client._subscribed_topics
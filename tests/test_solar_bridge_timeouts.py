@@ -0,0 +1,41 @@
+"""적응형 타임아웃: 빠른 응답이 이어진 뒤에도 느린 장치가 재시도에서 응답할 수 있어야 합니다."""
+
+from common.bridge_simulator import BridgeSimulator, LoopbackTransport, SimConfig
+from common.solar_bridge import SolarBridgeClient
+
+
+def test_get_device_info_any_escalates_after_fast_replies():
+    sim = BridgeSimulator(SimConfig(sticks=2, devices=2, asp_interval=1000, latency=0.005, jitter=0.0, seed=3))
+    client = SolarBridgeClient(timeout=3.0, adaptive_timeouts=True, transport=LoopbackTransport(sim))
+    client.start()
+    try:
+        dev = next(iter(sim.devices.values()))
+        uids = [s["uid"] for s in sim.sticks]
+        for _ in range(25):
+            assert client.get_device_info(dev.device_id, uids[0]) is not None
+        assert client._deadline("REQ_GET_INFO", uids[0], client.timeout) == client.latency.policy.floor
+
+        sim.config.latency = 0.5  # 바닥값(0.3s)보다 느린 장치
+        uid, info = client.get_device_info_any(dev.device_id, uids)
+        assert uid in uids and info is not None
+        assert client.bridge_stats()["commands"]["REQ_GET_INFO"]["retries"] == 1
+    finally:
+        client.stop()
+        sim.stop()
+
+
+def test_get_device_info_any_honors_attempts_and_counts_failed_replies():
+    sim = BridgeSimulator(SimConfig(sticks=2, devices=1, asp_interval=1000, latency=0.005, jitter=0.0, seed=3))
+    client = SolarBridgeClient(timeout=1.0, transport=LoopbackTransport(sim))
+    client.start()
+    try:
+        dev = next(iter(sim.devices.values()))
+        # 알 수 없는 스틱: Bridge가 모든 요청에 FAILED로 응답
+        uid, info = client.get_device_info_any(dev.device_id, ["unknown-1", "unknown-2"], attempts=1)
+        assert (uid, info) == (None, None)
+        counters = client.bridge_stats()["commands"]["REQ_GET_INFO"]
+        assert counters.get("retries", 0) == 0
+        assert counters["failures"] == 1 and counters.get("timeouts", 0) == 0
+    finally:
+        client.stop()
+        sim.stop()